@@ -0,0 +1,130 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import LoginActivity
+
+logger = logging.getLogger(__name__)
+
+
+def client_ip(request):
+	"""Best-effort client IP, preferring the first X-Forwarded-For hop."""
+	x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+	if x_forwarded_for:
+		return x_forwarded_for.split(',')[0].strip()
+	return request.META.get('REMOTE_ADDR', '127.0.0.1')
+
+
+class LoginActivityBuffer:
+	"""Collects LoginActivity rows in memory and writes them in batches from a background thread.
+
+	Requests only enqueue a row; the writer thread inserts with bulk_create once
+	MAX_BATCH rows are waiting or FLUSH_INTERVAL seconds have passed, whichever
+	comes first. Anything still queued is written when the process exits. If a
+	batch insert fails, its rows are written one at a time so only a bad row is lost.
+	"""
+
+	def __init__(self):
+		self._queue = queue.Queue()
+		self._lock = threading.Lock()
+		self._pending = []  # Taken off the queue by the writer but not yet written
+		self._thread = None
+		self._pid = None
+
+	@property
+	def max_batch(self):
+		return settings.LOGIN_ACTIVITY_BUFFER.get('MAX_BATCH', 100)
+
+	@property
+	def flush_interval(self):
+		return settings.LOGIN_ACTIVITY_BUFFER.get('FLUSH_INTERVAL', 2.0)
+
+	def add(self, activity):
+		if not settings.LOGIN_ACTIVITY_BUFFER.get('ENABLED', True):
+			activity.save()
+			return
+		self._ensure_thread()
+		self._queue.put(activity)
+
+	def flush(self):
+		"""Write everything queued so far from the calling thread."""
+		while True:
+			try:
+				self._hold(self._queue.get_nowait())
+			except queue.Empty:
+				break
+		self._write(self._take())
+
+	def _hold(self, activity):
+		with self._lock:
+			self._pending.append(activity)
+			return len(self._pending)
+
+	def _take(self):
+		with self._lock:
+			batch, self._pending = self._pending, []
+		return batch
+
+	def _ensure_thread(self):
+		# Started lazily and per process, so forked workers each get their own writer
+		if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+			return
+		with self._lock:
+			if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+				return
+			self._pid = os.getpid()
+			self._thread = threading.Thread(target=self._run, name='login-activity-writer', daemon=True)
+			self._thread.start()
+
+	def _run(self):
+		while True:
+			held = self._hold(self._queue.get())
+			deadline = time.monotonic() + self.flush_interval
+			while held < self.max_batch:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					break
+				try:
+					held = self._hold(self._queue.get(timeout=remaining))
+				except queue.Empty:
+					break
+			self._write(self._take())
+			connection.close()
+
+	def _write(self, batch):
+		if not batch:
+			return
+		try:
+			with transaction.atomic():
+				LoginActivity.objects.bulk_create(batch)
+			return
+		except Exception:
+			logger.exception('Failed to write %d login activity records in bulk; writing them one by one', len(batch))
+		# One bad row (e.g. its user was deleted meanwhile) must not cost the rest of the batch
+		for activity in batch:
+			try:
+				with transaction.atomic():
+					activity.save(force_insert=True)
+			except Exception:
+				logger.exception('Dropped login activity record for user %s at %s', activity.user_id, activity.login_time)
+
+
+login_activity_buffer = LoginActivityBuffer()
+atexit.register(login_activity_buffer.flush)
+
+
+def record_login(user, request):
+	"""Queue a LoginActivity row for a successful login without touching the database."""
+	login_activity_buffer.add(LoginActivity(
+		user=user,
+		login_time=timezone.now(),
+		ip_address=client_ip(request),
+		user_agent=request.META.get('HTTP_USER_AGENT', 'Unknown')
+	))
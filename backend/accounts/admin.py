@@ -1,7 +1,13 @@
 from django.contrib import admin
-from .models import Profile
+from .models import Profile, QueuedEmail
 
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
 	list_display = ('user', 'role', 'profile_picture')
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+	list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+	list_filter = ('status',)
@@ -0,0 +1,121 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+	"""In-process cache of User rows (with profile joined) keyed by user id.
+
+	Entries live for USER_CACHE['TTL'] seconds. Views that change what
+	authentication depends on (active flag, password, role, location) call
+	forget_user() so this process sees the change immediately; other worker
+	processes pick it up when their entry expires.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._entries = {}
+
+	@property
+	def ttl(self):
+		return settings.USER_CACHE.get('TTL', 60)
+
+	@property
+	def max_entries(self):
+		return settings.USER_CACHE.get('MAX_ENTRIES', 10000)
+
+	def get(self, user_id):
+		# Claims may carry the id as a string; key on that so forget(user.pk) matches
+		user_id = str(user_id)
+		now = time.monotonic()
+		with self._lock:
+			entry = self._entries.get(user_id)
+		if entry is not None and entry[0] > now:
+			return _detached(entry[1])
+
+		user = get_user_model().objects.select_related('profile').filter(
+			**{api_settings.USER_ID_FIELD: user_id}
+		).first()
+		if user is None:
+			return None
+		# Resolve a missing profile now so later `user.profile` access doesn't query either
+		try:
+			user.profile
+		except Exception:
+			pass
+		with self._lock:
+			if len(self._entries) >= self.max_entries:
+				self._evict(now)
+			self._entries[user_id] = (now + self.ttl, user)
+		return _detached(user)
+
+	def forget(self, user_id):
+		with self._lock:
+			self._entries.pop(str(user_id), None)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+	def _evict(self, now):
+		expired = [user_id for user_id, (expires, _) in self._entries.items() if expires <= now]
+		for user_id in expired:
+			del self._entries[user_id]
+		if len(self._entries) >= self.max_entries:
+			# Still full of live entries: drop the oldest half rather than growing without bound
+			oldest = sorted(self._entries, key=lambda user_id: self._entries[user_id][0])
+			for user_id in oldest[:len(oldest) // 2]:
+				del self._entries[user_id]
+
+
+def _detached(user):
+	"""A per-request copy, so a view editing request.user never mutates the cached instance."""
+	clone = copy.copy(user)
+	profile = user._state.fields_cache.get('profile')
+	if profile is not None:
+		clone._state.fields_cache['profile'] = copy.copy(profile)
+	return clone
+
+
+user_cache = UserCache()
+
+
+def forget_user(user_id):
+	"""Drop a user from this process's authentication cache after changing them."""
+	user_cache.forget(user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+	"""JWTAuthentication that resolves the token's user from the in-process UserCache.
+
+	Performs the same active/revoked checks as simplejwt on every request, so a
+	warm request does no authentication queries at all.
+	"""
+
+	def get_user(self, validated_token):
+		try:
+			user_id = validated_token[api_settings.USER_ID_CLAIM]
+		except KeyError:
+			raise InvalidToken(_('Token contained no recognizable user identification'))
+
+		user = user_cache.get(user_id)
+		if user is None:
+			raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+		if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+			raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+		if api_settings.CHECK_REVOKE_TOKEN:
+			if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+				raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+		return user
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Backends that store entries in the database or on disk rather than in memory
+_SLOW_BACKENDS = (
+	'django.core.cache.backends.db.DatabaseCache',
+	'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+@register()
+def login_throttle_cache(app_configs, **kwargs):
+	"""The login throttle writes to the default cache on every /api/token/ attempt.
+
+	In the database that write queues on SQLite's write lock before the 429 can be
+	returned, which is the saturation the throttle exists to prevent.
+	"""
+	backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+	if backend in _SLOW_BACKENDS:
+		return [Warning(
+			f'The default cache uses {backend}.',
+			hint='Login throttling and availability need an in-memory shared cache such as Redis '
+				 '(see chonkyweb_backend/settings_production.py).',
+			id='accounts.W001',
+		)]
+	return []
+
+
+@register(deploy=True)
+def login_throttle_cache_shared(app_configs, **kwargs):
+	backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+	if backend == 'django.core.cache.backends.locmem.LocMemCache':
+		return [Warning(
+			'The default cache is local to each process, so login limits multiply by the number of workers.',
+			hint='Use chonkyweb_backend.settings_production, which keeps the cache in Redis.',
+			id='accounts.W002',
+		)]
+	return []
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+from .models import QueuedEmail
+
+
+def queue_email(subject, body, to, from_email=None):
+	"""Store an email for the send_queued_email worker instead of talking to SMTP in the request."""
+	return QueuedEmail.objects.create(
+		subject=subject,
+		body=body,
+		from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@example.com'),
+		to=list(to)
+	)
+
+
+def retry_delay(attempts):
+	"""Exponential backoff after `attempts` failed tries: base, 2*base, 4*base, ... capped at RETRY_MAX_SECONDS."""
+	base = settings.EMAIL_QUEUE.get('RETRY_BASE_SECONDS', 60)
+	cap = settings.EMAIL_QUEUE.get('RETRY_MAX_SECONDS', 3600)
+	return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
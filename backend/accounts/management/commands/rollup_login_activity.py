@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from accounts.models import LoginActivity, LoginActivityDaily
+
+
+class Command(BaseCommand):
+    help = 'Roll login activity older than the retention window into daily summaries and delete the raw rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=getattr(settings, 'LOGIN_ACTIVITY_RETENTION_DAYS', 90),
+            help='Keep raw login activity for this many days'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Raw rows rolled up and deleted per transaction')
+
+    def handle(self, *args, **options):
+        # Only whole days are rolled up, so a day is never split between raw rows and a summary
+        cutoff_day = timezone.localdate() - timedelta(days=options['days'])
+        cutoff = self.day_start(cutoff_day)
+
+        oldest = LoginActivity.objects.filter(login_time__lt=cutoff).order_by('login_time').first()
+        if oldest is None:
+            self.stdout.write(self.style.SUCCESS('✓ Nothing older than the retention window'))
+            return
+
+        day = timezone.localtime(oldest.login_time).date()
+        rolled = 0
+        days = 0
+        while day < cutoff_day:
+            count = self.roll_up_day(day, options['chunk_size'])
+            if count:
+                rolled += count
+                days += 1
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Rolled up {rolled} login records into {days} days of summaries'))
+
+    def day_start(self, day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def roll_up_day(self, day, chunk_size):
+        raw = LoginActivity.objects.filter(
+            login_time__gte=self.day_start(day),
+            login_time__lt=self.day_start(day + timedelta(days=1))
+        )
+        # Distinct IPs can't be added up across chunks, so count them over the whole day up front
+        distinct_ips = dict(raw.values_list('user_id').annotate(ips=Count('ip_address', distinct=True)).order_by())
+
+        total = 0
+        while True:
+            # Each chunk is summarised and deleted in one transaction, so a crash never double counts
+            with transaction.atomic():
+                ids = list(raw.order_by('id').values_list('id', flat=True)[:chunk_size])
+                if not ids:
+                    break
+
+                stats = LoginActivity.objects.filter(id__in=ids).values('user_id').annotate(
+                    count=Count('id'), first=Min('login_time'), last=Max('login_time')
+                ).order_by()
+                existing = {
+                    summary.user_id: summary
+                    for summary in LoginActivityDaily.objects.select_for_update().filter(
+                        day=day, user_id__in=[row['user_id'] for row in stats]
+                    )
+                }
+
+                created, updated = [], []
+                for row in stats:
+                    summary = existing.get(row['user_id'])
+                    if summary is None:
+                        created.append(LoginActivityDaily(
+                            user_id=row['user_id'],
+                            day=day,
+                            login_count=row['count'],
+                            distinct_ips=distinct_ips.get(row['user_id'], 0),
+                            first_login=row['first'],
+                            last_login=row['last']
+                        ))
+                    else:
+                        summary.login_count += row['count']
+                        summary.distinct_ips = max(summary.distinct_ips, distinct_ips.get(row['user_id'], 0))
+                        summary.first_login = min(summary.first_login, row['first'])
+                        summary.last_login = max(summary.last_login, row['last'])
+                        updated.append(summary)
+
+                LoginActivityDaily.objects.bulk_create(created)
+                LoginActivityDaily.objects.bulk_update(
+                    updated, ['login_count', 'distinct_ips', 'first_login', 'last_login']
+                )
+                LoginActivity.objects.filter(id__in=ids).delete()
+                total += len(ids)
+        return total
@@ -0,0 +1,95 @@
+import time as _time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from accounts.mail import retry_delay
+from accounts.models import QueuedEmail
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails in batches over one SMTP connection, retrying failures with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_QUEUE.get('BATCH_SIZE', 100),
+            help='Messages claimed and sent per batch'
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls with --loop')
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+        while True:
+            batch = self.claim(options['batch_size'])
+            if batch:
+                for key, value in self.deliver(batch).items():
+                    totals[key] += value
+                continue
+            if not options['loop']:
+                break
+            db_connection.close()
+            _time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Sent {totals['sent']} queued emails"))
+        if totals['retrying']:
+            self.stdout.write(self.style.WARNING(f"✓ {totals['retrying']} emails will be retried"))
+        if totals['failed']:
+            self.stdout.write(self.style.ERROR(f"✓ {totals['failed']} emails gave up after too many attempts"))
+
+    def claim(self, batch_size):
+        """Lease due messages to this worker; a lease that runs out (worker died) makes them due again."""
+        now = timezone.now()
+        lease = timedelta(seconds=settings.EMAIL_QUEUE.get('LEASE_SECONDS', 600))
+        with transaction.atomic():
+            ids = list(QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=['pending', 'sending'], next_attempt_at__lte=now
+            ).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+            QueuedEmail.objects.filter(id__in=ids).update(status='sending', next_attempt_at=now + lease)
+        return list(QueuedEmail.objects.filter(id__in=ids).order_by('id'))
+
+    def deliver(self, batch):
+        max_attempts = settings.EMAIL_QUEUE.get('MAX_ATTEMPTS', 5)
+        sent, failed = [], []
+        mail_connection = get_connection()
+        try:
+            # Opened once and kept open for the whole batch
+            mail_connection.open()
+        except Exception as e:
+            failed = [(message, e) for message in batch]
+        else:
+            try:
+                for message in batch:
+                    try:
+                        mail_connection.send_messages([EmailMessage(
+                            message.subject, message.body, message.from_email, message.to
+                        )])
+                        sent.append(message.id)
+                    except Exception as e:
+                        failed.append((message, e))
+            finally:
+                mail_connection.close()
+
+        now = timezone.now()
+        QueuedEmail.objects.filter(id__in=sent).update(status='sent', sent_at=now, last_error='')
+
+        retrying = gave_up = 0
+        for message, error in failed:
+            message.attempts += 1
+            message.last_error = str(error)[:1000]
+            if message.attempts >= max_attempts:
+                message.status = 'failed'
+                gave_up += 1
+            else:
+                message.status = 'pending'
+                message.next_attempt_at = now + retry_delay(message.attempts)
+                retrying += 1
+        QueuedEmail.objects.bulk_update(
+            [message for message, _ in failed], ['status', 'attempts', 'last_error', 'next_attempt_at']
+        )
+        return {'sent': len(sent), 'retrying': retrying, 'failed': gave_up}
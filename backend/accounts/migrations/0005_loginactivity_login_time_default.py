@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_profile_location'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loginactivity',
+            name='login_time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_loginactivity_login_time_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginactivity',
+            index=models.Index(fields=['-login_time', '-id'], name='loginactivity_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginactivity',
+            index=models.Index(fields=['user', '-login_time'], name='loginactivity_user_time_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_loginactivity_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginActivityDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('login_count', models.PositiveIntegerField(default=0)),
+                ('distinct_ips', models.PositiveIntegerField(default=0)),
+                ('first_login', models.DateTimeField()),
+                ('last_login', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='login_activity_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Login Activities',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['-day', '-id'], name='loginactivitydaily_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='unique_login_activity_day')],
+            },
+        ),
+    ]
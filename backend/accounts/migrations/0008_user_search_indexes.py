@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Expression indexes on auth_user backing the case-insensitive prefix search in accounts.search."""
+
+    dependencies = [
+        ('accounts', '0007_loginactivitydaily'),
+        # After the last auth migration: SQLite rebuilds auth_user on ALTER, which would drop these indexes
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX accounts_user_username_lower_idx ON auth_user (LOWER(username))',
+            reverse_sql='DROP INDEX accounts_user_username_lower_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX accounts_user_email_lower_idx ON auth_user (LOWER(email))',
+            reverse_sql='DROP INDEX accounts_user_email_lower_idx',
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['role', 'location'], name='profile_role_location_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').values(address=Lower('email'))
+        .annotate(total=Count('id')).filter(total__gt=1).values_list('address', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot add the unique email index: these addresses belong to more than one account '
+            '(case-insensitive): ' + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+    """Case-insensitive uniqueness for non-blank emails; lookups keep using accounts_user_email_lower_idx."""
+
+    dependencies = [
+        ('accounts', '0008_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX accounts_user_email_lower_uniq ON auth_user (LOWER(email)) WHERE email <> ''",
+            reverse_sql='DROP INDEX accounts_user_email_lower_uniq',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def queue_existing_pictures(apps, schema_editor):
+    # Pictures uploaded before the worker existed get processed on its first run
+    Profile = apps.get_model('accounts', 'Profile')
+    Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True).update(profile_picture_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_queuedemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['profile_picture_status'], name='profile_picture_status_idx'),
+        ),
+        migrations.RunPython(queue_existing_pictures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:23
+
+import imaging.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_picture_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=imaging.storage.ContentAddressedStorage(), upload_to='profile_pics/'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """LOWER(first_name)/LOWER(last_name) on auth_user so the owner typeahead can prefix-search names too."""
+
+    dependencies = [
+        ('accounts', '0012_picture_storage'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX accounts_user_first_name_lower_idx ON auth_user (LOWER(first_name))',
+            reverse_sql='DROP INDEX accounts_user_first_name_lower_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX accounts_user_last_name_lower_idx ON auth_user (LOWER(last_name))',
+            reverse_sql='DROP INDEX accounts_user_last_name_lower_idx',
+        ),
+    ]
@@ -1,5 +1,10 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from imaging.blobs import release_ref, stored_name, swap_refs
+from imaging.pipeline import IMAGE_STATUS_CHOICES, is_new_upload
+from imaging.storage import ContentAddressedStorage
 
 
 class Profile(models.Model):
@@ -11,23 +16,108 @@ class Profile(models.Model):
 	
 	user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='profile')
 	role = models.CharField(max_length=32, default='user')
-	profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+	# Stored once per distinct file under its SHA-256; see imaging.storage
+	profile_picture = models.ImageField(upload_to='profile_pics/', storage=ContentAddressedStorage(), null=True, blank=True)
 	location = models.CharField(max_length=50, choices=LOCATION_CHOICES, default='Matina')
+	# Set to 'pending' on upload; the process_images worker strips metadata and builds variants
+	profile_picture_status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default='ready')
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['role', 'location'], name='profile_role_location_idx'),
+			models.Index(fields=['profile_picture_status'], name='profile_picture_status_idx'),
+		]
 
 	def __str__(self):
 		return f"{self.user.username} ({self.role})"
 
+	def save(self, *args, **kwargs):
+		# New uploads are stored as-is here and processed off-request by process_images
+		if is_new_upload(self.profile_picture):
+			self.profile_picture_status = 'pending'
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None and 'profile_picture' not in update_fields:
+			return super().save(*args, **kwargs)
+		old_picture = stored_name(self, 'profile_picture')
+		super().save(*args, **kwargs)
+		swap_refs(old_picture, self.profile_picture.name, self.profile_picture.storage)
+
+	def delete(self, *args, **kwargs):
+		picture = self.profile_picture.name
+		result = super().delete(*args, **kwargs)
+		release_ref(picture)
+		return result
+
 
 class LoginActivity(models.Model):
 	"""Track user login activities."""
 	user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='login_activities')
-	login_time = models.DateTimeField(auto_now_add=True)
+	# Set when the login happens, not when the buffered row is written
+	login_time = models.DateTimeField(default=timezone.now)
 	ip_address = models.GenericIPAddressField(null=True, blank=True)
 	user_agent = models.TextField(blank=True)
 
 	class Meta:
 		ordering = ['-login_time']
 		verbose_name_plural = 'Login Activities'
+		indexes = [
+			models.Index(fields=['-login_time', '-id'], name='loginactivity_time_idx'),
+			models.Index(fields=['user', '-login_time'], name='loginactivity_user_time_idx'),
+		]
 
 	def __str__(self):
 		return f"{self.user.username} - {self.login_time}"
+
+
+class LoginActivityDaily(models.Model):
+	"""Per-user, per-day summary of LoginActivity rows older than the retention window."""
+	user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='login_activity_days')
+	day = models.DateField()
+	login_count = models.PositiveIntegerField(default=0)
+	distinct_ips = models.PositiveIntegerField(default=0)
+	first_login = models.DateTimeField()
+	last_login = models.DateTimeField()
+
+	class Meta:
+		ordering = ['-day']
+		verbose_name_plural = 'Daily Login Activities'
+		constraints = [
+			models.UniqueConstraint(fields=['user', 'day'], name='unique_login_activity_day')
+		]
+		indexes = [
+			models.Index(fields=['-day', '-id'], name='loginactivitydaily_day_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.user.username} - {self.day} ({self.login_count} logins)"
+
+
+class QueuedEmail(models.Model):
+	"""Outgoing email waiting to be sent by `manage.py send_queued_email`."""
+	STATUS_CHOICES = [
+		('pending', 'Pending'),
+		('sending', 'Sending'),
+		('sent', 'Sent'),
+		('failed', 'Failed'),
+	]
+
+	subject = models.CharField(max_length=255)
+	body = models.TextField()
+	from_email = models.CharField(max_length=254)
+	to = models.JSONField(default=list)
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+	attempts = models.PositiveSmallIntegerField(default=0)
+	# When a pending message is due; for 'sending' it is the end of the worker's lease
+	next_attempt_at = models.DateTimeField(default=timezone.now)
+	last_error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+	sent_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ['next_attempt_at', 'id']
+		indexes = [
+			models.Index(fields=['status', 'next_attempt_at'], name='queuedemail_due_idx'),
+		]
+
+	def __str__(self):
+		return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from rest_framework.permissions import BasePermission
+
+from .models import Profile
+
+_UNSET = object()
+
+
+def request_profile(request):
+	"""The user's Profile (or None), loaded at most once per request."""
+	profile = getattr(request, '_cached_profile', _UNSET)
+	if profile is _UNSET:
+		user = request.user
+		if User.profile.is_cached(user):
+			# Already joined by CachedJWTAuthentication
+			profile = getattr(user, 'profile', None)
+		else:
+			profile = Profile.objects.filter(user_id=user.pk).first()
+		request._cached_profile = profile
+	return profile
+
+
+def _claim(request, name):
+	# Tokens issued before the claims were added simply don't have them
+	token = getattr(request, 'auth', None)
+	if token is not None and hasattr(token, 'get'):
+		return token.get(name)
+	return None
+
+
+def user_role(request):
+	"""The user's role, read from the profile whenever the authentication already joined it.
+
+	The 'role' claim is only a fallback: simplejwt copies claims into every rotated
+	refresh token, so a claim can outlive a demotion indefinitely, while the joined
+	profile is at most USER_CACHE['TTL'] seconds old.
+	"""
+	user = request.user
+	if not User.profile.is_cached(user):
+		role = _claim(request, 'role')
+		if role is not None:
+			return role
+	profile = request_profile(request)
+	return getattr(profile, 'role', 'user')
+
+
+def is_admin(request):
+	user = request.user
+	if not (user and user.is_authenticated):
+		return False
+	return user.is_staff or user.is_superuser or user_role(request) == 'admin'
+
+
+class IsAdminRole(BasePermission):
+	"""Staff, superusers and accounts whose profile role is 'admin'."""
+	message = 'Admin access required'
+
+	def has_permission(self, request, view):
+		return is_admin(request)
@@ -0,0 +1,35 @@
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+
+
+def next_prefix(prefix):
+	"""Smallest string greater than every string starting with `prefix`."""
+	return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def case_insensitive_match(queryset, field, value):
+	"""Rows whose `field` equals `value` ignoring case, as one probe of the LOWER(field) index.
+
+	Unlike `field__iexact` (LIKE on SQLite, UPPER() on PostgreSQL) the expression
+	matches the index; both sides are lowered by the database so they agree.
+	"""
+	alias = f'{field.replace("__", "_")}_lower'
+	return queryset.alias(**{alias: Lower(field)}).filter(**{alias: Lower(Value(value))})
+
+
+def prefix_search(queryset, term, fields):
+	"""Case-insensitive prefix match on any of `fields`.
+
+	Written as LOWER(field) >= term AND LOWER(field) < next_prefix(term) rather
+	than LIKE/istartswith, so each field's LOWER(...) expression index can serve
+	it as a range scan.
+	"""
+	term = term.strip().lower()
+	if not term:
+		return queryset
+	condition = Q()
+	for field in fields:
+		alias = f'{field.replace("__", "_")}_lower'
+		queryset = queryset.alias(**{alias: Lower(field)})
+		condition |= Q(**{f'{alias}__gte': term, f'{alias}__lt': next_prefix(term)})
+	return queryset.filter(condition)
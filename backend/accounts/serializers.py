@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from .models import Profile, LoginActivity
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .models import Profile, LoginActivity, LoginActivityDaily
+from .search import case_insensitive_match
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -10,12 +12,12 @@ class RegisterSerializer(serializers.Serializer):
     role = serializers.CharField(required=False, default='user')
 
     def validate_username(self, value):
-        if User.objects.filter(username__iexact=value).exists():
+        if case_insensitive_match(User.objects, 'username', value).exists():
             raise serializers.ValidationError("A user with that username already exists.")
         return value
 
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exists():
+        if case_insensitive_match(User.objects, 'email', value).exists():
             raise serializers.ValidationError("A user with that email already exists.")
         return value
 
@@ -51,13 +53,13 @@ class ProfileSerializer(serializers.Serializer):
 
     def validate_username(self, value):
         user = self.context.get('user')
-        if User.objects.filter(username__iexact=value).exclude(pk=getattr(user, 'pk', None)).exists():
+        if case_insensitive_match(User.objects, 'username', value).exclude(pk=getattr(user, 'pk', None)).exists():
             raise serializers.ValidationError('A user with that username already exists.')
         return value
 
     def validate_email(self, value):
         user = self.context.get('user')
-        if User.objects.filter(email__iexact=value).exclude(pk=getattr(user, 'pk', None)).exists():
+        if case_insensitive_match(User.objects, 'email', value).exclude(pk=getattr(user, 'pk', None)).exists():
             raise serializers.ValidationError('A user with that email already exists.')
         return value
 
@@ -73,12 +75,26 @@ class ProfileSerializer(serializers.Serializer):
         instance.username = validated_data.get('username', instance.username)
         instance.email = validated_data.get('email', instance.email)
         new = validated_data.get('new_password')
+        update_fields = ['username', 'email']
         if new:
             instance.set_password(new)
-        instance.save()
+            update_fields.append('password')
+        instance.save(update_fields=update_fields)
         return instance
 
 
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens carrying the user's role and location so permission checks need no profile query."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        profile = Profile.objects.filter(user=user).only('role', 'location').first()
+        token['role'] = profile.role if profile else 'user'
+        token['location'] = profile.location if profile else None
+        return token
+
+
 class LoginActivitySerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     role = serializers.SerializerMethodField()
@@ -94,3 +110,43 @@ class LoginActivitySerializer(serializers.ModelSerializer):
             return obj.user.profile.role
         except:
             return 'user' if not obj.user.is_staff else 'admin'
+
+
+class LoginActivityDailySerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    role = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LoginActivityDaily
+        fields = ['id', 'username', 'role', 'day', 'login_count', 'distinct_ips', 'first_login', 'last_login', 'user']
+        read_only_fields = fields
+
+    def get_role(self, obj):
+        try:
+            return obj.user.profile.role
+        except Exception:
+            return 'user' if not obj.user.is_staff else 'admin'
+
+
+class UserDirectorySerializer(serializers.ModelSerializer):
+    """Row of the admin user directory; expects users loaded with select_related('profile')."""
+    role = serializers.SerializerMethodField()
+    location = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'email', 'first_name', 'last_name',
+            'is_active', 'is_staff', 'date_joined', 'last_login', 'role', 'location'
+        ]
+        read_only_fields = fields
+
+    def get_role(self, obj):
+        profile = getattr(obj, 'profile', None)
+        if profile is not None:
+            return profile.role
+        return 'admin' if obj.is_staff else 'user'
+
+    def get_location(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return profile.location if profile is not None else None
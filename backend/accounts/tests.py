@@ -1,3 +1,431 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from io import StringIO
+from time import monotonic
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .activity import LoginActivityBuffer
+from .authentication import user_cache
+from .checks import login_throttle_cache
+from .mail import queue_email, retry_delay
+from .models import LoginActivity, LoginActivityDaily, Profile, QueuedEmail
+from .permissions import user_role
+from .search import case_insensitive_match, next_prefix, prefix_search
+from .serializers import RoleTokenObtainPairSerializer
+
+
+class LoginThrottleTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.client = APIClient()
+
+	def attempt(self, username, ip='10.0.0.1'):
+		return self.client.post('/api/token/', {'username': username, 'password': 'wrong'}, REMOTE_ADDR=ip)
+
+	def test_username_limit_rejects_before_hashing(self):
+		with patch('rest_framework_simplejwt.serializers.authenticate', return_value=None) as authenticate:
+			for i in range(10):
+				self.assertEqual(self.attempt('alice', ip=f'10.0.0.{i}').status_code, 401)
+			# Same username from a new address, with different case and padding
+			response = self.attempt('  ALICE ', ip='10.0.1.1')
+		self.assertEqual(response.status_code, 429)
+		self.assertEqual(authenticate.call_count, 10)
+
+	def test_ip_limit_covers_every_username(self):
+		with patch('rest_framework_simplejwt.serializers.authenticate', return_value=None) as authenticate:
+			for i in range(30):
+				self.assertEqual(self.attempt(f'user{i}').status_code, 401)
+			response = self.attempt('someone-else')
+		self.assertEqual(response.status_code, 429)
+		self.assertEqual(authenticate.call_count, 30)
+
+	def test_blocked_attempts_are_counted_and_reset(self):
+		with patch('rest_framework_simplejwt.serializers.authenticate', return_value=None):
+			for i in range(12):
+				self.attempt('alice', ip=f'10.0.0.{i}')
+		admin = User.objects.create_user(username='admin', password='unused', is_staff=True)
+		self.client.force_authenticate(admin)
+
+		response = self.client.get('/api/login-throttle/')
+		self.assertEqual(response.data['blocked'], {'login_ip': 0, 'login_username': 2})
+
+		self.assertEqual(self.client.delete('/api/login-throttle/').status_code, 204)
+		response = self.client.get('/api/login-throttle/')
+		self.assertEqual(response.data['blocked'], {'login_ip': 0, 'login_username': 0})
+
+
+class CacheCheckTests(SimpleTestCase):
+	def test_database_cache_is_flagged(self):
+		caches = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+		with self.settings(CACHES=caches):
+			self.assertEqual([warning.id for warning in login_throttle_cache(None)], ['accounts.W001'])
+
+	def test_in_memory_cache_passes(self):
+		self.assertEqual(login_throttle_cache(None), [])
+
+
+class LoginTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username='alice', password='correct-horse')
+
+	def test_login_hashes_the_password_once(self):
+		with patch('rest_framework_simplejwt.serializers.authenticate', wraps=authenticate) as hashed, \
+				self.settings(LOGIN_ACTIVITY_BUFFER={'ENABLED': False}):
+			response = APIClient().post(
+				'/api/token/', {'username': 'alice', 'password': 'correct-horse'},
+				REMOTE_ADDR='10.0.0.7', HTTP_USER_AGENT='tests'
+			)
+		self.assertEqual(response.status_code, 200)
+		self.assertIn('access', response.data)
+		self.assertEqual(hashed.call_count, 1)
+		activity = LoginActivity.objects.get(user=self.user)
+		self.assertEqual((activity.ip_address, activity.user_agent), ('10.0.0.7', 'tests'))
+
+
+@patch.object(LoginActivityBuffer, '_ensure_thread')
+class LoginActivityBufferTests(TestCase):
+	def setUp(self):
+		self.user = User.objects.create_user(username='alice', password='unused')
+		self.buffer = LoginActivityBuffer()
+
+	def test_rows_wait_for_flush(self, ensure_thread):
+		for _ in range(3):
+			self.buffer.add(LoginActivity(user=self.user))
+		self.assertFalse(LoginActivity.objects.exists())
+		self.buffer.flush()
+		self.assertEqual(LoginActivity.objects.filter(user=self.user).count(), 3)
+
+	def test_failed_batch_falls_back_to_single_rows(self, ensure_thread):
+		self.buffer.add(LoginActivity(user=self.user))
+		self.buffer.add(LoginActivity(user_id=None))
+		self.buffer.add(LoginActivity(user=self.user))
+		with self.assertLogs('accounts.activity', 'ERROR') as logs:
+			self.buffer.flush()
+		self.assertEqual(LoginActivity.objects.filter(user=self.user).count(), 2)
+		self.assertEqual(len(logs.records), 2)  # The failed batch and the one dropped row
+
+
+class RollupLoginActivityTests(TestCase):
+	def setUp(self):
+		self.user = User.objects.create(username='alice')
+		self.day = timezone.localdate() - timedelta(days=100)
+
+	def at(self, day, hour):
+		return timezone.make_aware(datetime.combine(day, time(hour)))
+
+	def log(self, login_time, ip_address):
+		return LoginActivity.objects.create(user=self.user, login_time=login_time, ip_address=ip_address)
+
+	def roll_up(self, **options):
+		call_command('rollup_login_activity', days=90, stdout=StringIO(), **options)
+
+	def test_rolls_old_rows_into_a_daily_summary(self):
+		self.log(self.at(self.day, 9), '10.0.0.1')
+		self.log(self.at(self.day, 12), '10.0.0.2')
+		self.log(self.at(self.day, 17), '10.0.0.1')
+		recent = self.log(timezone.now(), '10.0.0.3')
+
+		self.roll_up(chunk_size=2)
+
+		summary = LoginActivityDaily.objects.get(user=self.user, day=self.day)
+		self.assertEqual(summary.login_count, 3)
+		self.assertEqual(summary.distinct_ips, 2)
+		self.assertEqual(summary.first_login, self.at(self.day, 9))
+		self.assertEqual(summary.last_login, self.at(self.day, 17))
+		self.assertEqual(list(LoginActivity.objects.values_list('id', flat=True)), [recent.id])
+
+	def test_merges_into_an_existing_summary(self):
+		# Left by an earlier run that was interrupted, or by rows written late
+		LoginActivityDaily.objects.create(
+			user=self.user, day=self.day, login_count=4, distinct_ips=3,
+			first_login=self.at(self.day, 10), last_login=self.at(self.day, 11)
+		)
+		self.log(self.at(self.day, 8), '10.0.0.1')
+		self.log(self.at(self.day, 20), '10.0.0.1')
+
+		self.roll_up()
+
+		summary = LoginActivityDaily.objects.get(user=self.user, day=self.day)
+		self.assertEqual(summary.login_count, 6)
+		self.assertEqual(summary.distinct_ips, 3)
+		self.assertEqual(summary.first_login, self.at(self.day, 8))
+		self.assertEqual(summary.last_login, self.at(self.day, 20))
+		self.assertFalse(LoginActivity.objects.exists())
+
+	def test_days_inside_the_retention_window_are_kept(self):
+		self.log(self.at(timezone.localdate() - timedelta(days=89), 9), '10.0.0.1')
+
+		self.roll_up()
+
+		self.assertEqual(LoginActivity.objects.count(), 1)
+		self.assertFalse(LoginActivityDaily.objects.exists())
+
+
+def bearer(user):
+	return f'Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}'
+
+
+class RoleResolutionTests(TestCase):
+	def setUp(self):
+		user_cache.clear()
+		self.admin = User.objects.create_user(username='boss', email='boss@example.com', password='unused')
+		Profile.objects.create(user=self.admin, role='admin', location='Toril')
+		self.member = User.objects.create_user(username='member', email='member@example.com', password='unused')
+		Profile.objects.create(user=self.member, role='user')
+		self.client = APIClient()
+
+	def test_token_carries_role_and_location(self):
+		token = RoleTokenObtainPairSerializer.get_token(self.admin).access_token
+		self.assertEqual((token['role'], token['location']), ('admin', 'Toril'))
+
+	def test_admin_role_opens_admin_endpoints(self):
+		self.client.credentials(HTTP_AUTHORIZATION=bearer(self.admin))
+		self.assertEqual(self.client.get('/api/users/').status_code, 200)
+		self.client.credentials(HTTP_AUTHORIZATION=bearer(self.member))
+		self.assertEqual(self.client.get('/api/users/').status_code, 403)
+
+	def test_staff_flag_is_enough(self):
+		self.member.is_staff = True
+		self.member.save()
+		self.client.credentials(HTTP_AUTHORIZATION=bearer(self.member))
+		self.assertEqual(self.client.get('/api/users/').status_code, 200)
+
+	def test_profile_outranks_a_stale_claim(self):
+		self.client.credentials(HTTP_AUTHORIZATION=bearer(self.admin))
+		Profile.objects.filter(user=self.admin).update(role='user')
+		self.assertEqual(self.client.get('/api/users/').status_code, 403)
+
+	def test_claim_is_used_when_no_profile_was_joined(self):
+		user = User.objects.get(pk=self.member.pk)
+		request = SimpleNamespace(user=user, auth={'role': 'admin'})
+		with self.assertNumQueries(0):
+			self.assertEqual(user_role(request), 'admin')
+
+	def test_profile_is_looked_up_once_without_a_claim(self):
+		user = User.objects.get(pk=self.admin.pk)
+		request = SimpleNamespace(user=user, auth=None)
+		with self.assertNumQueries(1):
+			self.assertEqual(user_role(request), 'admin')
+			self.assertEqual(user_role(request), 'admin')
+
+
+class UserCacheTests(TestCase):
+	def setUp(self):
+		user_cache.clear()
+		self.admin = User.objects.create_user(username='boss', email='boss@example.com', password='unused', is_staff=True)
+		self.user = User.objects.create_user(username='member', email='member@example.com', password='unused')
+		Profile.objects.create(user=self.user, role='user')
+		self.client = APIClient()
+		self.client.credentials(HTTP_AUTHORIZATION=bearer(self.user))
+
+	def test_warm_requests_skip_authentication_queries(self):
+		self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+		with self.assertNumQueries(0):
+			response = self.client.get('/api/profile/')
+		self.assertEqual(response.data['username'], 'member')
+
+	def test_entries_expire_after_the_ttl(self):
+		self.client.get('/api/profile/')
+		User.objects.filter(pk=self.user.pk).update(email='moved@example.com')
+		self.assertEqual(self.client.get('/api/profile/').data['email'], 'member@example.com')
+		with patch('accounts.authentication.time.monotonic', return_value=monotonic() + user_cache.ttl + 1):
+			self.assertEqual(self.client.get('/api/profile/').data['email'], 'moved@example.com')
+
+	def test_deactivation_takes_effect_immediately(self):
+		self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+		admin = APIClient()
+		admin.force_authenticate(self.admin)
+		self.assertEqual(admin.post(f'/api/deactivate/{self.user.pk}/').status_code, 200)
+		self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+
+	def test_profile_update_is_seen_immediately(self):
+		self.client.get('/api/profile/')
+		response = self.client.put('/api/profile/', {'username': 'member2', 'email': 'new@example.com'}, format='json')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self.client.get('/api/profile/').data['username'], 'member2')
+
+
+class NextPrefixTests(SimpleTestCase):
+	def test_increments_last_character(self):
+		self.assertEqual(next_prefix('abc'), 'abd')
+		self.assertEqual(next_prefix('a'), 'b')
+
+	def test_bounds_every_string_with_the_prefix(self):
+		upper = next_prefix('az')
+		for value in ['az', 'aza', 'azzzz', 'az￿']:
+			self.assertTrue('az' <= value < upper, value)
+		self.assertFalse('b' < upper)
+
+
+class PrefixSearchTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		for username, email in [
+			('alice', 'alice@example.com'),
+			('Alicia', 'ally@example.com'),
+			('bob', 'alien@example.com'),
+			('al', 'carol@example.com'),
+			('malice', 'malice@example.com'),
+		]:
+			User.objects.create(username=username, email=email)
+
+	def search(self, term, fields):
+		return sorted(prefix_search(User.objects.all(), term, fields).values_list('username', flat=True))
+
+	def test_prefix_is_case_insensitive(self):
+		self.assertEqual(self.search('ALI', ['username']), ['Alicia', 'alice'])
+
+	def test_matches_any_field(self):
+		self.assertEqual(self.search('ali', ['username', 'email']), ['Alicia', 'alice', 'bob'])
+
+	def test_does_not_match_inside_the_value(self):
+		self.assertNotIn('malice', self.search('lice', ['username']))
+
+	def test_blank_term_returns_everything(self):
+		self.assertEqual(len(self.search('  ', ['username'])), 5)
+
+
+class UserDirectoryTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = User.objects.create_user(username='boss', email='boss@example.com', password='unused', is_staff=True)
+		for i in range(7):
+			user = User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='unused')
+			Profile.objects.create(user=user, role='admin' if i < 2 else 'user', location='Toril' if i % 2 else 'Matina')
+		User.objects.filter(username__in=['user5', 'user6']).update(is_active=False)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.admin)
+
+	def usernames(self, **params):
+		response = self.client.get('/api/users/', params)
+		self.assertEqual(response.status_code, 200)
+		return [row['username'] for row in response.data['results']]
+
+	def test_filters(self):
+		self.assertEqual(self.usernames(role='admin'), ['boss', 'user0', 'user1'])
+		self.assertEqual(self.usernames(active='false'), ['user5', 'user6'])
+		self.assertEqual(self.usernames(location='Toril', role='user'), ['user3', 'user5'])
+		self.assertEqual(self.usernames(search='USER1'), ['user1'])
+
+	def test_invalid_filters_are_rejected(self):
+		for params in [{'role': 'owner'}, {'active': 'maybe'}, {'location': 'Mars'}]:
+			self.assertEqual(self.client.get('/api/users/', params).status_code, 400)
+
+	def test_cursor_pages_cover_every_user_once(self):
+		response = self.client.get('/api/users/', {'page_size': 3})
+		self.assertEqual(response.data['count'], 8)
+		seen = []
+		while True:
+			seen += [row['username'] for row in response.data['results']]
+			if not response.data['next']:
+				break
+			with self.assertNumQueries(2):  # Count and page, whatever the page size
+				response = self.client.get(response.data['next'])
+		self.assertEqual(seen, sorted(seen))
+		self.assertEqual(len(seen), 8)
+
+
+class CaseInsensitiveIdentityTests(TestCase):
+	def setUp(self):
+		User.objects.create_user(username='Alice', email='Alice@Example.com', password='unused')
+		self.client = APIClient()
+
+	def register(self, username, email):
+		return self.client.post('/api/register/', {'username': username, 'email': email, 'password': 'long-enough'}, format='json')
+
+	def test_register_rejects_case_variants(self):
+		response = self.register('alice', 'new@example.com')
+		self.assertEqual(response.status_code, 400)
+		self.assertIn('username', response.data['errors'])
+		response = self.register('bob', 'ALICE@example.COM')
+		self.assertEqual(response.status_code, 400)
+		self.assertIn('email', response.data['errors'])
+		self.assertEqual(self.register('bob', 'bob@example.com').status_code, 201)
+
+	def test_profile_update_rejects_another_users_email(self):
+		bob = User.objects.create_user(username='bob', email='bob@example.com', password='unused')
+		self.client.force_authenticate(bob)
+		response = self.client.put('/api/profile/', {'username': 'bob', 'email': 'alice@example.com'}, format='json')
+		self.assertEqual(response.status_code, 400)
+		# Changing only the case of your own address is fine
+		response = self.client.put('/api/profile/', {'username': 'bob', 'email': 'BOB@example.com'}, format='json')
+		self.assertEqual(response.status_code, 200)
+
+	def test_database_enforces_unique_email(self):
+		with self.assertRaises(IntegrityError), transaction.atomic():
+			User.objects.create_user(username='other', email='alice@EXAMPLE.com')
+		# Accounts without an email are still allowed
+		User.objects.create_user(username='blank1', email='')
+		User.objects.create_user(username='blank2', email='')
+
+	def test_lookups_probe_the_lower_indexes(self):
+		for field, index in [('username', 'accounts_user_username_lower_idx'), ('email', 'accounts_user_email_lower_idx')]:
+			plan = case_insensitive_match(User.objects, field, 'ALICE').explain()
+			self.assertIn(index, plan)
+
+
+class MailQueueTests(TestCase):
+	def send(self):
+		call_command('send_queued_email', stdout=StringIO())
+
+	def test_registration_queues_the_welcome_email(self):
+		response = APIClient().post(
+			'/api/register/', {'username': 'carol', 'email': 'carol@example.com', 'password': 'long-enough'}, format='json'
+		)
+		self.assertEqual(response.status_code, 201)
+		self.assertEqual(mail.outbox, [])
+		queued = QueuedEmail.objects.get()
+		self.assertEqual((queued.to, queued.status), (['carol@example.com'], 'pending'))
+
+	def test_worker_sends_a_batch_over_one_connection(self):
+		for i in range(3):
+			queue_email(f'Hello {i}', 'Body', [f'user{i}@example.com'])
+		with patch('accounts.management.commands.send_queued_email.get_connection', wraps=get_connection) as connect:
+			self.send()
+		self.assertEqual(connect.call_count, 1)
+		self.assertEqual(sorted(message.subject for message in mail.outbox), ['Hello 0', 'Hello 1', 'Hello 2'])
+		self.assertFalse(QueuedEmail.objects.exclude(status='sent').exists())
+
+	def test_failures_back_off_and_eventually_give_up(self):
+		queued = queue_email('Hello', 'Body', ['user@example.com'])
+		with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('refused')):
+			self.send()
+			queued.refresh_from_db()
+			self.assertEqual((queued.status, queued.attempts, queued.last_error), ('pending', 1, 'refused'))
+			self.assertGreater(queued.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+			QueuedEmail.objects.filter(pk=queued.pk).update(attempts=4, next_attempt_at=timezone.now())
+			self.send()
+		queued.refresh_from_db()
+		self.assertEqual((queued.status, queued.attempts), ('failed', 5))
+
+	def test_leased_messages_are_skipped_until_the_lease_ends(self):
+		leased = queue_email('Leased', 'Body', ['user@example.com'])
+		QueuedEmail.objects.filter(pk=leased.pk).update(status='sending', next_attempt_at=timezone.now() + timedelta(minutes=5))
+		self.send()
+		self.assertEqual(mail.outbox, [])
+
+		# The worker holding it died; once the lease runs out another worker picks it up
+		QueuedEmail.objects.filter(pk=leased.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+		self.send()
+		self.assertEqual([message.subject for message in mail.outbox], ['Leased'])
+
+
+class RetryDelayTests(SimpleTestCase):
+	def test_doubles_up_to_the_cap(self):
+		delays = [retry_delay(attempts).total_seconds() for attempts in range(1, 9)]
+		self.assertEqual(delays, [60, 120, 240, 480, 960, 1920, 3600, 3600])
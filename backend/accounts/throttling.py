@@ -0,0 +1,55 @@
+import hashlib
+
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+BLOCKED_KEY = 'login_throttle_blocked:%s'
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+	"""Sliding-window limit on token requests, checked before the serializer hashes anything.
+
+	Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope]; history lives
+	in the default cache so every worker sharing it enforces the same window.
+	"""
+
+	def throttle_failure(self):
+		blocked_key = BLOCKED_KEY % self.scope
+		cache.add(blocked_key, 0, timeout=None)
+		try:
+			cache.incr(blocked_key)
+		except ValueError:
+			# Evicted between add() and incr(); losing one count is fine
+			pass
+		return False
+
+
+class LoginIPRateThrottle(LoginRateThrottle):
+	scope = 'login_ip'
+
+	def get_cache_key(self, request, view):
+		# get_ident honours NUM_PROXIES, so a forged X-Forwarded-For can't dodge the limit
+		return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginUsernameRateThrottle(LoginRateThrottle):
+	scope = 'login_username'
+
+	def get_cache_key(self, request, view):
+		username = request.data.get('username') if hasattr(request.data, 'get') else None
+		if not username:
+			return None
+		# Hashed: the username is attacker-controlled and may hold spaces or control characters
+		normalized = str(username).strip().lower()[:150]
+		return self.cache_format % {'scope': self.scope, 'ident': hashlib.sha1(normalized.encode()).hexdigest()}
+
+
+def blocked_counts():
+	"""Blocked login attempts per throttle since the counters were last reset."""
+	scopes = [LoginIPRateThrottle.scope, LoginUsernameRateThrottle.scope]
+	counts = cache.get_many([BLOCKED_KEY % scope for scope in scopes])
+	return {scope: counts.get(BLOCKED_KEY % scope, 0) for scope in scopes}
+
+
+def reset_blocked_counts():
+	cache.delete_many([BLOCKED_KEY % scope for scope in (LoginIPRateThrottle.scope, LoginUsernameRateThrottle.scope)])
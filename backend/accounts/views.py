@@ -1,61 +1,58 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework_simplejwt.views import TokenObtainPairView
-from django.core.mail import send_mail
-from django.conf import settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import datetime, time, timedelta
 import logging
 
-from .serializers import RegisterSerializer, ProfileSerializer, LoginActivitySerializer
-from .models import LoginActivity, Profile
+from imaging.pipeline import variant_urls
+from .serializers import (
+	RegisterSerializer, ProfileSerializer, LoginActivitySerializer, LoginActivityDailySerializer,
+	RoleTokenObtainPairSerializer, UserDirectorySerializer
+)
+from .models import LoginActivity, LoginActivityDaily, Profile
+from .activity import record_login
+from .mail import queue_email
+from .authentication import forget_user
+from .permissions import IsAdminRole, request_profile
+from .search import prefix_search
+from .throttling import LoginIPRateThrottle, LoginUsernameRateThrottle, blocked_counts, reset_blocked_counts
 from rest_framework.permissions import IsAuthenticated
 
 logger = logging.getLogger(__name__)
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
-	"""Custom login view that tracks login activity"""
+	"""Custom login view that tracks login activity and puts role/location claims in the token"""
+	serializer_class = RoleTokenObtainPairSerializer
+	# Over-limit attempts get a 429 before the serializer runs, so floods cost no hashing
+	throttle_classes = [LoginIPRateThrottle, LoginUsernameRateThrottle]
 	
 	def post(self, request, *args, **kwargs):
-		# Get the response from the parent class
-		response = super().post(request, *args, **kwargs)
+		# Authenticate exactly once (one password hash) and keep the resolved user
+		serializer = self.get_serializer(data=request.data)
+		try:
+			serializer.is_valid(raise_exception=True)
+		except TokenError as e:
+			raise InvalidToken(e.args[0])
 		
-		# If login was successful, track the activity
-		if response.status_code == 200:
-			try:
-				# Get the user from the validated credentials
-				from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-				serializer = TokenObtainPairSerializer(data=request.data)
-				if serializer.is_valid():
-					user = serializer.user
-					
-					# Get client IP address
-					x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-					if x_forwarded_for:
-						ip_address = x_forwarded_for.split(',')[0]
-					else:
-						ip_address = request.META.get('REMOTE_ADDR', '127.0.0.1')
-					
-					# Get user agent
-					user_agent = request.META.get('HTTP_USER_AGENT', 'Unknown')
-					
-					# Create login activity record
-					LoginActivity.objects.create(
-						user=user,
-						ip_address=ip_address,
-						user_agent=user_agent
-					)
-					logger.info(f"Login activity tracked for user: {user.username}")
-			except Exception as e:
-				logger.error(f"Failed to track login activity: {e}")
+		# Login succeeded; queue the activity record instead of writing it on the response path
+		try:
+			record_login(serializer.user, request)
+		except Exception as e:
+			logger.error(f"Failed to track login activity: {e}")
 		
-		return response
+		return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
 class RegisterView(APIView):
-	"""Registration endpoint that creates a user and sends a welcome email.
+	"""Registration endpoint that creates a user and queues a welcome email.
 
 	This view returns structured errors on validation failure and logs request data
 	to help debugging common client/server mismatch issues.
@@ -76,16 +73,23 @@ class RegisterView(APIView):
 
 		# Create the user. Role (user/admin) is handled by the serializer.create() which creates a Profile and sets is_staff for admin.
 		role = serializer.validated_data.get('role', 'user')
-		user = serializer.save()
-
-		# send welcome email (console backend in development)
+		try:
+			with transaction.atomic():
+				user = serializer.save()
+		except IntegrityError:
+			# Lost a race with a concurrent registration; the unique indexes caught it
+			return Response(
+				{'detail': 'Registration failed', 'errors': {'email': ['A user with that username or email already exists.']}},
+				status=status.HTTP_400_BAD_REQUEST
+			)
+
+		# queue the welcome email; send_queued_email delivers it outside the request
 		subject = "Welcome to Petstore"
 		message = f"Hi {user.first_name or user.username},\n\nThank you for registering at Petstore!"
-		from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@example.com')
 		try:
-			send_mail(subject, message, from_email, [user.email], fail_silently=False)
+			queue_email(subject, message, [user.email])
 		except Exception:
-			logger.exception('Failed to send welcome email')
+			logger.exception('Failed to queue welcome email')
 
 		# Return created username and role for client-side convenience
 		user_role = role
@@ -110,241 +114,243 @@ class ProfileView(APIView):
 			'is_staff': user.is_staff,
 			'is_superuser': user.is_superuser,
 		}
-		# include profile picture URL if available
-		try:
-			profile = user.profile
-			if profile and getattr(profile, 'profile_picture', None):
-				# build absolute url
-				pic_url = request.build_absolute_uri(profile.profile_picture.url)
-				data['profile_picture'] = pic_url
-			else:
-				data['profile_picture'] = None
-			# include role if present
-			data['role'] = getattr(profile, 'role', 'user')
-		except Exception:
+		# include profile picture URL if available (profile shared with the permission check)
+		profile = request_profile(request)
+		if profile is not None and profile.profile_picture_status in ('pending', 'processing'):
+			# The worker finishes in another process; don't report a stale status from the auth cache
+			profile.refresh_from_db(fields=['profile_picture', 'profile_picture_status'])
+		if profile and getattr(profile, 'profile_picture', None):
+			# build absolute url
+			pic_url = request.build_absolute_uri(profile.profile_picture.url)
+			data['profile_picture'] = pic_url
+		else:
 			data['profile_picture'] = None
-			data['role'] = 'user'
+		data['profile_picture_status'] = getattr(profile, 'profile_picture_status', None) if data['profile_picture'] else None
+		data['profile_picture_variants'] = variant_urls(
+			getattr(profile, 'profile_picture', None), getattr(profile, 'profile_picture_status', None), request
+		)
+		# include role if present
+		data['role'] = getattr(profile, 'role', 'user')
 		return Response(data)
 
 	def put(self, request):
-		user = request.user
+		# request.user comes from the auth cache and may be stale; saving it would write old
+		# is_active/password/role values back, so writes always start from the database row
+		user = User.objects.select_related('profile').get(pk=request.user.pk)
 		# Accept both JSON and multipart/form-data (with files)
 		serializer = ProfileSerializer(data=request.data, context={'user': user})
 		if not serializer.is_valid():
 			return Response({'detail': 'Update failed', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
-		serializer.update(user, serializer.validated_data)
+		try:
+			with transaction.atomic():
+				serializer.update(user, serializer.validated_data)
+		except IntegrityError:
+			return Response(
+				{'detail': 'Update failed', 'errors': {'email': ['A user with that username or email already exists.']}},
+				status=status.HTTP_400_BAD_REQUEST
+			)
 
 		# Handle profile picture upload
-		try:
-			profile = user.profile
-		except Exception:
-			profile = None
+		profile = getattr(user, 'profile', None)
 
 		file = request.FILES.get('profile_picture')
 		if file:
 			if not profile:
-				from .models import Profile
 				profile = Profile.objects.create(user=user, role='user')
 			profile.profile_picture = file
-			profile.save()
+			profile.save(update_fields=['profile_picture', 'profile_picture_status'])
+
+		# Username/email/password may have changed; don't serve the old user from the auth cache
+		forget_user(user.pk)
 
 		# return updated profile info including picture url
 		resp = {'detail': 'Profile updated'}
 		if profile and getattr(profile, 'profile_picture', None):
 			resp['profile_picture'] = request.build_absolute_uri(profile.profile_picture.url)
+			resp['profile_picture_status'] = profile.profile_picture_status
+			resp['profile_picture_variants'] = variant_urls(profile.profile_picture, profile.profile_picture_status, request)
 		return Response(resp)
 
+
 class ActivityLogPagination(PageNumberPagination):
 	page_size = 15
+	page_size_query_param = 'page_size'
+	max_page_size = 150
+
+
+class ActivityLogCursorPagination(CursorPagination):
+	"""Keyset pages on login_time; stays fast however deep the client scrolls."""
+	page_size = 15
+	page_size_query_param = 'page_size'
 	max_page_size = 150
+	ordering = ('-login_time', '-id')
+
+	def get_paginated_response(self, data):
+		return Response({
+			'count': self.count,
+			'next': self.get_next_link(),
+			'previous': self.get_previous_link(),
+			'results': data
+		})
+
+
+def parse_day_bound(value, end=False):
+	"""Turn a YYYY-MM-DD filter into an aware datetime (start of day, or start of the next day)."""
+	day = datetime.strptime(value, '%Y-%m-%d').date()
+	if end:
+		day += timedelta(days=1)
+	return timezone.make_aware(datetime.combine(day, time.min))
 
 
 class LoginActivityListView(APIView):
-	permission_classes = [IsAuthenticated]
+	permission_classes = [IsAuthenticated, IsAdminRole]
 	
 	def get(self, request):
-		user = request.user
-		
-		# Check if user is admin (same pattern as ProfileView)
+		# Filters: ?user=<id>, ?date_from=YYYY-MM-DD, ?date_to=YYYY-MM-DD (inclusive)
+		activities = LoginActivity.objects.all()
 		try:
-			profile = user.profile
-			role = getattr(profile, 'role', 'user')
-		except Exception:
-			role = 'user'
-		
-		if not (user.is_staff or user.is_superuser or role == 'admin'):
-			return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-			
-		# Get all activities ordered by most recent first
-		activities = LoginActivity.objects.all().order_by('-login_time')
-		serializer = LoginActivitySerializer(activities, many=True)
+			if request.GET.get('user'):
+				activities = activities.filter(user_id=int(request.GET['user']))
+			if request.GET.get('date_from'):
+				activities = activities.filter(login_time__gte=parse_day_bound(request.GET['date_from']))
+			if request.GET.get('date_to'):
+				activities = activities.filter(login_time__lt=parse_day_bound(request.GET['date_to'], end=True))
+		except ValueError:
+			return Response({'error': 'Invalid user or date filter'}, status=status.HTTP_400_BAD_REQUEST)
 		
-		# Manual pagination
-		page = int(request.GET.get('page', 1))
-		page_size = 15
-		start = (page - 1) * page_size
-		end = start + page_size
+		# ?cursor= (or no ?page=) uses keyset pages; ?page=N keeps numbered pages for the existing screen.
+		# Either way only one page is loaded, with user and profile joined, plus one COUNT(*).
+		if 'page' in request.GET and 'cursor' not in request.GET:
+			paginator = ActivityLogPagination()
+		else:
+			paginator = ActivityLogCursorPagination()
+			paginator.count = activities.count()
 		
-		paginated_data = serializer.data[start:end]
-		total_count = len(serializer.data)
+		page = paginator.paginate_queryset(
+			activities.select_related('user__profile').order_by('-login_time', '-id'), request, view=self
+		)
+		serializer = LoginActivitySerializer(page, many=True)
+		return paginator.get_paginated_response(serializer.data)
+
+
+class LoginActivityDailyCursorPagination(ActivityLogCursorPagination):
+	ordering = ('-day', '-id')
+
+
+class LoginActivityDailyListView(APIView):
+	"""Daily login summaries for activity older than the raw retention window (see rollup_login_activity)."""
+	permission_classes = [IsAuthenticated, IsAdminRole]
+	
+	def get(self, request):
+		# Same filters as the raw activity list: ?user=<id>, ?date_from=YYYY-MM-DD, ?date_to=YYYY-MM-DD
+		days = LoginActivityDaily.objects.all()
+		try:
+			if request.GET.get('user'):
+				days = days.filter(user_id=int(request.GET['user']))
+			if request.GET.get('date_from'):
+				days = days.filter(day__gte=datetime.strptime(request.GET['date_from'], '%Y-%m-%d').date())
+			if request.GET.get('date_to'):
+				days = days.filter(day__lte=datetime.strptime(request.GET['date_to'], '%Y-%m-%d').date())
+		except ValueError:
+			return Response({'error': 'Invalid user or date filter'}, status=status.HTTP_400_BAD_REQUEST)
 		
-		return Response({
-			'count': total_count,
-			'next': None,
-			'previous': None,
-			'results': paginated_data
-		})
+		paginator = LoginActivityDailyCursorPagination()
+		paginator.count = days.count()
+		page = paginator.paginate_queryset(days.select_related('user__profile'), request, view=self)
+		serializer = LoginActivityDailySerializer(page, many=True)
+		return paginator.get_paginated_response(serializer.data)
+
+
+class LoginThrottleStatsView(APIView):
+	"""Blocked login attempt counters per throttle; DELETE resets them."""
+	permission_classes = [IsAuthenticated, IsAdminRole]
+	
+	def get(self, request):
+		return Response({'blocked': blocked_counts()})
+	
+	def delete(self, request):
+		reset_blocked_counts()
+		return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class DeactivateUserView(APIView):
-	permission_classes = [IsAuthenticated]
+	permission_classes = [IsAuthenticated, IsAdminRole]
 	
 	def post(self, request, user_id):
-		user = request.user
-		
-		# Check if user is admin (same pattern as ProfileView)
-		try:
-			profile = user.profile
-			role = getattr(profile, 'role', 'user')
-		except Exception:
-			role = 'user'
-		
-		if not (user.is_staff or user.is_superuser or role == 'admin'):
-			return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-			
 		try:
 			user_to_deactivate = User.objects.get(id=user_id)
 			user_to_deactivate.is_active = False
 			user_to_deactivate.save()
+			forget_user(user_to_deactivate.pk)
 			return Response({'detail': 'User deactivated successfully'}, status=status.HTTP_200_OK)
 		except User.DoesNotExist:
 			return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class DeactivatedUsersView(APIView):
-	permission_classes = [IsAuthenticated]
-	
-	def get(self, request):
-		user = request.user
-		
-		# Check if user is admin
-		try:
-			profile = user.profile
-			role = getattr(profile, 'role', 'user')
-		except Exception:
-			role = 'user'
-		
-		if not (user.is_staff or user.is_superuser or role == 'admin'):
-			return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-			
-		# Get all deactivated users
-		deactivated_users = User.objects.filter(is_active=False)
-		users_data = []
-		
-		for user in deactivated_users:
-			user_info = {
-				'id': user.id,
-				'username': user.username,
-				'email': user.email,
-				'date_joined': user.date_joined,
-				'last_login': user.last_login,
-				'role': 'user'
-			}
-			
-			# Get role from profile if exists
-			try:
-				if hasattr(user, 'profile'):
-					user_info['role'] = user.profile.role
-			except Exception:
-				pass
-				
-			users_data.append(user_info)
-		
-		return Response(users_data)
-
-
 class ReactivateUserView(APIView):
-	permission_classes = [IsAuthenticated]
+	permission_classes = [IsAuthenticated, IsAdminRole]
 	
 	def post(self, request, user_id):
-		user = request.user
-		
-		# Check if user is admin
-		try:
-			profile = user.profile
-			role = getattr(profile, 'role', 'user')
-		except Exception:
-			role = 'user'
-		
-		if not (user.is_staff or user.is_superuser or role == 'admin'):
-			return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-			
 		try:
 			user_to_reactivate = User.objects.get(id=user_id)
 			user_to_reactivate.is_active = True
 			user_to_reactivate.save()
+			forget_user(user_to_reactivate.pk)
 			return Response({'detail': 'User reactivated successfully'}, status=status.HTTP_200_OK)
 		except User.DoesNotExist:
 			return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class StaffListView(APIView):
-	permission_classes = [IsAuthenticated]
+class UserDirectoryCursorPagination(ActivityLogCursorPagination):
+	page_size = 25
+	ordering = ('username',)
+
+
+class UserDirectoryView(APIView):
+	"""Paginated admin directory of all accounts.
+
+	Filters: ?role=admin|user, ?active=true|false, ?location=Matina|Toril,
+	?search=<prefix of username or email>. Pages follow the username index.
+	"""
+	permission_classes = [IsAuthenticated, IsAdminRole]
 	
 	def get(self, request):
-		user = request.user
+		users = User.objects.select_related('profile')
 		
-		# Check if user is admin
-		try:
-			profile = user.profile
-			role = getattr(profile, 'role', 'user')
-		except Exception:
-			role = 'user'
+		role = request.GET.get('role')
+		if role == 'admin':
+			users = users.filter(Q(profile__role='admin') | Q(is_staff=True))
+		elif role == 'user':
+			users = users.filter(is_staff=False, is_superuser=False).exclude(profile__role='admin')
+		elif role:
+			return Response({'error': 'Invalid role. Must be admin or user'}, status=status.HTTP_400_BAD_REQUEST)
 		
-		if not (user.is_staff or user.is_superuser or role == 'admin'):
-			return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-			
-		# Get all admin/staff users
-		admin_users = User.objects.filter(profile__role='admin') | User.objects.filter(is_staff=True)
-		admin_users = admin_users.distinct()
+		active = request.GET.get('active')
+		if active in ('true', 'false'):
+			users = users.filter(is_active=(active == 'true'))
+		elif active:
+			return Response({'error': 'Invalid active filter. Must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
 		
-		staff_data = []
-		for staff_user in admin_users:
-			user_info = {
-				'id': staff_user.id,
-				'username': staff_user.username,
-				'email': staff_user.email,
-				'location': 'Matina'  # Default
-			}
-			
-			# Get location from profile if exists
-			try:
-				if hasattr(staff_user, 'profile') and hasattr(staff_user.profile, 'location'):
-					user_info['location'] = staff_user.profile.location
-			except Exception:
-				pass
-				
-			staff_data.append(user_info)
+		location = request.GET.get('location')
+		if location:
+			if location not in dict(Profile.LOCATION_CHOICES):
+				return Response({'error': 'Invalid location. Must be Matina or Toril'}, status=status.HTTP_400_BAD_REQUEST)
+			users = users.filter(profile__location=location)
 		
-		return Response(staff_data)
+		if request.GET.get('search'):
+			users = prefix_search(users, request.GET['search'], ['username', 'email'])
+		
+		paginator = UserDirectoryCursorPagination()
+		paginator.count = users.count()
+		page = paginator.paginate_queryset(users, request, view=self)
+		serializer = UserDirectorySerializer(page, many=True)
+		return paginator.get_paginated_response(serializer.data)
 
 
 class UpdateStaffLocationView(APIView):
-	permission_classes = [IsAuthenticated]
+	permission_classes = [IsAuthenticated, IsAdminRole]
 	
 	def post(self, request, user_id):
-		user = request.user
-		
-		# Check if user is admin
-		try:
-			profile = user.profile
-			role = getattr(profile, 'role', 'user')
-		except Exception:
-			role = 'user'
-		
-		if not (user.is_staff or user.is_superuser or role == 'admin'):
-			return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
-			
 		location = request.data.get('location')
 		if not location or location not in ['Matina', 'Toril']:
 			return Response({'error': 'Invalid location. Must be Matina or Toril'}, status=status.HTTP_400_BAD_REQUEST)
@@ -354,6 +360,7 @@ class UpdateStaffLocationView(APIView):
 			profile, created = Profile.objects.get_or_create(user=staff_user)
 			profile.location = location
 			profile.save()
+			forget_user(staff_user.pk)
 			return Response({'detail': 'Location updated successfully', 'location': location}, status=status.HTTP_200_OK)
 		except User.DoesNotExist:
 			return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Appointment
+from .models import Appointment, BranchSchedule, BranchClosure
 
 
 @admin.register(Appointment)
@@ -9,3 +9,16 @@ class AppointmentAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'service__service_name', 'notes']
     readonly_fields = ['created_at', 'updated_at', 'end_time']
     date_hierarchy = 'appointment_date'
+
+
+@admin.register(BranchSchedule)
+class BranchScheduleAdmin(admin.ModelAdmin):
+    list_display = ['branch', 'opening_time', 'closing_time', 'slot_interval_minutes', 'stations', 'updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(BranchClosure)
+class BranchClosureAdmin(admin.ModelAdmin):
+    list_display = ['date', 'branch', 'reason']
+    list_filter = ['branch']
+    date_hierarchy = 'date'
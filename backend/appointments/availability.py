@@ -0,0 +1,231 @@
+import time as _time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Appointment, BranchClosure, BranchSchedule
+
+
+# Appointments in these statuses occupy their time slot
+ACTIVE_STATUSES = ['pending', 'confirmed']
+
+# Longest window the calendar endpoint will compute in one request
+MAX_RANGE_DAYS = 62
+
+# Computed slots are keyed by a version stamp, so entries never need to be deleted;
+# bumping the stamp makes the old ones unreachable until they expire.
+CACHE_TIMEOUT = 60 * 60 * 6
+
+
+class LoadProfile:
+    """How many stations are busy at each moment of a day, built from booked intervals.
+
+    The day is stored as a step function: sorted change points and the load that
+    holds from each point until the next. Building it is O(n log n) in the number
+    of bookings and each lookup is a binary search plus a scan of the points
+    inside the requested window.
+    """
+
+    def __init__(self, intervals):
+        deltas = defaultdict(int)
+        for start_time, end_time in intervals:
+            deltas[start_time] += 1
+            deltas[end_time] -= 1
+        self.points = sorted(deltas)
+        self.loads = []
+        load = 0
+        for point in self.points:
+            load += deltas[point]
+            self.loads.append(load)
+
+    def peak(self, start_time, end_time):
+        """Highest number of concurrent bookings anywhere in [start_time, end_time)."""
+        index = bisect_right(self.points, start_time) - 1
+        peak = self.loads[index] if index >= 0 else 0
+        index += 1
+        while index < len(self.points) and self.points[index] < end_time:
+            peak = max(peak, self.loads[index])
+            index += 1
+        return peak
+
+
+def blocking_appointments(branch, start_date, end_date=None):
+    """Active non-overlapping appointments for a branch, one query for the whole window."""
+    queryset = Appointment.objects.filter(
+        branch=branch,
+        status__in=ACTIVE_STATUSES,
+        service__may_overlap=False  # Only consider non-overlapping services as blocking
+    )
+    if end_date is None:
+        queryset = queryset.filter(appointment_date=start_date)
+    else:
+        queryset = queryset.filter(appointment_date__range=(start_date, end_date))
+    return queryset.order_by('appointment_date', 'start_time').values_list(
+        'appointment_date', 'start_time', 'end_time'
+    )
+
+
+def bucket_by_day(booked):
+    """Group (date, start, end) rows into {date: [(start, end), ...]}."""
+    buckets = defaultdict(list)
+    for appointment_date, start_time, end_time in booked:
+        buckets[appointment_date].append((start_time, end_time))
+    return buckets
+
+
+def branch_schedule(branch):
+    """Return (schedule, closed_dates) for a branch, cached until any schedule changes.
+
+    Branches without a BranchSchedule row get an unsaved one with the default
+    hours (8 AM - 5 PM, every 30 minutes, one station).
+    """
+    key = f'availability:schedule:{branch}:{_generation()}'
+    cached = cache.get(key)
+    if cached is None:
+        schedule = BranchSchedule.objects.filter(branch=branch).first() or BranchSchedule(branch=branch)
+        closed_dates = frozenset(
+            BranchClosure.objects.filter(Q(branch=branch) | Q(branch='')).values_list('date', flat=True)
+        )
+        cached = (schedule, closed_dates)
+        cache.set(key, cached, CACHE_TIMEOUT)
+    return cached
+
+
+def end_time_for(appointment_date, start_time, duration_minutes):
+    return (datetime.combine(appointment_date, start_time) + timedelta(minutes=duration_minutes)).time()
+
+
+def compute_slots(appointment_date, duration_minutes, may_overlap, booked_intervals, schedule, closed_dates):
+    """Return the free slots of one day given the (start, end) intervals already booked."""
+    if not schedule.is_open(appointment_date, closed_dates):
+        return []
+    # A schedule saved around validation (e.g. queryset.update) must not make the loop below spin forever
+    if schedule.slot_interval_minutes < 1 or duration_minutes < 1:
+        return []
+
+    profile = LoadProfile(booked_intervals)
+    available_slots = []
+    current_time = datetime.combine(appointment_date, schedule.opening_time)
+    end_of_day = datetime.combine(appointment_date, schedule.closing_time)
+
+    while current_time < end_of_day:
+        slot_start = current_time.time()
+        slot_end = (current_time + timedelta(minutes=duration_minutes)).time()
+
+        # Check if slot end time is within business hours
+        if slot_end > schedule.closing_time or slot_end <= slot_start:
+            break
+
+        # If service allows overlap, always show as available (within business hours)
+        if may_overlap:
+            free_stations = schedule.stations
+        else:
+            free_stations = schedule.stations - profile.peak(slot_start, slot_end)
+
+        if free_stations > 0:
+            available_slots.append({
+                'start_time': slot_start.strftime('%H:%M'),
+                'end_time': slot_end.strftime('%H:%M'),
+                'display': f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}",
+                'free_stations': free_stations
+            })
+
+        # Move to next slot
+        current_time += timedelta(minutes=schedule.slot_interval_minutes)
+
+    return available_slots
+
+
+def _new_version():
+    # Time-based so a stamp that was evicted never comes back with a value it had before
+    return _time.time_ns()
+
+
+def _version_key(branch, appointment_date):
+    return f'availability:version:{branch}:{appointment_date.isoformat()}'
+
+
+def _slots_key(branch, appointment_date, version, generation, duration_minutes, may_overlap):
+    return (
+        f'availability:slots:{branch}:{appointment_date.isoformat()}:{generation}:{version}:'
+        f'{duration_minutes}:{int(bool(may_overlap))}'
+    )
+
+
+def _generation():
+    generation = cache.get('availability:generation')
+    if generation is None:
+        cache.add('availability:generation', _new_version(), None)
+        generation = cache.get('availability:generation')
+    return generation
+
+
+def _versions(branch, dates):
+    keys = {_version_key(branch, d): d for d in dates}
+    found = cache.get_many(keys.keys())
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, None)
+        found.update(cache.get_many(missing.keys()))
+    return {keys[key]: found[key] for key in keys}
+
+
+def invalidate_availability(branch, appointment_date):
+    """Drop cached availability for one branch/day after an appointment there changed."""
+    key = _version_key(branch, appointment_date)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def invalidate_all_availability():
+    """Drop every cached day, e.g. after a service or a branch schedule changed."""
+    cache.set('availability:generation', _new_version(), None)
+
+
+def cached_range_slots(branch, start_date, end_date, duration_minutes, may_overlap):
+    """Return {date: slots} for every day in the range, computing only the days not cached.
+
+    Days missing from the cache are computed from a single appointment query that
+    spans just those days.
+    """
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        dates.append(current_date)
+        current_date += timedelta(days=1)
+
+    generation = _generation()
+    versions = _versions(branch, dates)
+    keys = {
+        d: _slots_key(branch, d, versions[d], generation, duration_minutes, may_overlap)
+        for d in dates
+    }
+    found = cache.get_many(keys.values())
+    result = {d: found[keys[d]] for d in dates if keys[d] in found}
+
+    missing = [d for d in dates if d not in result]
+    if missing:
+        schedule, closed_dates = branch_schedule(branch)
+        booked_by_day = {}
+        if not may_overlap:
+            booked_by_day = bucket_by_day(blocking_appointments(branch, missing[0], missing[-1]))
+        computed = {}
+        for d in missing:
+            result[d] = compute_slots(
+                d, duration_minutes, may_overlap, booked_by_day.get(d, []), schedule, closed_dates
+            )
+            computed[keys[d]] = result[d]
+        cache.set_many(computed, CACHE_TIMEOUT)
+
+    return result
+
+
+def cached_day_slots(branch, appointment_date, duration_minutes, may_overlap):
+    """Free slots for one branch/day, served from the cache when the day has not changed."""
+    return cached_range_slots(branch, appointment_date, appointment_date, duration_minutes, may_overlap)[appointment_date]
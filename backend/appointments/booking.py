@@ -0,0 +1,161 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from .availability import ACTIVE_STATUSES, LoadProfile, branch_schedule, bucket_by_day, invalidate_availability
+from .models import Appointment, BookingLock
+
+
+class SlotUnavailable(Exception):
+    """Raised when every station is already booked at some point of the requested time."""
+
+
+def lock_booking_day(branch, appointment_date):
+    """Serialize bookings for one branch/day until the surrounding transaction ends.
+
+    The lock row is written (not just read) so the row lock is taken on databases
+    with row-level locking and the write lock is taken up front on SQLite. Other
+    branches and days use other rows and are not blocked. Must be called inside
+    transaction.atomic().
+    """
+    locked = BookingLock.objects.filter(branch=branch, date=appointment_date).update(
+        acquisitions=F('acquisitions') + 1
+    )
+    if locked:
+        return
+    try:
+        with transaction.atomic():
+            BookingLock.objects.create(branch=branch, date=appointment_date, acquisitions=1)
+    except IntegrityError:
+        # Another booking created the row first; wait on it like everyone else
+        BookingLock.objects.filter(branch=branch, date=appointment_date).update(
+            acquisitions=F('acquisitions') + 1
+        )
+
+
+def lock_booking_days(branch, dates):
+    """Lock several days of one branch at once, in date order so batches cannot deadlock.
+
+    Must be called inside transaction.atomic().
+    """
+    BookingLock.objects.bulk_create(
+        [BookingLock(branch=branch, date=d) for d in dates], ignore_conflicts=True
+    )
+    list(BookingLock.objects.select_for_update().filter(branch=branch, date__in=dates).order_by('date'))
+    BookingLock.objects.filter(branch=branch, date__in=dates).update(acquisitions=F('acquisitions') + 1)
+
+
+def has_free_station(branch, appointment_date, start_time, end_time, stations, exclude_id=None):
+    """Whether fewer than `stations` active non-overlapping appointments run at any point of [start_time, end_time)."""
+    queryset = Appointment.objects.filter(
+        branch=branch,
+        appointment_date=appointment_date,
+        status__in=ACTIVE_STATUSES
+    ).filter(
+        Q(start_time__lt=end_time) & Q(end_time__gt=start_time)
+    ).exclude(
+        # Exclude appointments with services that allow overlap
+        service__may_overlap=True
+    )
+    if exclude_id is not None:
+        queryset = queryset.exclude(id=exclude_id)
+    profile = LoadProfile(queryset.values_list('start_time', 'end_time'))
+    return profile.peak(start_time, end_time) < stations
+
+
+def book_appointment(user, service, pet, branch, appointment_date, start_time, end_time, notes=''):
+    """Check capacity and create the appointment atomically under the day's lock."""
+    schedule, _ = branch_schedule(branch)
+    with transaction.atomic():
+        lock_booking_day(branch, appointment_date)
+
+        # Check capacity only if service doesn't allow overlap
+        if not service.may_overlap and not has_free_station(
+            branch, appointment_date, start_time, end_time, schedule.stations
+        ):
+            raise SlotUnavailable()
+
+        appointment = Appointment.objects.create(
+            user=user,
+            service=service,
+            pet=pet,
+            branch=branch,
+            appointment_date=appointment_date,
+            start_time=start_time,
+            end_time=end_time,
+            notes=notes,
+            status='pending'
+        )
+
+    invalidate_availability(branch, appointment_date)
+    return appointment
+
+
+def change_appointment_status(appointment, new_status):
+    """Save a status change, re-checking capacity when an inactive appointment becomes active again."""
+    reactivating = appointment.status not in ACTIVE_STATUSES and new_status in ACTIVE_STATUSES
+    with transaction.atomic():
+        if reactivating:
+            schedule, _ = branch_schedule(appointment.branch)
+            lock_booking_day(appointment.branch, appointment.appointment_date)
+            if not appointment.service.may_overlap and not has_free_station(
+                appointment.branch, appointment.appointment_date,
+                appointment.start_time, appointment.end_time, schedule.stations,
+                exclude_id=appointment.id
+            ):
+                raise SlotUnavailable()
+        appointment.status = new_status
+        appointment.save()
+
+    invalidate_availability(appointment.branch, appointment.appointment_date)
+    return appointment
+
+
+def book_recurring(user, service, pet, branch, dates, start_time, end_time, notes=''):
+    """Book the same time on many days with one conflict query and one bulk insert.
+
+    Returns one result per date: 'booked' with the new appointment, 'closed' when
+    the branch is closed that day, or 'unavailable' when every station is taken.
+    """
+    schedule, closed_dates = branch_schedule(branch)
+    open_dates = [d for d in dates if schedule.is_open(d, closed_dates)]
+    results = {d: {'date': d, 'status': 'closed', 'appointment': None} for d in dates}
+
+    with transaction.atomic():
+        if open_dates:
+            lock_booking_days(branch, open_dates)
+
+        booked_by_day = {}
+        if open_dates and not service.may_overlap:
+            booked_by_day = bucket_by_day(Appointment.objects.filter(
+                branch=branch,
+                appointment_date__in=open_dates,
+                status__in=ACTIVE_STATUSES,
+                service__may_overlap=False,
+                start_time__lt=end_time,
+                end_time__gt=start_time
+            ).values_list('appointment_date', 'start_time', 'end_time'))
+
+        accepted = []
+        for d in open_dates:
+            if not service.may_overlap and LoadProfile(booked_by_day.get(d, [])).peak(start_time, end_time) >= schedule.stations:
+                results[d]['status'] = 'unavailable'
+                continue
+            results[d]['status'] = 'booked'
+            accepted.append(Appointment(
+                user=user,
+                service=service,
+                pet=pet,
+                branch=branch,
+                appointment_date=d,
+                start_time=start_time,
+                end_time=end_time,
+                notes=notes,
+                status='pending'
+            ))
+
+        for appointment in Appointment.objects.bulk_create(accepted):
+            results[appointment.appointment_date]['appointment'] = appointment
+
+    for appointment in accepted:
+        invalidate_availability(branch, appointment.appointment_date)
+    return [results[d] for d in dates]
@@ -0,0 +1,156 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time as _time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What Django does with no OPTIONS: rollback journal, synchronous=FULL, deferred BEGIN,
+# and the sqlite3 module's 5 second busy timeout
+STOCK_PROFILE = {'transaction_mode': None, 'timeout': 5.0, 'pragmas': []}
+
+
+def configured_profile():
+    options = settings.DATABASES['default'].get('OPTIONS', {})
+    return {
+        'transaction_mode': options.get('transaction_mode'),
+        'timeout': options.get('timeout', 5.0),
+        'pragmas': [command.strip() for command in options.get('init_command', '').split(';') if command.strip()],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent reads and booking-style writes on a scratch SQLite file, with the stock '
+        'settings and with the profile configured in DATABASES["default"]["OPTIONS"]. Run it with '
+        '--settings chonkyweb_backend.settings_production to measure the production profile'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Threads running read queries')
+        parser.add_argument('--writers', type=int, default=4, help='Threads running read-then-write transactions')
+        parser.add_argument('--seconds', type=float, default=5.0, help='How long each profile runs')
+        parser.add_argument('--rows', type=int, default=20000, help='Rows seeded before the run')
+
+    def handle(self, *args, **options):
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('The default database is not SQLite')
+
+        results = []
+        for label, profile in [('stock', STOCK_PROFILE), ('configured', configured_profile())]:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.seed(path, profile, options['rows'])
+                self.stdout.write(self.style.WARNING(
+                    f"Running {label} profile: {options['readers']} readers, {options['writers']} writers "
+                    f"for {options['seconds']:.0f}s..."
+                ))
+                results.append((label, self.run(path, profile, options)))
+
+        self.stdout.write('')
+        self.stdout.write(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'locked':>9}{'write p95 ms':>14}")
+        for label, result in results:
+            self.stdout.write(
+                f"{label:<12}{result['reads'] / result['elapsed']:>10.0f}{result['writes'] / result['elapsed']:>10.0f}"
+                f"{result['locked']:>9}{result['p95']:>14.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS('\n✓ "locked" counts transactions that failed with "database is locked"'))
+
+    def connect(self, path, profile):
+        # Autocommit at the driver level; transactions are opened explicitly like Django does
+        connection = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        for pragma in profile['pragmas']:
+            connection.execute(pragma)
+        return connection
+
+    def seed(self, path, profile, rows):
+        connection = self.connect(path, profile)
+        connection.execute(
+            'CREATE TABLE booking (id INTEGER PRIMARY KEY, branch TEXT, day INTEGER, slot INTEGER, notes TEXT)'
+        )
+        connection.execute('CREATE INDEX booking_branch_day ON booking (branch, day)')
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO booking (branch, day, slot, notes) VALUES (?, ?, ?, ?)',
+            [(random.choice('MT'), random.randrange(365), random.randrange(18), 'x' * 64) for _ in range(rows)]
+        )
+        connection.execute('COMMIT')
+        connection.close()
+
+    def run(self, path, profile, options):
+        begin = f"BEGIN {profile['transaction_mode']}" if profile['transaction_mode'] else 'BEGIN'
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {'reads': 0, 'writes': 0, 'locked': 0}
+        latencies = []
+
+        def reader():
+            connection = self.connect(path, profile)
+            reads = locked = 0
+            try:
+                while not stop.is_set():
+                    start = random.randrange(330)
+                    try:
+                        # The calendar's shape: a month of one branch, counted per day
+                        connection.execute(
+                            'SELECT day, COUNT(*) FROM booking WHERE branch = ? AND day BETWEEN ? AND ? GROUP BY day',
+                            (random.choice('MT'), start, start + 31)
+                        ).fetchall()
+                        reads += 1
+                    except sqlite3.OperationalError:
+                        locked += 1
+            finally:
+                connection.close()
+                with lock:
+                    totals['reads'] += reads
+                    totals['locked'] += locked
+
+        def writer():
+            connection = self.connect(path, profile)
+            writes = locked = 0
+            local_latencies = []
+            try:
+                while not stop.is_set():
+                    branch, day = random.choice('MT'), random.randrange(365)
+                    started = _time.perf_counter()
+                    try:
+                        # book_appointment's shape: check capacity, then insert, in one transaction
+                        connection.execute(begin)
+                        connection.execute(
+                            'SELECT COUNT(*) FROM booking WHERE branch = ? AND day = ?', (branch, day)
+                        ).fetchone()
+                        connection.execute(
+                            'INSERT INTO booking (branch, day, slot, notes) VALUES (?, ?, ?, ?)',
+                            (branch, day, random.randrange(18), 'x' * 64)
+                        )
+                        connection.execute('COMMIT')
+                        writes += 1
+                        local_latencies.append(_time.perf_counter() - started)
+                    except sqlite3.OperationalError:
+                        locked += 1
+                        if connection.in_transaction:
+                            connection.execute('ROLLBACK')
+            finally:
+                connection.close()
+                with lock:
+                    totals['writes'] += writes
+                    totals['locked'] += locked
+                    latencies.extend(local_latencies)
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        started = _time.monotonic()
+        for thread in threads:
+            thread.start()
+        _time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        totals['elapsed'] = _time.monotonic() - started
+
+        latencies.sort()
+        totals['p95'] = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+        return totals
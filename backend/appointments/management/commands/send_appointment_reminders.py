@@ -0,0 +1,96 @@
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from appointments.availability import ACTIVE_STATUSES
+from appointments.models import Appointment, AppointmentReminder
+
+# kind: (days before the appointment, when it is as worded in the subject)
+REMINDERS = {
+    'day_before': (1, 'tomorrow'),
+    'week_before': (7, 'in one week'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Send appointment reminders ("your appointment is tomorrow" by default) in batches. '
+        'Safe to re-run: sent reminders are recorded per kind.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', choices=sorted(REMINDERS), default='day_before',
+            help='Which reminder to send; each kind is recorded separately'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Appointments loaded and mailed per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Count what would be sent without sending')
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        days_ahead, when = REMINDERS[kind]
+        target_date = timezone.localdate() + timedelta(days=days_ahead)
+        from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@example.com')
+
+        # Walks the (appointment_date, start_time, status) index; already reminded rows are skipped
+        pending = Appointment.objects.filter(
+            appointment_date=target_date,
+            status__in=ACTIVE_STATUSES
+        ).exclude(
+            Exists(AppointmentReminder.objects.filter(appointment=OuterRef('pk'), kind=kind))
+        ).select_related('user', 'service').order_by('start_time', 'id')
+
+        self.stdout.write(self.style.WARNING(f'Sending reminders for appointments on {target_date}...'))
+
+        connection = None
+        if not options['dry_run']:
+            connection = get_connection()
+            connection.open()
+        sent = skipped = 0
+        last_time, last_id = time.min, 0
+        while True:
+            # Keyset pagination: each batch starts after the last (start_time, id) seen
+            batch = list(pending.filter(
+                Q(start_time__gt=last_time) | Q(start_time=last_time, id__gt=last_id)
+            )[:options['batch_size']])
+            if not batch:
+                break
+            last_time, last_id = batch[-1].start_time, batch[-1].id
+
+            messages = []
+            for appointment in batch:
+                if not appointment.user.email:
+                    skipped += 1
+                    continue
+                messages.append(EmailMessage(
+                    f'Reminder: your appointment is {when}',
+                    f"Hi {appointment.user.first_name or appointment.user.username},\n\n"
+                    f"This is a reminder that your {appointment.service.service_name} appointment at our "
+                    f"{appointment.branch} branch is on {appointment.appointment_date.strftime('%B %d, %Y')} "
+                    f"at {appointment.start_time.strftime('%I:%M %p')}.\n\nSee you there!",
+                    from_email,
+                    [appointment.user.email]
+                ))
+
+            if options['dry_run']:
+                sent += len(messages)
+                continue
+
+            # One connection for the whole run; record the batch only after it went out
+            sent += connection.send_messages(messages) or 0
+            AppointmentReminder.objects.bulk_create(
+                [AppointmentReminder(appointment=appointment, kind=kind) for appointment in batch],
+                ignore_conflicts=True
+            )
+
+        if connection is not None:
+            connection.close()
+
+        verb = 'Would send' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(f'✓ {verb} {sent} reminders'))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'✓ Skipped {skipped} appointments without an email address'))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.CharField(choices=[('Matina', 'Matina'), ('Toril', 'Toril')], max_length=20)),
+                ('date', models.DateField()),
+                ('acquisitions', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('branch', 'date'), name='unique_booking_lock')],
+            },
+        ),
+    ]
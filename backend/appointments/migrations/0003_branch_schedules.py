@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:01
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_bookinglock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BranchClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.CharField(blank=True, choices=[('Matina', 'Matina'), ('Toril', 'Toril')], max_length=20)),
+                ('date', models.DateField()),
+                ('reason', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BranchSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.CharField(choices=[('Matina', 'Matina'), ('Toril', 'Toril')], max_length=20, unique=True)),
+                ('opening_time', models.TimeField(default=datetime.time(8, 0))),
+                ('closing_time', models.TimeField(default=datetime.time(17, 0))),
+                ('slot_interval_minutes', models.PositiveIntegerField(default=30)),
+                ('stations', models.PositiveIntegerField(default=1)),
+                ('closed_weekdays', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='appointment',
+            name='unique_active_appointment_slot',
+        ),
+        migrations.AddConstraint(
+            model_name='branchclosure',
+            constraint=models.UniqueConstraint(fields=('branch', 'date'), name='unique_branch_closure'),
+        ),
+    ]
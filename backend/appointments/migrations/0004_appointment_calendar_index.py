@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_branch_schedules'),
+        ('pets', '0002_petprofile_branch'),
+        ('services', '0003_service_may_overlap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'branch', 'status'], name='appt_date_branch_status_idx'),
+        ),
+    ]
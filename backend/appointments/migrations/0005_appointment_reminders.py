@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointment_calendar_index'),
+        ('pets', '0002_petprofile_branch'),
+        ('services', '0003_service_may_overlap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('day_before', 'Day before')], default='day_before', max_length=20)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'start_time', 'status'], name='appt_date_time_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='appointmentreminder',
+            name='appointment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='appointments.appointment'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointmentreminder',
+            constraint=models.UniqueConstraint(fields=('appointment', 'kind'), name='unique_appointment_reminder'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:38
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_appointment_reminders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='branchschedule',
+            name='slot_interval_minutes',
+            field=models.PositiveIntegerField(default=30, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='branchschedule',
+            name='stations',
+            field=models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_branchschedule_validators'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointmentreminder',
+            name='kind',
+            field=models.CharField(choices=[('day_before', 'Day before'), ('week_before', 'Week before')], default='day_before', max_length=20),
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+from datetime import time
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from services.models import Service
 from pets.models import PetProfile
@@ -31,13 +35,11 @@ class Appointment(models.Model):
     
     class Meta:
         ordering = ['appointment_date', 'start_time']
-        # Prevent double booking - no overlapping appointments
-        constraints = [
-            models.UniqueConstraint(
-                fields=['branch', 'appointment_date', 'start_time'],
-                condition=models.Q(status__in=['pending', 'confirmed']),
-                name='unique_active_appointment_slot'
-            )
+        # Double booking is prevented by the capacity check under BookingLock, since a
+        # branch with several stations can take more than one appointment at a time.
+        indexes = [
+            models.Index(fields=['appointment_date', 'branch', 'status'], name='appt_date_branch_status_idx'),
+            models.Index(fields=['appointment_date', 'start_time', 'status'], name='appt_date_time_status_idx'),
         ]
     
     def __str__(self):
@@ -46,3 +48,108 @@ class Appointment(models.Model):
     @property
     def duration_minutes(self):
         return self.service.duration_minutes
+
+
+class BookingLock(models.Model):
+    """One row per branch and day. Bookings lock it so the overlap check and insert are atomic."""
+    branch = models.CharField(max_length=20, choices=Appointment.BRANCH_CHOICES)
+    date = models.DateField()
+    acquisitions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['branch', 'date'], name='unique_booking_lock')
+        ]
+
+    def __str__(self):
+        return f"{self.branch} - {self.date}"
+
+
+class AppointmentReminder(models.Model):
+    """A reminder that has been sent for an appointment. At most one per appointment and kind."""
+    KIND_CHOICES = [
+        ('day_before', 'Day before'),
+        ('week_before', 'Week before'),
+    ]
+
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='reminders')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='day_before')
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['appointment', 'kind'], name='unique_appointment_reminder')
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} reminder for appointment #{self.appointment_id}"
+
+
+class BranchSchedule(models.Model):
+    """Opening hours and capacity of a branch. Branches without a row use the field defaults."""
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    branch = models.CharField(max_length=20, choices=Appointment.BRANCH_CHOICES, unique=True)
+    opening_time = models.TimeField(default=time(8, 0))
+    closing_time = models.TimeField(default=time(17, 0))
+    slot_interval_minutes = models.PositiveIntegerField(default=30, validators=[MinValueValidator(1)])
+    stations = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])  # Appointments that can run at the same time
+    closed_weekdays = models.JSONField(default=list, blank=True)  # Weekday numbers, 0 = Monday
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.branch} {self.opening_time}-{self.closing_time} ({self.stations} stations)"
+
+    def clean(self):
+        if self.opening_time is not None and self.closing_time is not None and self.closing_time <= self.opening_time:
+            raise ValidationError({'closing_time': 'Closing time must be after opening time.'})
+
+    def is_open(self, day, closed_dates):
+        return day.weekday() not in self.closed_weekdays and day not in closed_dates
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # After commit, or a concurrent lookup could cache the old hours under the new generation
+        from .availability import invalidate_all_availability
+        transaction.on_commit(invalidate_all_availability)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from .availability import invalidate_all_availability
+        transaction.on_commit(invalidate_all_availability)
+        return result
+
+
+class BranchClosure(models.Model):
+    """A day a branch is closed, e.g. a holiday. A blank branch closes every branch."""
+    branch = models.CharField(max_length=20, choices=Appointment.BRANCH_CHOICES, blank=True)
+    date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['branch', 'date'], name='unique_branch_closure')
+        ]
+
+    def __str__(self):
+        return f"{self.branch or 'All branches'} closed on {self.date}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .availability import invalidate_all_availability
+        transaction.on_commit(invalidate_all_availability)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from .availability import invalidate_all_availability
+        transaction.on_commit(invalidate_all_availability)
+        return result
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from rest_framework import serializers
 from .models import Appointment
 from services.serializers import ServiceSerializer
@@ -35,3 +36,30 @@ class CreateAppointmentSerializer(serializers.Serializer):
     appointment_date = serializers.DateField()
     start_time = serializers.TimeField()
     notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class RecurringAppointmentSerializer(serializers.Serializer):
+    """Either a rule (start_date, interval_weeks, occurrences) or an explicit list of dates"""
+    service = serializers.IntegerField()
+    pet = serializers.IntegerField(required=False, allow_null=True)
+    user = serializers.IntegerField(required=False, allow_null=True)  # Admins may book for a customer
+    branch = serializers.ChoiceField(choices=[('Matina', 'Matina'), ('Toril', 'Toril')])
+    start_time = serializers.TimeField()
+    start_date = serializers.DateField(required=False)
+    interval_weeks = serializers.IntegerField(required=False, default=4, min_value=1, max_value=52)
+    occurrences = serializers.IntegerField(required=False, default=6, min_value=1, max_value=52)
+    dates = serializers.ListField(child=serializers.DateField(), required=False, max_length=52)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        if not data.get('dates') and not data.get('start_date'):
+            raise serializers.ValidationError('Provide either dates or start_date.')
+        return data
+
+    def expand_dates(self):
+        """The occurrence dates in order, without duplicates."""
+        data = self.validated_data
+        if data.get('dates'):
+            return sorted(set(data['dates']))
+        step = timedelta(weeks=data['interval_weeks'])
+        return [data['start_date'] + step * i for i in range(data['occurrences'])]
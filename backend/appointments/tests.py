@@ -0,0 +1,433 @@
+import random
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from services.catalog import service_catalog
+from services.models import Service
+
+from .availability import ACTIVE_STATUSES, LoadProfile, branch_schedule, end_time_for
+from .booking import SlotUnavailable, book_appointment
+from .models import Appointment, AppointmentReminder, BookingLock, BranchClosure, BranchSchedule
+
+
+class LoadProfileTests(SimpleTestCase):
+    def test_empty_day_has_no_load(self):
+        self.assertEqual(LoadProfile([]).peak(time(9), time(17)), 0)
+
+    def test_overlapping_intervals_stack(self):
+        profile = LoadProfile([
+            (time(9), time(11)),
+            (time(10), time(12)),
+            (time(10, 30), time(11)),
+        ])
+        self.assertEqual(profile.peak(time(9), time(17)), 3)
+        self.assertEqual(profile.peak(time(9), time(10)), 1)
+        self.assertEqual(profile.peak(time(11), time(12)), 1)
+
+    def test_back_to_back_intervals_do_not_overlap(self):
+        profile = LoadProfile([(time(9), time(10)), (time(10), time(11))])
+        self.assertEqual(profile.peak(time(9), time(11)), 1)
+
+    def test_window_is_half_open(self):
+        profile = LoadProfile([(time(10), time(11))])
+        # Ends exactly when the booking starts, and starts exactly when it ends
+        self.assertEqual(profile.peak(time(9), time(10)), 0)
+        self.assertEqual(profile.peak(time(11), time(12)), 0)
+        self.assertEqual(profile.peak(time(10, 59), time(11, 30)), 1)
+
+    def test_window_inside_a_booking(self):
+        profile = LoadProfile([(time(9), time(12)), (time(9), time(12))])
+        self.assertEqual(profile.peak(time(10), time(10, 30)), 2)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Book overlapping appointments from many threads at once; no branch may be overbooked.
+
+    TransactionTestCase so book_appointment's own transactions really commit and
+    the threads contend for the booking lock. The test database is a file (see
+    DATABASES['default']['TEST']), so each thread's connection waits on SQLite's
+    write lock like a real worker instead of failing with "table is locked".
+    """
+
+    THREADS = 8
+    ATTEMPTS = 10
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='booking-stress-test', password='unused')
+        self.service = Service.objects.create(
+            service_name='Booking stress test', description='Scratch service', duration_minutes=60
+        )
+
+    def test_no_branch_is_overbooked(self):
+        # One day per branch, so far more attempts than stations and most must be turned away
+        day = date.today() + timedelta(days=30)
+        branches = [code for code, _ in Appointment.BRANCH_CHOICES]
+
+        # Every start on each branch's grid whose end still fits in business hours
+        schedules = {branch: branch_schedule(branch)[0] for branch in branches}
+        starts = {}
+        for branch, schedule in schedules.items():
+            starts[branch] = []
+            current = datetime.combine(day, schedule.opening_time)
+            while end_time_for(day, current.time(), self.service.duration_minutes) <= schedule.closing_time:
+                starts[branch].append(current.time())
+                current += timedelta(minutes=schedule.slot_interval_minutes)
+
+        counts = defaultdict(int)
+        counts_lock = threading.Lock()
+
+        def worker():
+            local = defaultdict(int)
+            try:
+                for _ in range(self.ATTEMPTS):
+                    branch = random.choice(branches)
+                    start_time = random.choice(starts[branch])
+                    try:
+                        book_appointment(
+                            user=self.user, service=self.service, pet=None,
+                            branch=branch, appointment_date=day, start_time=start_time,
+                            end_time=end_time_for(day, start_time, self.service.duration_minutes)
+                        )
+                        local['booked'] += 1
+                    except SlotUnavailable:
+                        local['rejected'] += 1
+                    except OperationalError:
+                        local['lock_timeouts'] += 1
+            finally:
+                connection.close()
+                with counts_lock:
+                    for key, value in local.items():
+                        counts[key] += value
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        attempts = self.THREADS * self.ATTEMPTS
+        self.assertEqual(counts['lock_timeouts'], 0)
+        self.assertEqual(counts['booked'] + counts['rejected'], attempts)
+        self.assertGreater(counts['booked'], 0)
+        self.assertGreater(counts['rejected'], 0)
+        # Every booking went through the branch/day lock (rejected attempts roll theirs back)
+        self.assertEqual(sum(BookingLock.objects.values_list('acquisitions', flat=True)), counts['booked'])
+
+        booked = Appointment.objects.filter(service=self.service, status__in=ACTIVE_STATUSES)
+        self.assertEqual(booked.count(), counts['booked'])
+
+        intervals = defaultdict(list)
+        for branch, start_time, end_time in booked.values_list('branch', 'start_time', 'end_time'):
+            intervals[branch].append((start_time, end_time))
+        for branch, day_intervals in intervals.items():
+            schedule = schedules[branch]
+            peak = LoadProfile(day_intervals).peak(schedule.opening_time, schedule.closing_time)
+            self.assertLessEqual(peak, schedule.stations, f'{branch} overbooked')
+
+
+class AvailabilityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        service_catalog.clear()
+        self.user = User.objects.create_user(username='customer', password='unused')
+        self.service = Service.objects.create(
+            service_name='Grooming', description='Full groom', duration_minutes=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.day = date.today() + timedelta(days=7)
+        self.other_day = self.day + timedelta(days=1)
+
+    def slots(self, day):
+        response = self.client.get('/api/appointments/available-slots/', {
+            'date': day.isoformat(), 'branch': 'Matina', 'service': self.service.id
+        })
+        self.assertEqual(response.status_code, 200)
+        return [slot['start_time'] for slot in response.data['available_slots']]
+
+    def book(self, day, start_time):
+        response = self.client.post('/api/appointments/create/', {
+            'service': self.service.id, 'branch': 'Matina',
+            'appointment_date': day.isoformat(), 'start_time': start_time
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def test_repeat_lookup_does_not_touch_the_database(self):
+        first = self.slots(self.day)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.slots(self.day), first)
+
+    def test_booking_invalidates_only_its_day(self):
+        self.assertIn('08:00', self.slots(self.day))
+        self.slots(self.other_day)
+
+        self.book(self.day, '08:00')
+
+        self.assertNotIn('08:00', self.slots(self.day))
+        with self.assertNumQueries(0):
+            self.assertIn('08:00', self.slots(self.other_day))
+
+    def test_cancelling_frees_the_slot(self):
+        appointment_id = self.book(self.day, '08:00')
+        self.assertNotIn('08:00', self.slots(self.day))
+
+        response = self.client.patch(f'/api/appointments/{appointment_id}/status/', {'status': 'cancelled'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertIn('08:00', self.slots(self.day))
+
+    def test_admin_status_change_invalidates_the_day(self):
+        appointment_id = self.book(self.day, '08:00')
+        admin = User.objects.create_user(username='admin', password='unused', is_staff=True)
+        self.client.force_authenticate(admin)
+        self.assertNotIn('08:00', self.slots(self.day))
+
+        response = self.client.patch(f'/api/appointments/admin/{appointment_id}/status/', {'status': 'cancelled'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertIn('08:00', self.slots(self.day))
+
+
+class BranchScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = date.today() + timedelta(days=7)
+
+    def test_schedule_change_is_picked_up_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            BranchSchedule.objects.create(branch='Matina', stations=3, opening_time=time(9))
+        schedule, _ = branch_schedule('Matina')
+        self.assertEqual((schedule.stations, schedule.opening_time), (3, time(9)))
+
+    def test_closure_closes_the_day(self):
+        branch_schedule('Matina')
+        with self.captureOnCommitCallbacks(execute=True):
+            BranchClosure.objects.create(branch='', date=self.day, reason='Holiday')
+        schedule, closed_dates = branch_schedule('Matina')
+        self.assertFalse(schedule.is_open(self.day, closed_dates))
+        self.assertTrue(schedule.is_open(self.day + timedelta(days=1), closed_dates))
+
+    def test_invalid_schedules_are_rejected(self):
+        schedule = BranchSchedule(
+            branch='Toril', opening_time=time(17), closing_time=time(8), slot_interval_minutes=0, stations=0
+        )
+        with self.assertRaises(ValidationError) as raised:
+            schedule.full_clean()
+        self.assertEqual(
+            sorted(raised.exception.message_dict), ['closing_time', 'slot_interval_minutes', 'stations']
+        )
+
+
+class RecurringBookingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        service_catalog.clear()
+        self.user = User.objects.create_user(username='customer', password='unused')
+        self.service = Service.objects.create(
+            service_name='Grooming', description='Full groom', duration_minutes=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = date.today() + timedelta(days=7)
+
+    def book(self, **data):
+        return self.client.post('/api/appointments/recurring/', {
+            'service': self.service.id, 'branch': 'Matina', 'start_time': '10:00', **data
+        }, format='json')
+
+    def test_rule_books_every_occurrence(self):
+        response = self.book(start_date=self.start.isoformat(), interval_weeks=2, occurrences=4)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['booked'], 4)
+        self.assertEqual(
+            list(Appointment.objects.values_list('appointment_date', flat=True)),
+            [self.start + timedelta(weeks=2 * i) for i in range(4)]
+        )
+
+    def test_closed_and_full_days_are_skipped(self):
+        closed, full, free = self.start, self.start + timedelta(days=1), self.start + timedelta(days=2)
+        BranchClosure.objects.create(branch='Matina', date=closed)
+        Appointment.objects.create(
+            user=self.user, service=self.service, branch='Matina', appointment_date=full,
+            start_time=time(10, 30), end_time=time(11, 30)
+        )
+        cache.clear()
+
+        response = self.book(dates=[free.isoformat(), full.isoformat(), closed.isoformat()])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [(occurrence['date'], occurrence['status']) for occurrence in response.data['occurrences']],
+            [(closed.isoformat(), 'closed'), (full.isoformat(), 'unavailable'), (free.isoformat(), 'booked')]
+        )
+        self.assertEqual((response.data['booked'], response.data['skipped']), (1, 2))
+
+    def test_nothing_booked_is_a_400(self):
+        BranchClosure.objects.create(branch='', date=self.start)
+        cache.clear()
+        response = self.book(dates=[self.start.isoformat()])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_queries_do_not_grow_with_occurrences(self):
+        def count(start, occurrences):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.book(start_date=start.isoformat(), occurrences=occurrences).status_code, 201)
+            return len(queries)
+
+        # The first request also loads the service catalog and the branch schedule
+        count(self.start, 1)
+        self.assertEqual(count(self.start + timedelta(days=1), 2), count(self.start + timedelta(days=2), 12))
+
+    def test_only_staff_book_for_someone_else(self):
+        other = User.objects.create_user(username='other', password='unused')
+        response = self.book(dates=[self.start.isoformat()], user=other.id)
+        self.assertEqual(Appointment.objects.get(id=response.data['occurrences'][0]['appointment']['id']).user, self.user)
+
+        admin = User.objects.create_user(username='admin', password='unused', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.book(dates=[(self.start + timedelta(days=1)).isoformat()], user=other.id)
+        self.assertEqual(Appointment.objects.get(id=response.data['occurrences'][0]['appointment']['id']).user, other)
+
+
+class AdminAppointmentListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='customer', password='unused')
+        self.service = Service.objects.create(
+            service_name='Grooming', description='Full groom', duration_minutes=60
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='unused', is_staff=True))
+        self.day = date(2030, 3, 4)
+
+    def appointment(self, day, hour, status='pending', branch='Matina', minutes=60):
+        start = datetime.combine(day, time(hour))
+        return Appointment.objects.create(
+            user=self.user, service=self.service, branch=branch, appointment_date=day,
+            start_time=start.time(), end_time=(start + timedelta(minutes=minutes)).time(), status=status
+        )
+
+    def test_calendar_aggregates_per_day_branch_and_status(self):
+        self.appointment(self.day, 8)
+        self.appointment(self.day, 9, minutes=90)
+        self.appointment(self.day, 10, status='cancelled')
+        self.appointment(self.day, 8, branch='Toril')
+        self.appointment(self.day + timedelta(days=1), 8, status='confirmed')
+        self.appointment(self.day + timedelta(days=40), 8)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/appointments/admin/calendar/', {
+                'start_date': '2030-03-01', 'end_date': '2030-03-31'
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['days'], [
+            {'date': '2030-03-04', 'branch': 'Matina', 'status': 'cancelled', 'count': 1, 'booked_minutes': 60},
+            {'date': '2030-03-04', 'branch': 'Matina', 'status': 'pending', 'count': 2, 'booked_minutes': 150},
+            {'date': '2030-03-04', 'branch': 'Toril', 'status': 'pending', 'count': 1, 'booked_minutes': 60},
+            {'date': '2030-03-05', 'branch': 'Matina', 'status': 'confirmed', 'count': 1, 'booked_minutes': 60},
+        ])
+
+    def test_calendar_rejects_long_ranges(self):
+        response = self.client.get('/api/appointments/admin/calendar/', {
+            'start_date': '2030-01-01', 'end_date': '2030-06-01'
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pages_cover_every_appointment_once(self):
+        expected = [self.appointment(self.day + timedelta(days=i // 8), 8 + i % 8).id for i in range(20)]
+        seen = []
+        url = '/api/appointments/admin/all/?page_size=7'
+        while url:
+            response = self.client.get(url)
+            seen += [appointment['id'] for appointment in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_without_paging_parameters_the_plain_list_is_kept(self):
+        self.appointment(self.day, 8)
+        response = self.client.get('/api/appointments/admin/all/')
+        self.assertIsInstance(response.data, list)
+
+    def test_status_filter_takes_several_statuses(self):
+        self.appointment(self.day, 8)
+        self.appointment(self.day, 9, status='confirmed')
+        self.appointment(self.day, 10, status='cancelled')
+        response = self.client.get('/api/appointments/admin/all/', {'status': 'pending,confirmed', 'page_size': 50})
+        self.assertEqual(sorted(a['status'] for a in response.data['results']), ['confirmed', 'pending'])
+
+
+class AppointmentReminderTests(TestCase):
+    def setUp(self):
+        self.service = Service.objects.create(
+            service_name='Grooming', description='Full groom', duration_minutes=60
+        )
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+
+    def appointment(self, day, hour=9, email=None, status='pending'):
+        username = f'user{User.objects.count()}'
+        if email is None:
+            email = f'{username}@example.com'
+        user = User.objects.create_user(username=username, email=email, password='unused')
+        return Appointment.objects.create(
+            user=user, service=self.service, branch='Matina', appointment_date=day,
+            start_time=time(hour), end_time=time(hour + 1), status=status
+        )
+
+    def remind(self, **options):
+        call_command('send_appointment_reminders', stdout=StringIO(), **options)
+
+    def test_reminds_active_appointments_tomorrow_in_batches(self):
+        reminded = [self.appointment(self.tomorrow, hour) for hour in (8, 9, 10)]
+        self.appointment(self.tomorrow, 11, status='cancelled')
+        self.appointment(self.tomorrow + timedelta(days=1))
+
+        self.remind(batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].subject, 'Reminder: your appointment is tomorrow')
+        self.assertEqual(
+            set(AppointmentReminder.objects.values_list('appointment_id', 'kind')),
+            {(appointment.id, 'day_before') for appointment in reminded}
+        )
+
+    def test_rerun_sends_nothing_new(self):
+        self.appointment(self.tomorrow)
+        self.remind()
+        self.remind()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_week_before_does_not_suppress_the_day_before_reminder(self):
+        appointment = self.appointment(timezone.localdate() + timedelta(days=7))
+        self.remind(kind='week_before')
+        self.assertEqual(mail.outbox[0].subject, 'Reminder: your appointment is in one week')
+
+        appointment.appointment_date = self.tomorrow
+        appointment.save()
+        self.remind()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            sorted(AppointmentReminder.objects.values_list('kind', flat=True)), ['day_before', 'week_before']
+        )
+
+    def test_dry_run_and_missing_email_send_nothing(self):
+        self.appointment(self.tomorrow, email='')
+        self.appointment(self.tomorrow, 10)
+        self.remind(dry_run=True)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(AppointmentReminder.objects.exists())
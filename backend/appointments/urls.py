@@ -1,20 +1,26 @@
 from django.urls import path
 from .views import (
     CreateAppointmentView,
+    RecurringAppointmentView,
     AppointmentListView,
     AdminAppointmentListView,
+    AdminAppointmentCalendarView,
     AppointmentDetailView,
     UpdateAppointmentStatusView,
     AdminUpdateAppointmentStatusView,
-    AvailableTimeSlotsView
+    AvailableTimeSlotsView,
+    AvailabilityCalendarView
 )
 
 urlpatterns = [
     path('', AppointmentListView.as_view(), name='appointment-list'),
     path('admin/all/', AdminAppointmentListView.as_view(), name='admin-appointment-list'),
+    path('admin/calendar/', AdminAppointmentCalendarView.as_view(), name='admin-appointment-calendar'),
     path('create/', CreateAppointmentView.as_view(), name='appointment-create'),
+    path('recurring/', RecurringAppointmentView.as_view(), name='appointment-recurring'),
     path('<int:pk>/', AppointmentDetailView.as_view(), name='appointment-detail'),
     path('<int:pk>/status/', UpdateAppointmentStatusView.as_view(), name='appointment-update-status'),
     path('admin/<int:pk>/status/', AdminUpdateAppointmentStatusView.as_view(), name='admin-appointment-update-status'),
     path('available-slots/', AvailableTimeSlotsView.as_view(), name='available-time-slots'),
+    path('availability-calendar/', AvailabilityCalendarView.as_view(), name='availability-calendar'),
 ]
@@ -2,12 +2,19 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q
-from datetime import datetime, timedelta, time
+from rest_framework.pagination import CursorPagination
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from datetime import datetime, timedelta
 from .models import Appointment
-from services.models import Service
+from .availability import (
+    MAX_RANGE_DAYS, branch_schedule, cached_day_slots, cached_range_slots, end_time_for,
+    invalidate_availability
+)
+from .booking import SlotUnavailable, book_appointment, book_recurring, change_appointment_status
+from services.catalog import service_catalog
 from pets.models import PetProfile
-from .serializers import AppointmentSerializer, CreateAppointmentSerializer
+from django.contrib.auth.models import User
+from .serializers import AppointmentSerializer, CreateAppointmentSerializer, RecurringAppointmentSerializer
 
 
 class CreateAppointmentView(APIView):
@@ -21,9 +28,8 @@ class CreateAppointmentView(APIView):
         validated_data = serializer.validated_data
         
         # Get service
-        try:
-            service = Service.objects.get(id=validated_data['service'])
-        except Service.DoesNotExist:
+        service = service_catalog.get(validated_data['service'])
+        if service is None:
             return Response({'error': 'Service not found'}, status=status.HTTP_404_NOT_FOUND)
         
         # Get pet if provided
@@ -35,52 +41,108 @@ class CreateAppointmentView(APIView):
                 return Response({'error': 'Pet not found or does not belong to you'}, status=status.HTTP_404_NOT_FOUND)
         
         # Calculate end time
-        start_datetime = datetime.combine(validated_data['appointment_date'], validated_data['start_time'])
-        end_datetime = start_datetime + timedelta(minutes=service.duration_minutes)
-        end_time = end_datetime.time()
+        end_time = end_time_for(validated_data['appointment_date'], validated_data['start_time'], service.duration_minutes)
         
-        # Validate business hours (8 AM - 5 PM)
-        business_start = time(8, 0)
-        business_end = time(17, 0)
+        # Validate the branch's business hours and closures
+        schedule, closed_dates = branch_schedule(validated_data['branch'])
+        if not schedule.is_open(validated_data['appointment_date'], closed_dates):
+            return Response({
+                'error': f"The {validated_data['branch']} branch is closed on this date. Please choose another date."
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        if validated_data['start_time'] < business_start or end_time > business_end:
+        if (validated_data['start_time'] < schedule.opening_time or end_time > schedule.closing_time
+                or end_time <= validated_data['start_time']):
             return Response({
-                'error': f'Appointment must be between 8:00 AM and 5:00 PM. Your selected time would end at {end_time.strftime("%I:%M %p")}'
+                'error': f'Appointment must be between {schedule.opening_time.strftime("%I:%M %p")} and '
+                         f'{schedule.closing_time.strftime("%I:%M %p")}. Your selected time would end at {end_time.strftime("%I:%M %p")}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check for overlapping appointments only if service doesn't allow overlap
-        if not service.may_overlap:
-            overlapping = Appointment.objects.filter(
+        # Overlap check and insert run under the branch/day lock so concurrent bookings can't both win
+        try:
+            appointment = book_appointment(
+                user=request.user,
+                service=service,
+                pet=pet,
                 branch=validated_data['branch'],
                 appointment_date=validated_data['appointment_date'],
-                status__in=['pending', 'confirmed']
-            ).filter(
-                Q(start_time__lt=end_time) & Q(end_time__gt=validated_data['start_time'])
-            ).exclude(
-                # Exclude appointments with services that allow overlap
-                service__may_overlap=True
+                start_time=validated_data['start_time'],
+                end_time=end_time,
+                notes=validated_data.get('notes', '')
             )
-            
-            if overlapping.exists():
-                return Response({
-                    'error': 'This time slot is already booked. Please choose another time.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Create appointment
-        appointment = Appointment.objects.create(
-            user=request.user,
+        except SlotUnavailable:
+            return Response({
+                'error': 'This time slot is fully booked. Please choose another time.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        appointment_serializer = AppointmentSerializer(appointment)
+        return Response(appointment_serializer.data, status=status.HTTP_201_CREATED)
+
+
+class RecurringAppointmentView(APIView):
+    """Book the same service and time on many dates (a recurring rule or an explicit list)"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = RecurringAppointmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        validated_data = serializer.validated_data
+        
+        # Admins may book on behalf of a customer; everyone else books for themselves
+        owner = request.user
+        if validated_data.get('user') and request.user.is_staff:
+            try:
+                owner = User.objects.get(id=validated_data['user'])
+            except User.DoesNotExist:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        service = service_catalog.get(validated_data['service'])
+        if service is None:
+            return Response({'error': 'Service not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        pet = None
+        if validated_data.get('pet'):
+            try:
+                pet = PetProfile.objects.get(id=validated_data['pet'], owner=owner)
+            except PetProfile.DoesNotExist:
+                return Response({'error': 'Pet not found or does not belong to this user'}, status=status.HTTP_404_NOT_FOUND)
+        
+        start_time = validated_data['start_time']
+        dates = serializer.expand_dates()
+        end_time = end_time_for(dates[0], start_time, service.duration_minutes)
+        
+        # Every occurrence uses the same time, so business hours are checked once
+        schedule, _ = branch_schedule(validated_data['branch'])
+        if start_time < schedule.opening_time or end_time > schedule.closing_time or end_time <= start_time:
+            return Response({
+                'error': f'Appointment must be between {schedule.opening_time.strftime("%I:%M %p")} and '
+                         f'{schedule.closing_time.strftime("%I:%M %p")}. Your selected time would end at {end_time.strftime("%I:%M %p")}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = book_recurring(
+            user=owner,
             service=service,
             pet=pet,
             branch=validated_data['branch'],
-            appointment_date=validated_data['appointment_date'],
-            start_time=validated_data['start_time'],
+            dates=dates,
+            start_time=start_time,
             end_time=end_time,
-            notes=validated_data.get('notes', ''),
-            status='pending'
+            notes=validated_data.get('notes', '')
         )
         
-        appointment_serializer = AppointmentSerializer(appointment)
-        return Response(appointment_serializer.data, status=status.HTTP_201_CREATED)
+        occurrences = [{
+            'date': result['date'].strftime('%Y-%m-%d'),
+            'status': result['status'],
+            'appointment': AppointmentSerializer(result['appointment']).data if result['appointment'] else None
+        } for result in results]
+        booked_count = sum(1 for result in results if result['status'] == 'booked')
+        
+        return Response({
+            'booked': booked_count,
+            'skipped': len(results) - booked_count,
+            'occurrences': occurrences
+        }, status=status.HTTP_201_CREATED if booked_count else status.HTTP_400_BAD_REQUEST)
 
 
 class AppointmentListView(generics.ListAPIView):
@@ -99,18 +161,34 @@ class AppointmentListView(generics.ListAPIView):
         return queryset
 
 
+class AppointmentCursorPagination(CursorPagination):
+    """Cursor pages for the admin list. Only used when the client asks for it with
+    ?cursor= or ?page_size=, so existing callers still get the plain list."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('appointment_date', 'start_time', 'id')
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
 class AdminAppointmentListView(generics.ListAPIView):
     """Admin can see all appointments"""
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = AppointmentCursorPagination
     
     def get_queryset(self):
-        queryset = Appointment.objects.all().select_related('user', 'service', 'pet')
+        queryset = Appointment.objects.all().select_related('user', 'service', 'pet', 'pet__owner')
         
         # Filters
         status_filter = self.request.query_params.get('status')
         if status_filter:
-            queryset = queryset.filter(status=status_filter)
+            # Comma-separated, e.g. ?status=pending,confirmed for the upcoming view
+            queryset = queryset.filter(status__in=status_filter.split(','))
         
         branch_filter = self.request.query_params.get('branch')
         if branch_filter:
@@ -120,9 +198,64 @@ class AdminAppointmentListView(generics.ListAPIView):
         if date_filter:
             queryset = queryset.filter(appointment_date=date_filter)
         
+        start_filter = self.request.query_params.get('start_date')
+        if start_filter:
+            queryset = queryset.filter(appointment_date__gte=start_filter)
+        
+        end_filter = self.request.query_params.get('end_date')
+        if end_filter:
+            queryset = queryset.filter(appointment_date__lte=end_filter)
+        
         return queryset
 
 
+class AdminAppointmentCalendarView(APIView):
+    """Admin calendar overview: per-day, per-branch, per-status counts and booked minutes"""
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    
+    def get(self, request):
+        start_str = request.query_params.get('start_date')
+        end_str = request.query_params.get('end_date')
+        
+        if not all([start_str, end_str]):
+            return Response({'error': 'start_date and end_date are required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response({'error': 'Invalid date'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if end_date < start_date:
+            return Response({'error': 'end_date must not be before start_date'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return Response({'error': f'Date range cannot exceed {MAX_RANGE_DAYS} days'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = Appointment.objects.filter(appointment_date__range=(start_date, end_date))
+        
+        branch_filter = request.query_params.get('branch')
+        if branch_filter:
+            queryset = queryset.filter(branch=branch_filter)
+        
+        # GROUP BY in the database; only the aggregates come back
+        rows = queryset.values('appointment_date', 'branch', 'status').annotate(
+            count=Count('id'),
+            booked=Sum(ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField()))
+        ).order_by('appointment_date', 'branch', 'status')
+        
+        return Response({
+            'start_date': start_str,
+            'end_date': end_str,
+            'days': [{
+                'date': row['appointment_date'].strftime('%Y-%m-%d'),
+                'branch': row['branch'],
+                'status': row['status'],
+                'count': row['count'],
+                'booked_minutes': int(row['booked'].total_seconds() // 60) if row['booked'] else 0
+            } for row in rows]
+        })
+
+
 class AppointmentDetailView(generics.RetrieveAPIView):
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
@@ -147,6 +280,7 @@ class UpdateAppointmentStatusView(APIView):
         if new_status == 'cancelled' and appointment.status == 'pending':
             appointment.status = 'cancelled'
             appointment.save()
+            invalidate_availability(appointment.branch, appointment.appointment_date)
             serializer = AppointmentSerializer(appointment)
             return Response(serializer.data)
         
@@ -168,13 +302,26 @@ class AdminUpdateAppointmentStatusView(APIView):
         if new_status not in ['pending', 'confirmed', 'completed', 'cancelled']:
             return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         
-        appointment.status = new_status
-        appointment.save()
+        try:
+            change_appointment_status(appointment, new_status)
+        except SlotUnavailable:
+            return Response({
+                'error': 'This time slot is now fully booked by other appointments.'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = AppointmentSerializer(appointment)
         return Response(serializer.data)
 
 
+def business_hours(schedule):
+    return {
+        'opening_time': schedule.opening_time.strftime('%H:%M'),
+        'closing_time': schedule.closing_time.strftime('%H:%M'),
+        'display': f"{schedule.opening_time.strftime('%I:%M %p')} - {schedule.closing_time.strftime('%I:%M %p')}",
+        'stations': schedule.stations
+    }
+
+
 class AvailableTimeSlotsView(APIView):
     """Get available time slots for a specific date, branch, and service"""
     permission_classes = [AllowAny]
@@ -189,55 +336,19 @@ class AvailableTimeSlotsView(APIView):
         
         try:
             appointment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            service = Service.objects.get(id=service_id)
-        except (ValueError, Service.DoesNotExist):
+        except ValueError:
+            return Response({'error': 'Invalid date or service'}, status=status.HTTP_400_BAD_REQUEST)
+        service = service_catalog.get(service_id)
+        if service is None:
             return Response({'error': 'Invalid date or service'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Business hours: 8 AM - 5 PM
-        business_start = time(8, 0)
-        business_end = time(17, 0)
-        
-        # Get all booked appointments for that day (exclude overlapping services)
-        booked_appointments = Appointment.objects.filter(
-            branch=branch,
-            appointment_date=appointment_date,
-            status__in=['pending', 'confirmed'],
-            service__may_overlap=False  # Only consider non-overlapping services as blocking
-        ).order_by('start_time')
-        
-        # Generate all possible time slots (every 30 minutes)
-        available_slots = []
-        current_time = datetime.combine(appointment_date, business_start)
-        end_of_day = datetime.combine(appointment_date, business_end)
-        
-        while current_time < end_of_day:
-            slot_start = current_time.time()
-            slot_end = (current_time + timedelta(minutes=service.duration_minutes)).time()
-            
-            # Check if slot end time is within business hours
-            if slot_end > business_end:
-                break
-            
-            # If service allows overlap, always show as available (within business hours)
-            if service.may_overlap:
-                is_available = True
-            else:
-                # Check if this slot overlaps with any booked non-overlapping appointment
-                is_available = True
-                for appointment in booked_appointments:
-                    if (slot_start < appointment.end_time and slot_end > appointment.start_time):
-                        is_available = False
-                        break
-            
-            if is_available:
-                available_slots.append({
-                    'start_time': slot_start.strftime('%H:%M'),
-                    'end_time': slot_end.strftime('%H:%M'),
-                    'display': f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
-                })
-            
-            # Move to next 30-minute slot
-            current_time += timedelta(minutes=30)
+        if branch not in dict(Appointment.BRANCH_CHOICES):
+            return Response({'error': 'Invalid branch'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        available_slots = cached_day_slots(
+            branch, appointment_date, service.duration_minutes, service.may_overlap
+        )
+        schedule, closed_dates = branch_schedule(branch)
         
         return Response({
             'date': date_str,
@@ -245,5 +356,69 @@ class AvailableTimeSlotsView(APIView):
             'service': service.service_name,
             'duration_minutes': service.duration_minutes,
             'may_overlap': service.may_overlap,
+            'is_open': schedule.is_open(appointment_date, closed_dates),
+            'business_hours': business_hours(schedule),
             'available_slots': available_slots
         })
+
+
+class AvailabilityCalendarView(APIView):
+    """Get available time slots for every day in a date range, using a single appointment query"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        start_str = request.query_params.get('start_date')
+        end_str = request.query_params.get('end_date')
+        branch = request.query_params.get('branch')
+        service_id = request.query_params.get('service')
+        
+        if not all([start_str, end_str, branch, service_id]):
+            return Response({'error': 'start_date, end_date, branch, and service are required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response({'error': 'Invalid date or service'}, status=status.HTTP_400_BAD_REQUEST)
+        service = service_catalog.get(service_id)
+        if service is None:
+            return Response({'error': 'Invalid date or service'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if branch not in dict(Appointment.BRANCH_CHOICES):
+            return Response({'error': 'Invalid branch'}, status=status.HTTP_400_BAD_REQUEST)
+        if end_date < start_date:
+            return Response({'error': 'end_date must not be before start_date'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return Response({'error': f'Date range cannot exceed {MAX_RANGE_DAYS} days'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Cached days are reused; the rest come from one query over the window, bucketed per day
+        slots_by_day = cached_range_slots(
+            branch, start_date, end_date, service.duration_minutes, service.may_overlap
+        )
+        include_slots = request.query_params.get('include_slots', 'true').lower() != 'false'
+        schedule, closed_dates = branch_schedule(branch)
+        
+        days = []
+        current_date = start_date
+        while current_date <= end_date:
+            available_slots = slots_by_day[current_date]
+            day = {
+                'date': current_date.strftime('%Y-%m-%d'),
+                'is_open': schedule.is_open(current_date, closed_dates),
+                'available_count': len(available_slots),
+            }
+            if include_slots:
+                day['available_slots'] = available_slots
+            days.append(day)
+            current_date += timedelta(days=1)
+        
+        return Response({
+            'start_date': start_str,
+            'end_date': end_str,
+            'branch': branch,
+            'service': service.service_name,
+            'duration_minutes': service.duration_minutes,
+            'may_overlap': service.may_overlap,
+            'business_hours': business_hours(schedule),
+            'days': days
+        })
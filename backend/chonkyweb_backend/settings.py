@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'pets',
     'orders',
     'appointments',
+    'imaging',
 ]
 
 
@@ -80,8 +81,22 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
+    # Sliding-window limits for /api/token/ (accounts.throttling), enforced before password hashing
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_username': '10/min',
+    },
+    # Client IP for throttling is REMOTE_ADDR; set to the number of trusted proxies when deployed behind one
+    'NUM_PROXIES': 0,
+}
+
+# In-process cache of authenticated users (with profile) used by CachedJWTAuthentication.
+# Changes made through the accounts views drop the entry at once; otherwise it expires after TTL seconds.
+USER_CACHE = {
+    'TTL': 60,  # seconds
+    'MAX_ENTRIES': 10000,
 }
 
 from datetime import timedelta
@@ -99,10 +114,45 @@ WSGI_APPLICATION = 'chonkyweb_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection behaviour that doesn't change the database file, so it applies everywhere:
+# - transaction_mode IMMEDIATE takes the write lock at BEGIN, so atomic() blocks
+#   that read and then write queue up instead of failing with "database is locked"
+#   when the read lock can't be upgraded.
+# - timeout makes a writer wait up to 20 s for the lock instead of 5.
+# The file-level production profile (WAL, synchronous=NORMAL, mmap) is in
+# settings_production; journal_mode=WAL rewrites the database file, so it isn't
+# applied to development or test runs. Compare both with `manage.py benchmark_sqlite`.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file rather than Django's shared-cache in-memory database, whose table locks
+        # fail at once instead of waiting, so threaded tests see real lock contention
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds availability versions, login throttle windows and the service catalog version.
+# The local-memory backend is per process and only suitable for a single development
+# server; settings_production uses Redis so every worker shares them. Don't point this
+# at the database: these keys are read and written on every slot lookup and login.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'chonkyweb',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
@@ -147,6 +197,17 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How imaging.views.serve_media hands out files under MEDIA_URL. 'python' streams
+# them from Django; 'x-accel' hands off to nginx through an internal location, e.g.
+#     location /protected-media/ { internal; alias /path/to/backend/media/; }
+# and 'sendfile' sets X-Sendfile for Apache mod_xsendfile/lighttpd. Content-hashed
+# blobs are always sent as immutable; MAX_AGE applies to everything else.
+MEDIA_SERVING = {
+    'BACKEND': 'python',
+    'ACCEL_PREFIX': '/protected-media/',
+    'MAX_AGE': 3600,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -155,4 +216,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Development email backend - prints emails to console. Replace/configure for production.
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@localhost'
+
+# Mail sent from requests is queued (accounts.mail.queue_email) and delivered by
+# `manage.py send_queued_email --loop`, or the same command without --loop from cron.
+EMAIL_QUEUE = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BASE_SECONDS': 60,     # first retry delay; doubles per attempt
+    'RETRY_MAX_SECONDS': 3600,
+    'LEASE_SECONDS': 600,         # a claimed batch not finished by then is picked up again
+}
+
+# Login activity rows are queued in memory and written in batches by a background
+# thread (see accounts.activity). Set ENABLED to False to write each row immediately.
+LOGIN_ACTIVITY_BUFFER = {
+    'ENABLED': True,
+    'MAX_BATCH': 100,
+    'FLUSH_INTERVAL': 2.0,  # seconds
+}
+
+# Raw LoginActivity rows older than this are folded into daily summaries by
+# `manage.py rollup_login_activity`
+LOGIN_ACTIVITY_RETENTION_DAYS = 90
+
+# Services are kept in memory per process (services.catalog). The shared version in
+# the cache is read at most every CHECK_INTERVAL seconds, so other processes see a
+# change within that long; MAX_AGE bounds staleness in case the cache isn't shared.
+SERVICE_CATALOG = {
+    'CHECK_INTERVAL': 2,
+    'MAX_AGE': 300,
+}
+
+# Owner typeahead on the pet form (pets.views.OwnerSearchAPIView)
+OWNER_TYPEAHEAD = {
+    'LIMIT': 10,
+    'MAX_LIMIT': 25,
+    'CACHE_SECONDS': 30,  # a newly registered customer shows up after at most this long
+}
+
+# Pending orders older than this are cancelled (and their stock restored) by
+# `manage.py expire_stale_pending`, which is meant to run from cron every minute.
+PENDING_ORDER_EXPIRY_HOURS = 48
 # NOTE: admin invite code removed — admin accounts are created when registration is posted to /register with role='admin'.
@@ -0,0 +1,50 @@
+"""
+Production settings for chonkyweb_backend.
+
+Everything in settings.py applies; this module only changes what a deployment
+with several worker processes needs. Select it with
+    DJANGO_SETTINGS_MODULE=chonkyweb_backend.settings_production
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+
+# Database
+# SQLite tuned for concurrent readers and writers (compare with `manage.py benchmark_sqlite`):
+# - WAL lets reads proceed while a write is in progress; synchronous=NORMAL is
+#   durable against application crashes and only fsyncs at checkpoints.
+# - busy_timeout makes a writer wait for the lock instead of failing at once.
+# - transaction_mode IMMEDIATE (as in development) takes the write lock at BEGIN.
+# - mmap_size/cache_size/temp_store keep hot pages and temp b-trees in memory.
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],  # noqa: F405
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA busy_timeout=20000;'
+                'PRAGMA mmap_size=268435456;'   # 256 MB
+                'PRAGMA cache_size=-64000;'     # 64 MB
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
+    }
+}
+
+
+# Cache
+# Availability versions, login throttle windows and the service catalog version must
+# be seen by every worker, and are touched on every slot lookup and login attempt, so
+# they live in Redis (in memory, shared) rather than per process or in the database.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }
+}
@@ -15,10 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
-from django.conf.urls.static import static
+
+from imaging.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -36,7 +37,6 @@ urlpatterns = [
     path('api/appointments/', include('appointments.urls')),
     # JWT token refresh endpoint (login is now handled in accounts.urls)
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # uploaded media, in production too (see MEDIA_SERVING in settings)
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
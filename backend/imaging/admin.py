@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Blob
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'refcount', 'updated_at')
+    list_filter = ('refcount',)
+    search_fields = ('digest',)
+    readonly_fields = ('name', 'digest', 'size', 'refcount', 'created_at', 'updated_at')
@@ -0,0 +1,51 @@
+import os
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from imaging.models import Blob
+from imaging.storage import is_blob
+
+
+def _digest(name):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def add_ref(name, storage=None):
+    """Count one more field pointing at a blob, creating its Blob row on first use."""
+    if not is_blob(name):
+        return
+    # update() with F() leaves auto_now alone, so stamp updated_at explicitly
+    if Blob.objects.filter(name=name).update(refcount=F('refcount') + 1, updated_at=timezone.now()):
+        return
+    size = 0
+    if storage is not None and storage.exists(name):
+        size = storage.size(name)
+    try:
+        with transaction.atomic():
+            Blob.objects.create(name=name, digest=_digest(name), size=size, refcount=1)
+    except IntegrityError:
+        # Another request created it first
+        Blob.objects.filter(name=name).update(refcount=F('refcount') + 1, updated_at=timezone.now())
+
+
+def release_ref(name):
+    """Count one field fewer; the file stays until cleanup_blobs finds it unreferenced."""
+    if not is_blob(name):
+        return
+    Blob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1, updated_at=timezone.now())
+
+
+def swap_refs(old_name, new_name, storage=None):
+    if old_name == new_name:
+        return
+    add_ref(new_name, storage)
+    release_ref(old_name)
+
+
+def stored_name(instance, field_name):
+    """The file name currently saved for this row, before any unsaved change."""
+    if instance.pk is None:
+        return None
+    return type(instance)._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
@@ -0,0 +1,149 @@
+import os
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from imaging.blobs import add_ref
+from imaging.models import Blob
+from imaging.pipeline import IMAGE_FIELDS, VARIANTS, variant_name
+from imaging.storage import BLOB_PREFIX, ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = 'Recount blob references from the picture fields and delete blobs nothing points at'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Leave blobs touched this recently alone (uploads are stored before their row is saved)'
+        )
+        parser.add_argument(
+            '--adopt-legacy', action='store_true',
+            help='Move pictures still stored under their upload_to paths into blobs first'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting')
+
+    def handle(self, *args, **options):
+        storage = ContentAddressedStorage()
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        dry_run = options['dry_run']
+
+        if options['adopt_legacy']:
+            adopted = self.adopt_legacy(storage, dry_run)
+            self.stdout.write(self.style.SUCCESS(f'✓ Moved {adopted} legacy pictures into blobs'))
+
+        fixed = self.reconcile(storage, cutoff, dry_run)
+
+        deleted = freed = 0
+        for blob in Blob.objects.filter(refcount=0, updated_at__lt=cutoff).order_by('id').iterator():
+            if self.recently_touched(storage, blob.name, cutoff):
+                continue
+            if not dry_run:
+                # Guarded: a picture saved since the query above has bumped refcount/updated_at
+                if not Blob.objects.filter(pk=blob.pk, refcount=0, updated_at__lt=cutoff).delete()[0]:
+                    continue
+                self.delete_files(storage, blob.name, keep_variants=Blob.objects.filter(digest=blob.digest).exists())
+            deleted += 1
+            freed += blob.size
+
+        strays = self.delete_strays(storage, cutoff, dry_run)
+
+        prefix = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'✓ Corrected {fixed} reference counts'))
+        self.stdout.write(self.style.SUCCESS(f'✓ {prefix} {deleted} unreferenced blobs ({freed / 1024 / 1024:.1f} MB)'))
+        self.stdout.write(self.style.SUCCESS(f'✓ {prefix} {strays} files with no blob record'))
+
+    def adopt_legacy(self, storage, dry_run):
+        """Re-store files saved before content addressing; rows sharing identical bytes end up on one blob."""
+        adopted = 0
+        for label, field, status_field in IMAGE_FIELDS:
+            model = apps.get_model(label)
+            legacy = model.objects.exclude(**{f'{field}__startswith': f'{BLOB_PREFIX}/'}).exclude(
+                **{field: ''}
+            ).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True).distinct()
+            for old_name in list(legacy):
+                if not storage.exists(old_name):
+                    continue
+                adopted += 1
+                if dry_run:
+                    continue
+                with storage.open(old_name, 'rb') as source:
+                    new_name = storage.save(old_name, source)
+                # Variants are rebuilt by process_images; the blob shortcut skips ones already built
+                count = model.objects.filter(**{field: old_name}).update(**{field: new_name, status_field: 'pending'})
+                for _ in range(count):
+                    add_ref(new_name, storage)
+                for path in [old_name] + [variant_name(old_name, variant) for variant in VARIANTS]:
+                    storage.delete(path)
+        return adopted
+
+    def reconcile(self, storage, cutoff, dry_run):
+        """Bring refcounts in line with the rows; catches cascades and bulk deletes that skip model delete()."""
+        counts = {}
+        for label, field, _ in IMAGE_FIELDS:
+            model = apps.get_model(label)
+            rows = model.objects.filter(**{f'{field}__startswith': f'{BLOB_PREFIX}/'}).values(field).annotate(n=Count('pk'))
+            for row in rows:
+                counts[row[field]] = counts.get(row[field], 0) + row['n']
+
+        fixed = 0
+        stale = []
+        for blob in Blob.objects.filter(updated_at__lt=cutoff).only('id', 'name', 'refcount').iterator():
+            actual = counts.pop(blob.name, 0)
+            if blob.refcount != actual:
+                blob.refcount = actual
+                stale.append(blob)
+        for blob in stale:
+            # Rows changed after the counts were taken are skipped; the next run picks them up
+            if dry_run or Blob.objects.filter(pk=blob.pk, updated_at__lt=cutoff).update(refcount=blob.refcount):
+                fixed += 1
+
+        # Referenced blobs with no record at all (stored before this table existed)
+        known = set(Blob.objects.filter(name__in=list(counts)).values_list('name', flat=True))
+        missing = [
+            Blob(name=name, digest=os.path.splitext(os.path.basename(name))[0],
+                 size=storage.size(name) if storage.exists(name) else 0, refcount=n)
+            for name, n in counts.items() if name not in known
+        ]
+        if not dry_run:
+            Blob.objects.bulk_create(missing, ignore_conflicts=True)
+        return fixed + len(missing)
+
+    def recently_touched(self, storage, name, cutoff):
+        # storage.save() refreshes the mtime when an upload matches an existing blob
+        try:
+            return storage.get_modified_time(name) >= cutoff
+        except FileNotFoundError:
+            return False
+
+    def delete_files(self, storage, name, keep_variants=False):
+        storage.delete(name)
+        if not keep_variants:
+            for variant in VARIANTS:
+                storage.delete(variant_name(name, variant))
+
+    def delete_strays(self, storage, cutoff, dry_run):
+        """Files under blobs/ that no Blob row accounts for: aborted uploads, replaced pictures never saved."""
+        root = storage.path(BLOB_PREFIX)
+        if not os.path.isdir(root):
+            return 0
+        known = set()
+        for name in Blob.objects.values_list('name', flat=True).iterator():
+            known.add(name)
+            known.update(variant_name(name, variant) for variant in VARIANTS)
+
+        deleted = 0
+        cutoff_ts = cutoff.timestamp()
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                if name in known or os.path.getmtime(path) >= cutoff_ts:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                deleted += 1
+        return deleted
@@ -0,0 +1,87 @@
+import logging
+import os
+import time as _time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from imaging.blobs import swap_refs
+from imaging.pipeline import IMAGE_FIELDS, process_field_image
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    # Needed where pool processes are spawned rather than forked
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = 'Strip metadata from uploaded pictures and build their variants in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Worker processes decoding images')
+        parser.add_argument('--batch-size', type=int, default=50, help='Pictures claimed per model per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads instead of exiting when idle')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep between polls with --loop')
+        parser.add_argument('--requeue', choices=['failed', 'all'], help='Mark failed (or all) pictures pending first')
+
+    def handle(self, *args, **options):
+        fields = [(apps.get_model(label), label, field, status_field) for label, field, status_field in IMAGE_FIELDS]
+
+        for model, _, field, status_field in fields:
+            # A worker that died mid-batch leaves rows 'processing'; only one worker runs, so take them back
+            stale = model.objects.filter(**{status_field: 'processing'})
+            if options['requeue'] == 'failed':
+                stale = model.objects.filter(**{f'{status_field}__in': ['processing', 'failed']})
+            elif options['requeue'] == 'all':
+                stale = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            stale.update(**{status_field: 'pending'})
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        ready = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            while True:
+                futures = {}
+                for model, label, field, status_field in fields:
+                    for pk, name in self.claim(model, field, status_field, options['batch_size']):
+                        future = pool.submit(process_field_image, label, field, name)
+                        futures[future] = (model, field, status_field, pk, name)
+
+                if not futures:
+                    if not options['loop']:
+                        break
+                    connections.close_all()
+                    _time.sleep(options['interval'])
+                    continue
+
+                for future in as_completed(futures):
+                    model, field, status_field, pk, name = futures[future]
+                    # Guarded on the old name: a picture replaced meanwhile is pending again and left alone
+                    row = model.objects.filter(pk=pk, **{field: name, status_field: 'processing'})
+                    try:
+                        new_name = future.result()
+                    except Exception:
+                        logger.exception('Failed to process %s', name)
+                        row.update(**{status_field: 'failed'})
+                        failed += 1
+                    else:
+                        if row.update(**{field: new_name, status_field: 'ready'}):
+                            swap_refs(name, new_name, model._meta.get_field(field).storage)
+                        ready += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Processed {ready} pictures'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'✓ {failed} pictures could not be processed'))
+
+    def claim(self, model, field, status_field, batch_size):
+        with transaction.atomic():
+            rows = list(model.objects.select_for_update(skip_locked=True).filter(
+                **{status_field: 'pending'}
+            ).exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).order_by('pk').values_list('pk', field)[:batch_size])
+            model.objects.filter(pk__in=[pk for pk, _ in rows]).update(**{status_field: 'processing'})
+        return rows
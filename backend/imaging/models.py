@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """One stored file in ContentAddressedStorage and how many picture fields point at it."""
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    # Kept by imaging.blobs on every picture change; cleanup_blobs recounts it from the rows
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['refcount', 'updated_at'], name='blob_refcount_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
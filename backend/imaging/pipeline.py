@@ -0,0 +1,128 @@
+import io
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# name -> (box in px, crop to fill the box); every variant is written as WebP
+VARIANTS = {
+    'thumb': ((128, 128), True),
+    'medium': ((512, 512), False),
+}
+WEBP_QUALITY = 80
+
+# Formats re-encoded in place when stripping metadata; anything else is stored as uploaded
+_REENCODE = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+
+# Lifecycle of an uploaded picture; variants are only handed out once it is 'ready'
+IMAGE_STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('processing', 'Processing'),
+    ('ready', 'Ready'),
+    ('failed', 'Failed'),
+]
+
+# (model label, image field, status field) for every picture the process_images worker handles
+IMAGE_FIELDS = [
+    ('accounts.Profile', 'profile_picture', 'profile_picture_status'),
+    ('pets.PetProfile', 'pet_picture', 'pet_picture_status'),
+]
+
+
+def variant_name(name, variant):
+    """blobs/ab/ab12….jpg -> blobs/ab/ab12….thumb.webp"""
+    root, _ = os.path.splitext(name)
+    return f'{root}.{variant}.webp'
+
+
+def is_new_upload(field_file):
+    """True when the field holds a file that has not been written to storage yet."""
+    return bool(field_file) and not field_file._committed
+
+
+def _open(source):
+    """Decode an image with its EXIF rotation applied; returns (image, original format)."""
+    image = Image.open(source)
+    image_format = image.format
+    # Rotate before the EXIF block is thrown away
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    return image, image_format
+
+
+def _stripped(image, image_format):
+    """The image re-encoded in its own format without EXIF/ICC/text metadata, or None if it can't be."""
+    options = _REENCODE.get(image_format)
+    if options is None:
+        return None
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    else:
+        image = image.copy()
+    # Some encoders copy ICC/EXIF/text from .info; keep only what decoding needs
+    image.info = {key: value for key, value in image.info.items() if key == 'transparency'}
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def _variants(image):
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    for variant, (box, crop) in VARIANTS.items():
+        if crop:
+            resized = ImageOps.fit(image, box, Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail(box, Image.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=6)
+        yield variant, buffer.getvalue()
+
+
+def process_stored_image(storage, name):
+    """Store a metadata-free copy of a picture and write its WebP variants beside it.
+
+    This is the CPU-heavy part (decode, resize, encode) and runs in the
+    process_images worker, never in a request. Stored files are content
+    addressed and never rewritten, so the stripped copy comes back under a new
+    name, which is returned; the original is left for cleanup_blobs once
+    nothing points at it.
+    """
+    # Variants are only written for processed output, so this blob is already done
+    # (another row uploaded the same bytes); re-encoding would just mint another blob
+    if all(storage.exists(variant_name(name, variant)) for variant in VARIANTS):
+        return name
+
+    with storage.open(name, 'rb') as source:
+        image, image_format = _open(io.BytesIO(source.read()))
+
+    stripped = _stripped(image, image_format)
+    if stripped is not None:
+        name = storage.save(name, ContentFile(stripped))
+
+    for variant, data in _variants(image):
+        storage.save_derived(variant_name(name, variant), ContentFile(data))
+    return name
+
+
+def process_field_image(model_label, field_name, name):
+    """Worker-process entry point: resolve the field's storage and process one picture."""
+    storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    return process_stored_image(storage, name)
+
+
+def variant_urls(field_file, status, request=None):
+    """{'thumb': url, 'medium': url} once the picture is processed, otherwise None."""
+    if not field_file or status != 'ready':
+        return None
+    urls = {}
+    for variant in VARIANTS:
+        url = field_file.storage.url(variant_name(field_file.name, variant))
+        urls[variant] = request.build_absolute_uri(url) if request is not None else url
+    return urls
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores every upload once, under the SHA-256 of its bytes.
+
+    save() ignores the requested directory and returns
+    blobs/<first two hex digits>/<digest><ext>; saving identical bytes again
+    returns the existing name without writing. Names never change content,
+    so URLs can be cached forever. Which rows use a blob is tracked in
+    imaging.models.Blob and unused blobs are removed by cleanup_blobs.
+    """
+
+    def blob_name(self, digest, ext):
+        return f'{BLOB_PREFIX}/{digest[:2]}/{digest}{ext.lower()}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+
+        digest, temp_path = self._spool(content)
+        blob = self.blob_name(digest, os.path.splitext(name)[1])
+        self._commit(temp_path, blob)
+        return blob
+
+    def save_derived(self, name, content):
+        """Write a file under an exact name (e.g. a blob's variant), replacing it atomically."""
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+        _, temp_path = self._spool(content)
+        self._commit(temp_path, name, replace=True)
+        return name
+
+    def _spool(self, content):
+        # Hash while copying to a temp file beside the blobs, so the final step is a rename
+        directory = os.path.join(self.location, BLOB_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return digest.hexdigest(), temp_path
+
+    def _commit(self, temp_path, name, replace=False):
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if os.path.exists(full_path) and not replace:
+            # Same bytes are already stored; refresh the mtime so cleanup_blobs sees it as in use
+            os.remove(temp_path)
+            os.utime(full_path)
+            return
+        if self.file_permissions_mode is not None:
+            os.chmod(temp_path, self.file_permissions_mode)
+        else:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, full_path)
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_PREFIX}/')
@@ -0,0 +1,274 @@
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from PIL import Image
+from rest_framework.test import APIClient
+
+from accounts.models import Profile
+
+from .models import Blob
+from .pipeline import VARIANTS, process_stored_image, variant_name, variant_urls
+from .storage import ContentAddressedStorage
+from .views import _byte_range
+
+
+def use_temporary_media(testcase):
+    """Point MEDIA_ROOT at a fresh directory for the rest of the test."""
+    media_root = tempfile.mkdtemp()
+    testcase.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    override = testcase.settings(MEDIA_ROOT=media_root)
+    override.enable()
+    testcase.addCleanup(override.disable)
+    return media_root
+
+
+def photo(size=(800, 600), color='red'):
+    """JPEG bytes carrying a camera EXIF block that asks for a 90° rotation."""
+    image = Image.new('RGB', size, color)
+    exif = image.getexif()
+    exif[0x0112] = 6        # Orientation: rotate 90° clockwise
+    exif[0x010F] = 'Camera'  # Make
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class PipelineTests(SimpleTestCase):
+    def setUp(self):
+        use_temporary_media(self)
+        self.storage = ContentAddressedStorage()
+        self.name = self.storage.save('profile_pics/photo.jpg', ContentFile(photo()))
+
+    def open(self, name):
+        with self.storage.open(name, 'rb') as stored:
+            image = Image.open(io.BytesIO(stored.read()))
+            image.load()
+        return image
+
+    def test_metadata_is_stripped_after_rotating(self):
+        name = process_stored_image(self.storage, self.name)
+        self.assertNotEqual(name, self.name)
+        image = self.open(name)
+        self.assertEqual(image.format, 'JPEG')
+        self.assertEqual(image.size, (600, 800))
+        self.assertEqual(dict(image.getexif()), {})
+
+    def test_variants_are_small_webp_files(self):
+        name = process_stored_image(self.storage, self.name)
+        thumb = self.open(variant_name(name, 'thumb'))
+        medium = self.open(variant_name(name, 'medium'))
+        self.assertEqual((thumb.format, thumb.size), ('WEBP', (128, 128)))
+        self.assertEqual((medium.format, medium.size), ('WEBP', (384, 512)))
+
+    def test_processed_blobs_are_not_processed_again(self):
+        name = process_stored_image(self.storage, self.name)
+        self.assertEqual(process_stored_image(self.storage, name), name)
+
+    def test_variant_urls_only_once_ready(self):
+        name = process_stored_image(self.storage, self.name)
+        field_file = Profile(profile_picture=name).profile_picture
+        self.assertIsNone(variant_urls(field_file, 'pending'))
+        urls = variant_urls(field_file, 'ready')
+        self.assertEqual(set(urls), {'thumb', 'medium'})
+        self.assertTrue(urls['thumb'].endswith('.thumb.webp'))
+
+
+class ProcessImagesTests(TransactionTestCase):
+    # The command closes database connections before forking its pool, which a
+    # TestCase transaction would not survive
+
+    def setUp(self):
+        use_temporary_media(self)
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='unused')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def process(self):
+        call_command('process_images', workers=1, stdout=StringIO())
+
+    def upload(self, data):
+        return self.client.put('/api/profile/', {
+            'username': 'alice', 'email': 'alice@example.com',
+            'profile_picture': SimpleUploadedFile('me.jpg', data, content_type='image/jpeg'),
+        }, format='multipart')
+
+    def test_upload_is_stored_raw_and_processed_by_the_worker(self):
+        response = self.upload(photo())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['profile_picture_status'], 'pending')
+        self.assertIsNone(response.data['profile_picture_variants'])
+        raw_name = Profile.objects.get(user=self.user).profile_picture.name
+
+        self.process()
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.profile_picture_status, 'ready')
+        self.assertNotEqual(profile.profile_picture.name, raw_name)
+        variants = self.client.get('/api/profile/').data['profile_picture_variants']
+        self.assertEqual(set(variants), {'thumb', 'medium'})
+
+    def test_undecodable_upload_is_marked_failed(self):
+        self.upload(b'not an image')
+        with self.assertLogs('imaging.management.commands.process_images', 'ERROR'):
+            self.process()
+        self.assertEqual(Profile.objects.get(user=self.user).profile_picture_status, 'failed')
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = use_temporary_media(self)
+        self.storage = ContentAddressedStorage()
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, filename), self.media_root)
+            for directory, _, files in os.walk(self.media_root) for filename in files
+        )
+
+    def profile(self, username, data):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='unused')
+        return Profile.objects.create(user=user, profile_picture=SimpleUploadedFile(f'{username}.jpg', data))
+
+    def refcounts(self):
+        return dict(Blob.objects.values_list('name', 'refcount'))
+
+    def cleanup(self):
+        call_command('cleanup_blobs', grace_hours=0, stdout=StringIO())
+
+    def test_identical_bytes_are_stored_once(self):
+        first = self.storage.save('profile_pics/a.png', ContentFile(b'same bytes'))
+        second = self.storage.save('pet_pics/b.PNG', ContentFile(b'same bytes'))
+        self.assertEqual(first, second)
+        self.assertRegex(first, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(self.stored_files(), [first])
+
+    def test_fields_reference_count_their_blob(self):
+        alice = self.profile('alice', photo())
+        bob = self.profile('bob', photo())
+        shared = alice.profile_picture.name
+        self.assertEqual(bob.profile_picture.name, shared)
+        self.assertEqual(self.refcounts(), {shared: 2})
+
+        bob.profile_picture = SimpleUploadedFile('new.jpg', photo(color='blue'))
+        bob.save()
+        self.assertEqual(self.refcounts(), {shared: 1, bob.profile_picture.name: 1})
+
+        alice.delete()
+        self.assertEqual(self.refcounts()[shared], 0)
+
+    def test_cleanup_deletes_unreferenced_blobs_and_their_variants(self):
+        kept = self.profile('alice', photo())
+        dropped = self.profile('bob', photo(color='blue'))
+        for profile in (kept, dropped):
+            for variant in VARIANTS:
+                self.storage.save_derived(variant_name(profile.profile_picture.name, variant), ContentFile(b'variant'))
+        dropped_name = dropped.profile_picture.name
+        # A bulk delete skips Profile.delete(), so only the recount notices the blob is unused
+        Profile.objects.filter(pk=dropped.pk).delete()
+
+        self.cleanup()
+
+        self.assertFalse(self.storage.exists(dropped_name))
+        self.assertFalse(self.storage.exists(variant_name(dropped_name, 'thumb')))
+        self.assertTrue(self.storage.exists(kept.profile_picture.name))
+        self.assertTrue(self.storage.exists(variant_name(kept.profile_picture.name, 'thumb')))
+        self.assertEqual(self.refcounts(), {kept.profile_picture.name: 1})
+
+    def test_cleanup_removes_files_without_a_blob_record(self):
+        stray = self.storage.save('profile_pics/aborted.jpg', ContentFile(b'never saved on a row'))
+        self.cleanup()
+        self.assertFalse(self.storage.exists(stray))
+
+
+class ByteRangeTests(SimpleTestCase):
+    def test_closed_range(self):
+        self.assertEqual(_byte_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(_byte_range('bytes=100-100', 1000), (100, 100))
+
+    def test_open_ended_range(self):
+        self.assertEqual(_byte_range('bytes=500-', 1000), (500, 999))
+
+    def test_end_past_the_file_is_clamped(self):
+        self.assertEqual(_byte_range('bytes=900-5000', 1000), (900, 999))
+
+    def test_suffix_range(self):
+        self.assertEqual(_byte_range('bytes=-100', 1000), (900, 999))
+        # Asking for more than the file holds returns the whole file
+        self.assertEqual(_byte_range('bytes=-5000', 1000), (0, 999))
+
+    def test_spaces_are_ignored(self):
+        self.assertEqual(_byte_range('bytes = 0 - 9', 1000), (0, 9))
+
+    def test_unsatisfiable_ranges(self):
+        self.assertIs(_byte_range('bytes=1000-', 1000), False)
+        self.assertIs(_byte_range('bytes=500-100', 1000), False)
+        self.assertIs(_byte_range('bytes=-0', 1000), False)
+        self.assertIs(_byte_range('bytes=0-', 0), False)
+
+    def test_unsupported_headers_are_ignored(self):
+        for header in ['bytes=0-1,5-9', 'bytes=-', 'items=0-9', 'garbage', '']:
+            self.assertIsNone(_byte_range(header, 1000), header)
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        self.media_root = use_temporary_media(self)
+        self.data = bytes(range(256)) * 4
+        self.blob = ContentAddressedStorage().save('pet_pics/pet.png', ContentFile(self.data))
+        os.makedirs(os.path.join(self.media_root, 'pet_pics'))
+        with open(os.path.join(self.media_root, 'pet_pics', 'legacy.png'), 'wb') as legacy:
+            legacy.write(self.data)
+
+    def get(self, path, **headers):
+        return self.client.get(f'/media/{path}', **headers)
+
+    def test_blobs_are_immutable(self):
+        response = self.get(self.blob)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/png')
+
+    def test_legacy_files_revalidate(self):
+        response = self.get('pet_pics/legacy.png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get(self.blob)['ETag']
+        response = self.get(self.blob, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_range_request(self):
+        response = self.get(self.blob, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(b''.join(response.streaming_content), self.data[10:20])
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.get(self.blob, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.get(self.blob, HTTP_RANGE=f'bytes={len(self.data)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.data)}')
+
+    def test_web_server_handoff(self):
+        with self.settings(MEDIA_SERVING={'BACKEND': 'x-accel', 'ACCEL_PREFIX': '/protected-media/'}):
+            response = self.get(self.blob)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.blob}')
+        self.assertEqual(response.content, b'')
+
+    def test_missing_files_and_escapes_are_refused(self):
+        self.assertEqual(self.get('pet_pics/missing.png').status_code, 404)
+        # safe_join raises SuspiciousFileOperation, which Django answers with 400
+        self.assertEqual(self.get('../manage.py').status_code, 400)
@@ -0,0 +1,144 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from imaging.storage import is_blob
+
+# blobs/ab/<sha256>.<ext>: the name is the content, so it may be cached forever
+_IMMUTABLE = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_CHUNK_SIZE = 64 * 1024
+
+
+def _serving():
+    return getattr(settings, 'MEDIA_SERVING', {})
+
+
+def _cache_control(path):
+    if is_blob(path) and _IMMUTABLE.match(posixpath.basename(path)):
+        return 'public, max-age=31536000, immutable'
+    # Variants and legacy uploads can be rebuilt under the same name; revalidate via ETag
+    return f"public, max-age={_serving().get('MAX_AGE', 3600)}"
+
+
+def _etag(path, stat):
+    name = posixpath.basename(path)
+    if is_blob(path) and _IMMUTABLE.match(name):
+        return quote_etag(name.split('.')[0])
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single 'bytes=' range, None to send everything, False if unsatisfiable."""
+    match = _RANGE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        # Multiple ranges or garbage: RFC 9110 lets us ignore the header
+        return None
+    first, last = match.groups()
+    if first == '':
+        # bytes=-500 is the last 500 bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(handle, start, length):
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT with validators, byte ranges and cache headers.
+
+    With MEDIA_SERVING['BACKEND'] set to 'x-accel' (nginx) or 'sendfile'
+    (Apache/lighttpd) the bytes are handed to the web server; otherwise
+    FileResponse lets the WSGI server use sendfile(2) where it can. Either way
+    repeat views end at the 304 below, or never reach us for immutable blobs.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    etag = _etag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': _cache_control(path),
+        'Accept-Ranges': 'bytes',
+    }
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified.headers.setdefault(header, value)
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    backend = _serving().get('BACKEND', 'python')
+    if backend in ('x-accel', 'sendfile'):
+        # The web server handles Range itself and keeps these headers
+        response = HttpResponse(content_type=content_type)
+        if backend == 'x-accel':
+            response['X-Accel-Redirect'] = _serving().get('ACCEL_PREFIX', '/protected-media/') + path
+        else:
+            response['X-Sendfile'] = full_path
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header:
+        # If-Range: only honour the range while the client's copy is still current
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range or if_range == etag or parse_http_date_safe(if_range) == int(stat.st_mtime):
+            byte_range = _byte_range(range_header, stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    handle = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_read_range(handle, start, length), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    for header, value in headers.items():
+        response[header] = value
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
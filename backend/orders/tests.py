@@ -1,3 +1,81 @@
+from datetime import time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from appointments.availability import cached_day_slots
+from appointments.models import Appointment
+from inventory.models import Product
+from services.models import Service
+
+from .models import Order, OrderItem
+
+
+class ExpireStalePendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='customer', password='unused')
+        self.service = Service.objects.create(
+            service_name='Grooming', description='Full groom', duration_minutes=60
+        )
+        self.food = Product.objects.create(name='Kibble', category=Product.CATEGORY_PET_FOOD, unit_cost=10, quantity=5)
+        self.toy = Product.objects.create(name='Ball', category=Product.CATEGORY_ACCESSORIES, unit_cost=2, quantity=1)
+
+    def order(self, age_hours, status='pending', items=()):
+        order = Order.objects.create(user=self.user, branch='Matina', status=status, total_price=Decimal('0'))
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(hours=age_hours))
+        for product, quantity in items:
+            OrderItem.objects.create(order=order, item_type='product', product=product, quantity=quantity, price=1)
+        return order
+
+    def appointment(self, day, status='pending'):
+        return Appointment.objects.create(
+            user=self.user, service=self.service, branch='Matina', appointment_date=day,
+            start_time=time(9), end_time=time(10), status=status
+        )
+
+    def sweep(self, **options):
+        call_command('expire_stale_pending', stdout=StringIO(), **options)
+
+    def test_old_pending_orders_are_cancelled_and_restocked(self):
+        first = self.order(72, items=[(self.food, 2), (self.toy, 1)])
+        second = self.order(50, items=[(self.food, 3)])
+        recent = self.order(1, items=[(self.food, 1)])
+        completed = self.order(72, status='completed', items=[(self.food, 4)])
+
+        self.sweep(batch_size=1)
+
+        statuses = dict(Order.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[first.id], 'cancelled')
+        self.assertEqual(statuses[second.id], 'cancelled')
+        self.assertEqual(statuses[recent.id], 'pending')
+        self.assertEqual(statuses[completed.id], 'completed')
+        self.food.refresh_from_db()
+        self.toy.refresh_from_db()
+        self.assertEqual((self.food.quantity, self.toy.quantity), (10, 2))
+
+    def test_order_age_can_be_overridden(self):
+        order = self.order(5)
+        self.sweep(order_age_hours=4)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'cancelled')
+
+    def test_past_pending_appointments_are_cancelled_and_free_their_slot(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        stale = self.appointment(yesterday)
+        confirmed = self.appointment(yesterday - timedelta(days=1), status='confirmed')
+        upcoming = self.appointment(timezone.localdate() + timedelta(days=1))
+        slots = [slot['start_time'] for slot in cached_day_slots('Matina', yesterday, 60, False)]
+        self.assertNotIn('09:00', slots)
+
+        self.sweep()
 
-# Create your tests here.
+        statuses = dict(Appointment.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {stale.id: 'cancelled', confirmed.id: 'confirmed', upcoming.id: 'pending'})
+        slots = [slot['start_time'] for slot in cached_day_slots('Matina', yesterday, 60, False)]
+        self.assertIn('09:00', slots)
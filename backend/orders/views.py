@@ -7,7 +7,7 @@ from django.db import transaction
 from django.db.models import Avg, Count
 from .models import Order, OrderItem, PurchaseFeedback, ProductFeedback
 from inventory.models import Product
-from services.models import Service
+from services.catalog import service_catalog
 from .serializers import (
     OrderSerializer, 
     CreateOrderSerializer, 
@@ -67,21 +67,20 @@ class CreateOrderView(APIView):
                     )
             
             elif item_type == 'service':
-                try:
-                    service = Service.objects.get(id=item_id)
-                    price = float(service.price) * quantity
-                    order_items.append({
-                        'item_type': 'service',
-                        'service': service,
-                        'quantity': quantity,
-                        'price': price
-                    })
-                    total_price += price
-                except Service.DoesNotExist:
+                service = service_catalog.get(item_id)
+                if service is None:
                     return Response(
                         {'error': f'Service with id {item_id} not found'},
                         status=status.HTTP_404_NOT_FOUND
                     )
+                price = float(service.price) * quantity
+                order_items.append({
+                    'item_type': 'service',
+                    'service': service,
+                    'quantity': quantity,
+                    'price': price
+                })
+                total_price += price
         
         # Create order
         order = Order.objects.create(
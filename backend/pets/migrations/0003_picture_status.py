@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def queue_existing_pictures(apps, schema_editor):
+    # Pictures uploaded before the worker existed get processed on its first run
+    PetProfile = apps.get_model('pets', 'PetProfile')
+    PetProfile.objects.exclude(pet_picture='').exclude(pet_picture__isnull=True).update(pet_picture_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_petprofile_branch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petprofile',
+            name='pet_picture_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='petprofile',
+            index=models.Index(fields=['pet_picture_status'], name='pet_picture_status_idx'),
+        ),
+        migrations.RunPython(queue_existing_pictures, migrations.RunPython.noop),
+    ]
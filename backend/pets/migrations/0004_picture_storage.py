@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:23
+
+import imaging.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0003_picture_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='petprofile',
+            name='pet_picture',
+            field=models.ImageField(blank=True, null=True, storage=imaging.storage.ContentAddressedStorage(), upload_to='pet_pics/'),
+        ),
+    ]
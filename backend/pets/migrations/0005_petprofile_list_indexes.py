@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:25
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0004_picture_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='petprofile',
+            index=models.Index(fields=['branch', '-created_at'], name='pet_branch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petprofile',
+            index=models.Index(fields=['owner', '-created_at'], name='pet_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petprofile',
+            index=models.Index(django.db.models.functions.text.Lower('pet_name'), name='pet_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petprofile',
+            index=models.Index(django.db.models.functions.text.Lower('breed'), name='pet_breed_lower_idx'),
+        ),
+    ]
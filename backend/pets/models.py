@@ -1,6 +1,11 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 
+from imaging.blobs import release_ref, stored_name, swap_refs
+from imaging.pipeline import IMAGE_STATUS_CHOICES, is_new_upload
+from imaging.storage import ContentAddressedStorage
+
 
 class PetProfile(models.Model):
     GENDER_CHOICES = [
@@ -14,7 +19,10 @@ class PetProfile(models.Model):
     ]
 
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pets')
-    pet_picture = models.ImageField(upload_to='pet_pics/', blank=True, null=True)
+    # Stored once per distinct file under its SHA-256; see imaging.storage
+    pet_picture = models.ImageField(upload_to='pet_pics/', storage=ContentAddressedStorage(), blank=True, null=True)
+    # Set to 'pending' on upload; the process_images worker strips metadata and builds variants
+    pet_picture_status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default='ready')
     pet_name = models.CharField(max_length=100)
     breed = models.CharField(max_length=100)
     branch = models.CharField(max_length=50, choices=BRANCH_CHOICES, default='Matina')
@@ -30,5 +38,31 @@ class PetProfile(models.Model):
     def __str__(self):
         return f"{self.pet_name} ({self.owner.username})"
 
+    def save(self, *args, **kwargs):
+        # New uploads are stored as-is here and processed off-request by process_images
+        if is_new_upload(self.pet_picture):
+            self.pet_picture_status = 'pending'
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'pet_picture' not in update_fields:
+            return super().save(*args, **kwargs)
+        old_picture = stored_name(self, 'pet_picture')
+        super().save(*args, **kwargs)
+        swap_refs(old_picture, self.pet_picture.name, self.pet_picture.storage)
+
+    def delete(self, *args, **kwargs):
+        picture = self.pet_picture.name
+        result = super().delete(*args, **kwargs)
+        release_ref(picture)
+        return result
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['pet_picture_status'], name='pet_picture_status_idx'),
+            # Admin list: newest first, optionally per branch/owner
+            models.Index(fields=['branch', '-created_at'], name='pet_branch_created_idx'),
+            models.Index(fields=['owner', '-created_at'], name='pet_owner_created_idx'),
+            # Case-insensitive breed filter and name/breed prefix search (accounts.search)
+            models.Index(Lower('pet_name'), name='pet_name_lower_idx'),
+            models.Index(Lower('breed'), name='pet_breed_lower_idx'),
+        ]
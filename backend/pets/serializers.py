@@ -2,6 +2,8 @@ from rest_framework import serializers
 from .models import PetProfile
 from django.contrib.auth.models import User
 
+from imaging.pipeline import variant_urls
+
 
 class OwnerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,10 +13,15 @@ class OwnerSerializer(serializers.ModelSerializer):
 
 class PetProfileSerializer(serializers.ModelSerializer):
     owner_details = OwnerSerializer(source='owner', read_only=True)
+    pet_picture_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = PetProfile
-        fields = ['id', 'owner', 'owner_details', 'pet_picture', 'pet_name', 'breed', 'branch',
+        fields = ['id', 'owner', 'owner_details', 'pet_picture', 'pet_picture_status', 'pet_picture_variants', 'pet_name', 'breed', 'branch',
                   'age_value', 'age_unit', 'birthdate', 'gender', 'weight_lbs', 
                   'additional_notes', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'pet_picture_status', 'created_at', 'updated_at']
+
+    def get_pet_picture_variants(self, obj):
+        # Small WebP renditions for avatars and lists; pet_picture stays the full-size original
+        return variant_urls(obj.pet_picture, obj.pet_picture_status, self.context.get('request'))
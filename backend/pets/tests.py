@@ -0,0 +1,119 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import PetProfile
+
+
+def make_pet(owner, pet_name, breed='Aspin', branch='Matina'):
+    return PetProfile.objects.create(
+        owner=owner, pet_name=pet_name, breed=breed, branch=branch, age_value=2, age_unit='years',
+        birthdate=date(2023, 1, 1), gender='male', weight_lbs='10.00'
+    )
+
+
+class PetProfileListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', password='unused', is_staff=True)
+        cls.alice = User.objects.create_user(username='alice', email='alice@example.com', password='unused')
+        cls.bob = User.objects.create_user(username='bob', email='bob@example.com', password='unused')
+        make_pet(cls.alice, 'Mochi', breed='Shih Tzu')
+        make_pet(cls.alice, 'Max', breed='Beagle', branch='Toril')
+        make_pet(cls.bob, 'Bantay', breed='Aspin')
+        make_pet(cls.bob, 'Muning', breed='Persian', branch='Toril')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def names(self, **params):
+        response = self.client.get('/api/pets/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(pet['pet_name'] for pet in response.data['results'])
+
+    def test_filters(self):
+        self.assertEqual(self.names(branch='Toril'), ['Max', 'Muning'])
+        self.assertEqual(self.names(owner=self.alice.pk), ['Max', 'Mochi'])
+        self.assertEqual(self.names(breed='shih tzu'), ['Mochi'])
+        # Prefix of either the pet name or the breed
+        self.assertEqual(self.names(search='m'), ['Max', 'Mochi', 'Muning'])
+        self.assertEqual(self.names(search='BEA'), ['Max'])
+
+    def test_invalid_filters_are_rejected(self):
+        for params in [{'branch': 'Davao'}, {'owner': 'alice'}]:
+            self.assertEqual(self.client.get('/api/pets/', params).status_code, 400)
+
+    def test_pages_load_owners_in_the_same_query(self):
+        for i in range(10):
+            make_pet(self.bob, f'Pet {i}')
+        response = self.client.get('/api/pets/', {'page_size': 5})
+        self.assertEqual(response.data['count'], 14)
+        seen = []
+        while True:
+            seen += [pet['id'] for pet in response.data['results']]
+            self.assertTrue(all(pet['owner_details']['username'] for pet in response.data['results']))
+            if not response.data['next']:
+                break
+            with self.assertNumQueries(2):  # Count and the joined page
+                response = self.client.get(response.data['next'])
+        self.assertEqual(len(set(seen)), 14)
+
+    def test_customers_only_see_their_own_pets(self):
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get('/api/pets/').status_code, 403)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/pets/my-pets/')
+        self.assertEqual(sorted(pet['pet_name'] for pet in response.data), ['Max', 'Mochi'])
+
+
+class OwnerSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', password='unused', is_staff=True)
+        for username, email, first_name in [
+            ('maria', 'maria@example.com', 'Maria'),
+            ('mark', 'mdelacruz@example.com', 'Mark'),
+            ('jose', 'jose@example.com', 'Mario'),
+            ('ana', 'ana@example.com', 'Ana'),
+        ]:
+            User.objects.create_user(username=username, email=email, first_name=first_name, password='unused')
+        User.objects.create_user(username='martha', email='martha@example.com', password='unused', is_active=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, **params):
+        response = self.client.get('/api/users/owners/', params)
+        self.assertEqual(response.status_code, 200)
+        return [owner['username'] for owner in response.data]
+
+    def test_matches_any_field_prefix(self):
+        # Staff and deactivated accounts are never offered as owners
+        self.assertEqual(self.search(q='MAR'), ['jose', 'maria', 'mark'])
+        self.assertEqual(self.search(q='mdela'), ['mark'])
+        self.assertEqual(self.search(q='adm'), [])
+
+    def test_limit(self):
+        self.assertEqual(self.search(q='m', limit=2), ['jose', 'maria'])
+        self.assertEqual(len(self.search(q='m', limit=1000)), 3)  # Capped at MAX_LIMIT, not an error
+        self.assertEqual(self.client.get('/api/users/owners/', {'q': 'm', 'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/users/owners/', {'q': 'm', 'limit': 0}).status_code, 400)
+
+    def test_blank_query_returns_nothing(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search(q='  '), [])
+
+    def test_repeat_keystrokes_are_served_from_the_cache(self):
+        self.search(q='ma')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search(q='Ma'), ['jose', 'maria', 'mark'])
+
+    def test_customers_cannot_search(self):
+        self.client.force_authenticate(User.objects.get(username='ana'))
+        self.assertEqual(self.client.get('/api/users/owners/', {'q': 'ma'}).status_code, 403)
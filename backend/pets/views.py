@@ -1,20 +1,49 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
+from rest_framework.pagination import CursorPagination
 from .serializers import PetProfileSerializer, OwnerSerializer
 from .models import PetProfile
 from django.contrib.auth.models import User
 
+from accounts.search import case_insensitive_match, prefix_search
+
 
-class NormalUsersListAPIView(APIView):
-    """Get list of normal users (non-admin) for owner dropdown"""
+class OwnerSearchAPIView(APIView):
+    """Owner typeahead for the pet form: ?q=<prefix of username, email, first or last name>&limit=N.
+
+    Each keystroke is an index range probe per field (see accounts.search) capped
+    at `limit` rows; identical queries are answered from the cache for a few seconds.
+    """
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
 
     def get(self, request):
-        # Get all users who are not superusers and not staff
-        normal_users = User.objects.filter(is_superuser=False, is_staff=False)
-        serializer = OwnerSerializer(normal_users, many=True)
-        return Response(serializer.data)
+        term = request.GET.get('q', '').strip().lower()
+        if not term:
+            return Response([])
+        options = settings.OWNER_TYPEAHEAD
+        try:
+            limit = min(int(request.GET.get('limit', options['LIMIT'])), options['MAX_LIMIT'])
+        except ValueError:
+            return Response({"detail": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"detail": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Hashed so any input makes a valid cache key
+        cache_key = 'owner_typeahead:%s:%d' % (hashlib.sha1(term.encode()).hexdigest(), limit)
+        data = cache.get(cache_key)
+        if data is None:
+            owners = prefix_search(
+                User.objects.filter(is_superuser=False, is_staff=False, is_active=True),
+                term, ['username', 'email', 'first_name', 'last_name']
+            ).only('id', 'username', 'email', 'first_name', 'last_name').order_by('username')[:limit]
+            data = OwnerSerializer(owners, many=True).data
+            cache.set(cache_key, data, options['CACHE_SECONDS'])
+        return Response(data)
 
 
 class UserPetsListAPIView(APIView):
@@ -23,18 +52,62 @@ class UserPetsListAPIView(APIView):
 
     def get(self, request):
         # Get only pets that belong to the authenticated user
-        pets = PetProfile.objects.filter(owner=request.user)
+        pets = PetProfile.objects.filter(owner=request.user).select_related('owner')
         serializer = PetProfileSerializer(pets, many=True)
         return Response(serializer.data)
 
 
+class PetProfileCursorPagination(CursorPagination):
+    """Keyset pages, newest first; page N costs the same as page 1."""
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+
 class PetProfileListCreateAPIView(APIView):
+    """Paginated list of every pet for the management screen.
+
+    Filters: ?branch=Matina|Toril, ?owner=<user id>, ?breed=<exact, any case>,
+    ?search=<prefix of pet name or breed>.
+    """
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
 
     def get(self, request):
-        pets = PetProfile.objects.all()
-        serializer = PetProfileSerializer(pets, many=True)
-        return Response(serializer.data)
+        pets = PetProfile.objects.select_related('owner')
+
+        branch = request.GET.get('branch')
+        if branch:
+            if branch not in dict(PetProfile.BRANCH_CHOICES):
+                return Response({"detail": "Invalid branch. Must be Matina or Toril."}, status=status.HTTP_400_BAD_REQUEST)
+            pets = pets.filter(branch=branch)
+
+        owner = request.GET.get('owner')
+        if owner:
+            if not owner.isdigit():
+                return Response({"detail": "Invalid owner id."}, status=status.HTTP_400_BAD_REQUEST)
+            pets = pets.filter(owner_id=int(owner))
+
+        breed = request.GET.get('breed', '').strip()
+        if breed:
+            pets = case_insensitive_match(pets, 'breed', breed)
+
+        if request.GET.get('search'):
+            pets = prefix_search(pets, request.GET['search'], ['pet_name', 'breed'])
+
+        paginator = PetProfileCursorPagination()
+        paginator.count = pets.count()
+        page = paginator.paginate_queryset(pets, request, view=self)
+        serializer = PetProfileSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         serializer = PetProfileSerializer(data=request.data)
@@ -49,7 +122,7 @@ class PetProfileRetrieveUpdateDestroyAPIView(APIView):
 
     def get_object(self, pk):
         try:
-            return PetProfile.objects.get(pk=pk)
+            return PetProfile.objects.select_related('owner').get(pk=pk)
         except PetProfile.DoesNotExist:
             return None
 
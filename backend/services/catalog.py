@@ -0,0 +1,96 @@
+import threading
+import time as _time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import quote_etag
+
+VERSION_KEY = 'services:catalog:version'
+
+
+def _new_version():
+    # Time-based so a version that was evicted never comes back with a value it had before
+    return _time.time_ns()
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Make every process reload the catalog on its next read; called when a Service changes."""
+    cache.set(VERSION_KEY, _new_version(), None)
+    # This process reloads at once instead of after CHECK_INTERVAL
+    service_catalog.clear()
+
+
+class _Snapshot:
+    def __init__(self, version, services, data):
+        self.version = version
+        self.loaded_at = _time.monotonic()
+        self.by_id = {service.pk: service for service in services}
+        self.services = services
+        # Serialized once per version for the list endpoint
+        self.data = data
+        self.etag = quote_etag(f'services-{version}')
+
+
+class ServiceCatalog:
+    """Process-local copy of every Service, reloaded when the shared version moves.
+
+    Services change rarely and are read on every booking, availability and order
+    request, so each process keeps them in memory and reads the shared version
+    key at most once per SERVICE_CATALOG['CHECK_INTERVAL'] seconds; reads in
+    between never leave the process. A copy older than MAX_AGE seconds is
+    reloaded anyway, which bounds staleness when the cache is not shared between
+    processes (the local-memory backend). The Service instances handed out are
+    shared: read them, never modify or save them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def snapshot(self):
+        options = getattr(settings, 'SERVICE_CATALOG', {})
+        max_age = options.get('MAX_AGE', 300)
+        snapshot = self._snapshot
+        now = _time.monotonic()
+        if (snapshot is not None and now - self._checked_at < options.get('CHECK_INTERVAL', 2)
+                and now - snapshot.loaded_at <= max_age):
+            return snapshot
+
+        version = current_version()
+        self._checked_at = now
+        if snapshot is None or snapshot.version != version or _time.monotonic() - snapshot.loaded_at > max_age:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version or _time.monotonic() - snapshot.loaded_at > max_age:
+                    snapshot = self._snapshot = self._load(version)
+        return snapshot
+
+    def _load(self, version):
+        from .models import Service
+        from .serializers import ServiceSerializer
+
+        services = list(Service.objects.all())
+        return _Snapshot(version, services, ServiceSerializer(services, many=True).data)
+
+    def get(self, service_id):
+        """The Service with this id, or None."""
+        try:
+            return self.snapshot().by_id.get(int(service_id))
+        except (TypeError, ValueError):
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+
+service_catalog = ServiceCatalog()
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+
+from .catalog import bump_version
 
 
 class Service(models.Model):
@@ -13,5 +15,21 @@ class Service(models.Model):
     def __str__(self):
         return self.service_name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # After commit, so no process reloads the catalog before the change is visible
+        transaction.on_commit(bump_version)
+        # Duration or overlap changes affect every cached availability day. Also after
+        # commit, or a concurrent lookup could cache the old service under the new generation
+        from appointments.availability import invalidate_all_availability
+        transaction.on_commit(invalidate_all_availability)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(bump_version)
+        from appointments.availability import invalidate_all_availability
+        transaction.on_commit(invalidate_all_availability)
+        return result
+
     class Meta:
         ordering = ['-created_at']
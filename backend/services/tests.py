@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from appointments.availability import _generation
+
+from .catalog import service_catalog
+from .models import Service
+
+
+class ServiceCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        service_catalog.clear()
+        self.service = Service.objects.create(
+            service_name='Grooming', description='Full groom', duration_minutes=60
+        )
+        self.client = APIClient()
+
+    def test_list_is_served_from_memory(self):
+        self.client.get('/api/services/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/services/')
+        self.assertEqual([service['service_name'] for service in response.data], ['Grooming'])
+
+    def test_unchanged_list_returns_304(self):
+        etag = self.client.get('/api/services/')['ETag']
+        response = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_change_is_visible_after_commit(self):
+        etag = self.client.get('/api/services/')['ETag']
+        admin = User.objects.create_user(username='admin', password='unused', is_staff=True)
+        self.client.force_authenticate(admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f'/api/services/{self.service.id}/', {'duration_minutes': 90})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['duration_minutes'], 90)
+        self.assertEqual(service_catalog.get(self.service.id).duration_minutes, 90)
+
+    def test_availability_is_invalidated_only_after_commit(self):
+        generation = _generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.service.duration_minutes = 90
+            self.service.save()
+            self.assertEqual(_generation(), generation)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(_generation(), generation)
+
+    def test_delete_drops_the_service(self):
+        self.assertIsNotNone(service_catalog.get(self.service.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.get(pk=self.service.id).delete()
+        self.assertIsNone(service_catalog.get(self.service.id))
@@ -3,6 +3,8 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from .serializers import ServiceSerializer
 from .models import Service
+from .catalog import service_catalog
+from django.utils.cache import get_conditional_response
 
 
 class ServiceListCreateAPIView(APIView):
@@ -13,9 +15,15 @@ class ServiceListCreateAPIView(APIView):
         return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
 
     def get(self, request):
-        services = Service.objects.all()
-        serializer = ServiceSerializer(services, many=True)
-        return Response(serializer.data)
+        # Served from the in-process catalog; the ETag changes whenever any service does
+        catalog = service_catalog.snapshot()
+        not_modified = get_conditional_response(request, etag=catalog.etag)
+        if not_modified is not None:
+            return not_modified
+        response = Response(catalog.data)
+        response['ETag'] = catalog.etag
+        response['Cache-Control'] = 'no-cache'
+        return response
 
     def post(self, request):
         serializer = ServiceSerializer(data=request.data)
@@ -0,0 +1,91 @@
+import React, { useState, useEffect, useRef } from 'react';
+import { searchOwners } from '../services/petService';
+
+const ownerLabel = (user) => `${user.username} (${user.first_name} ${user.last_name})`;
+
+export default function OwnerTypeahead({
+  label,
+  value,
+  selectedOwner = null,
+  onSelect,
+  token,
+  error = null,
+  required = false,
+  className = '',
+  resetKey = 0,
+}) {
+  const [query, setQuery] = useState(selectedOwner ? ownerLabel(selectedOwner) : '');
+  const [results, setResults] = useState([]);
+  const [open, setOpen] = useState(false);
+
+  // Clear the text only when the parent resets the form; an empty value alone also
+  // means the user is typing a new search, and that text must stay
+  const lastResetKey = useRef(resetKey);
+  useEffect(() => {
+    if (resetKey === lastResetKey.current) return;
+    lastResetKey.current = resetKey;
+    setQuery('');
+    setOpen(false);
+  }, [resetKey]);
+
+  useEffect(() => {
+    if (!open || !query.trim()) {
+      setResults([]);
+      return undefined;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        setResults(await searchOwners(query.trim(), token));
+      } catch (err) {
+        console.error(err);
+        setResults([]);
+      }
+    }, 200);
+    return () => clearTimeout(timer);
+  }, [query, open, token]);
+
+  const handleChange = (e) => {
+    setQuery(e.target.value);
+    setOpen(true);
+    if (value) onSelect('');
+  };
+
+  const handlePick = (user) => {
+    setQuery(ownerLabel(user));
+    setOpen(false);
+    onSelect(user.id);
+  };
+
+  return (
+    <div className={`relative ${className}`}>
+      <label className="block text-sm font-medium">
+        {label}
+        {required && <span className="text-red-500 ml-1">*</span>}
+      </label>
+      <input
+        type="text"
+        value={query}
+        onChange={handleChange}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setTimeout(() => setOpen(false), 150)}
+        placeholder="Type a username, email or name"
+        className="mt-1 w-full border rounded px-3 py-2 focus:outline-none focus:ring-2 focus:ring-blue-500"
+      />
+      {open && results.length > 0 && (
+        <ul className="absolute z-10 mt-1 w-full bg-white border rounded shadow max-h-60 overflow-y-auto">
+          {results.map((user) => (
+            <li
+              key={user.id}
+              onMouseDown={() => handlePick(user)}
+              className="px-3 py-2 hover:bg-blue-50 cursor-pointer text-sm"
+            >
+              {ownerLabel(user)}
+              <span className="text-gray-500 ml-2">{user.email}</span>
+            </li>
+          ))}
+        </ul>
+      )}
+      {error && <div className="text-red-600 text-sm mt-1">{error}</div>}
+    </div>
+  );
+}
@@ -158,7 +158,7 @@ export default function Navbar() {
                     <button onClick={() => setMenuOpen(s => !s)} aria-haspopup="true" aria-expanded={menuOpen} className="inline-flex items-center gap-2 px-3 py-2 rounded-md hover:bg-accent-peach transition-colors">
                       <span className="relative inline-block">
                         {user.profile_picture ? (
-                          <img src={user.profile_picture} alt="avatar" className="w-8 h-8 rounded-full object-cover border-2 border-secondary" />
+                          <img src={user.profile_picture_variants?.thumb || user.profile_picture} alt="avatar" className="w-8 h-8 rounded-full object-cover border-2 border-secondary" />
                         ) : (
                           <div className="w-8 h-8 rounded-full bg-secondary text-accent-cream flex items-center justify-center font-medium border-2 border-secondary">{(user.username || 'U')[0].toUpperCase()}</div>
                         )}
@@ -173,7 +173,7 @@ export default function Navbar() {
                         <div className="px-4 py-2 border-b border-secondary">
                           <div className="flex items-center gap-3">
                             {user.profile_picture ? (
-                              <img src={user.profile_picture} alt="avatar" className="w-10 h-10 rounded-full object-cover border-2 border-secondary" />
+                              <img src={user.profile_picture_variants?.thumb || user.profile_picture} alt="avatar" className="w-10 h-10 rounded-full object-cover border-2 border-secondary" />
                             ) : (
                               <div className="w-10 h-10 rounded-full bg-secondary text-accent-cream flex items-center justify-center font-medium border-2 border-secondary">{(user.username || 'U')[0].toUpperCase()}</div>
                             )}
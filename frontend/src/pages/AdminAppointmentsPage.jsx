@@ -10,16 +10,32 @@ import GenderIcon from '../components/GenderIcon';
 import { formatAge } from '../utils/formatters';
 import ConfirmDialog from '../components/ConfirmDialog';
 
+const PAGE_SIZE = 50;
+
+// '2025-03' -> { start: '2025-03-01', end: '2025-03-31' }
+const monthRange = (month) => {
+  const [year, monthNumber] = month.split('-').map(Number);
+  const lastDay = new Date(year, monthNumber, 0).getDate();
+  return { start: `${month}-01`, end: `${month}-${String(lastDay).padStart(2, '0')}` };
+};
+
+// The cursor query parameter of a paginated response's next URL
+const cursorFrom = (url) => (url ? new URL(url).searchParams.get('cursor') : null);
+
 export default function AdminAppointmentsPage() {
   const navigate = useNavigate();
   const { user } = useAuth();
   const toast = useToast();
   
   const [appointments, setAppointments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [calendarDays, setCalendarDays] = useState([]);
   const [statusFilter, setStatusFilter] = useState('upcoming'); // upcoming, all
   const [branchFilter, setBranchFilter] = useState('all');
   const [dateFilter, setDateFilter] = useState('');
+  const [dayFilter, setDayFilter] = useState(''); // a day picked in the month overview
   const [confirmDialog, setConfirmDialog] = useState({ isOpen: false, appointmentId: null, action: '', newStatus: '' });
 
   useEffect(() => {
@@ -43,67 +59,73 @@ export default function AdminAppointmentsPage() {
 
     fetchAppointments();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [user, statusFilter, branchFilter, dateFilter]);
+  }, [user, statusFilter, branchFilter, dateFilter, dayFilter]);
+
+  useEffect(() => {
+    if (!user?.is_staff) return;
+    fetchCalendar();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [user, branchFilter, dateFilter]);
 
-  const fetchAppointments = async () => {
-    setLoading(true);
+  const buildFilters = () => {
+    // Filtering happens in the database; the list comes back in cursor pages
+    const filters = { pageSize: PAGE_SIZE };
+    if (statusFilter === 'upcoming') filters.status = 'pending,confirmed';
+    if (branchFilter !== 'all') filters.branch = branchFilter;
+    if (dayFilter) {
+      filters.date = dayFilter;
+    } else if (dateFilter) {
+      const { start, end } = monthRange(dateFilter);
+      filters.startDate = start;
+      filters.endDate = end;
+    }
+    return filters;
+  };
+
+  const fetchAppointments = async (cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     try {
-      const filters = {};
-      
-      if (statusFilter === 'upcoming') {
-        // Fetch pending and confirmed only
-        const pendingData = await appointmentService.getAllAppointmentsAdmin({ status: 'pending' });
-        const confirmedData = await appointmentService.getAllAppointmentsAdmin({ status: 'confirmed' });
-        const combined = [...(Array.isArray(pendingData) ? pendingData : []), ...(Array.isArray(confirmedData) ? confirmedData : [])];
-        
-        // Apply additional filters
-        let filtered = combined;
-        if (branchFilter !== 'all') {
-          filtered = filtered.filter(apt => apt.branch === branchFilter);
-        }
-        if (dateFilter) {
-          // Filter by month (YYYY-MM format)
-          filtered = filtered.filter(apt => {
-            const appointmentMonth = apt.appointment_date.substring(0, 7); // Get YYYY-MM from YYYY-MM-DD
-            return appointmentMonth === dateFilter;
-          });
-        }
-        
-        // Sort by date and time
-        filtered.sort((a, b) => {
-          const dateCompare = new Date(a.appointment_date) - new Date(b.appointment_date);
-          if (dateCompare !== 0) return dateCompare;
-          return a.start_time.localeCompare(b.start_time);
-        });
-        
-        setAppointments(filtered);
-      } else {
-        // Fetch all appointments
-        if (branchFilter !== 'all') filters.branch = branchFilter;
-        if (dateFilter) {
-          // Note: Backend will need to be updated to handle month filtering
-          // For now, we'll fetch all and filter on frontend
-          const data = await appointmentService.getAllAppointmentsAdmin(filters);
-          let allAppts = Array.isArray(data) ? data : [];
-          
-          // Filter by month
-          allAppts = allAppts.filter(apt => {
-            const appointmentMonth = apt.appointment_date.substring(0, 7);
-            return appointmentMonth === dateFilter;
-          });
-          
-          setAppointments(allAppts);
-        } else {
-          const data = await appointmentService.getAllAppointmentsAdmin(filters);
-          setAppointments(Array.isArray(data) ? data : []);
-        }
-      }
+      const data = await appointmentService.getAllAppointmentsAdmin({ ...buildFilters(), cursor });
+      const results = data.results || [];
+      setAppointments((prev) => (cursor ? [...prev, ...results] : results));
+      setNextCursor(cursorFrom(data.next));
     } catch (error) {
       console.error('Error fetching appointments:', error);
       toast.showToast('Failed to load appointments', 'error');
-      setAppointments([]);
+      if (!cursor) setAppointments([]);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
+    }
+  };
+
+  const fetchCalendar = async () => {
+    if (!dateFilter) {
+      setCalendarDays([]);
+      return;
+    }
+    try {
+      const { start, end } = monthRange(dateFilter);
+      const data = await appointmentService.getAdminCalendarSummary(
+        start, end, branchFilter !== 'all' ? branchFilter : undefined
+      );
+      // Rows are per day, branch and status (already in date order); fold them into one entry per day
+      const byDay = {};
+      data.days.forEach((row) => {
+        if (!byDay[row.date]) {
+          byDay[row.date] = { date: row.date, total: 0, pending: 0, confirmed: 0, completed: 0, cancelled: 0 };
+        }
+        byDay[row.date][row.status] += row.count;
+        byDay[row.date].total += row.count;
+      });
+      setCalendarDays(Object.values(byDay));
+    } catch (error) {
+      console.error('Error fetching appointment calendar:', error);
+      setCalendarDays([]);
     }
   };
 
@@ -113,6 +135,7 @@ export default function AdminAppointmentsPage() {
       toast.showToast(`Appointment ${confirmDialog.action} successfully`, 'success');
       setConfirmDialog({ isOpen: false, appointmentId: null, action: '', newStatus: '' });
       fetchAppointments();
+      fetchCalendar();
     } catch (error) {
       console.error('Error updating appointment:', error);
       toast.showToast('Failed to update appointment', 'error');
@@ -220,7 +243,10 @@ export default function AdminAppointmentsPage() {
               <input
                 type="month"
                 value={dateFilter}
-                onChange={(e) => setDateFilter(e.target.value)}
+                onChange={(e) => {
+                  setDateFilter(e.target.value);
+                  setDayFilter('');
+                }}
                 className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
               />
             </div>
@@ -231,6 +257,7 @@ export default function AdminAppointmentsPage() {
                 onClick={() => {
                   setBranchFilter('all');
                   setDateFilter('');
+                  setDayFilter('');
                   setStatusFilter('upcoming');
                 }}
                 className="w-full px-4 py-2 bg-gray-200 text-gray-700 rounded-lg hover:bg-gray-300"
@@ -241,6 +268,31 @@ export default function AdminAppointmentsPage() {
           </div>
         </div>
 
+        {/* Month Overview: counts per day from the calendar endpoint; click a day to list it */}
+        {dateFilter && calendarDays.length > 0 && (
+          <div className="bg-white rounded-lg shadow-sm p-6 mb-6">
+            <h2 className="text-lg font-semibold text-gray-900 mb-4">Month Overview</h2>
+            <div className="grid grid-cols-2 sm:grid-cols-4 md:grid-cols-7 gap-2">
+              {calendarDays.map((day) => (
+                <button
+                  key={day.date}
+                  onClick={() => setDayFilter(dayFilter === day.date ? '' : day.date)}
+                  className={`text-left p-2 rounded-lg border ${
+                    dayFilter === day.date ? 'border-blue-600 bg-blue-50' : 'border-gray-200 hover:bg-gray-50'
+                  }`}
+                >
+                  <div className="text-sm font-medium text-gray-900">
+                    {new Date(day.date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' })}
+                  </div>
+                  <div className="text-xs text-gray-600">{day.total} total</div>
+                  <div className="text-xs text-yellow-700">{day.pending} pending</div>
+                  <div className="text-xs text-blue-700">{day.confirmed} confirmed</div>
+                </button>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Appointments List */}
         {loading ? (
           <div className="flex justify-center items-center h-64">
@@ -302,7 +354,7 @@ export default function AdminAppointmentsPage() {
                 {appointment.pet_details && (
                   <div className="border-t pt-4 mb-4">
                     <div className="flex items-center gap-3">
-                      <PetAvatar imageUrl={appointment.pet_details.pet_picture} size="small" />
+                      <PetAvatar imageUrl={appointment.pet_details.pet_picture_variants?.thumb || appointment.pet_details.pet_picture} size="small" />
                       <div>
                         <div className="flex items-center gap-2">
                           <span className="font-medium text-gray-900">{appointment.pet_details.pet_name}</span>
@@ -388,6 +440,17 @@ export default function AdminAppointmentsPage() {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <div className="flex justify-center">
+                <button
+                  onClick={() => fetchAppointments(nextCursor)}
+                  disabled={loadingMore}
+                  className="px-6 py-2 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -28,6 +28,7 @@ export default function AppointmentPage() {
   const [selectedDate, setSelectedDate] = useState('');
   const [selectedTimeSlot, setSelectedTimeSlot] = useState(null);
   const [availableSlots, setAvailableSlots] = useState([]);
+  const [businessHours, setBusinessHours] = useState('8:00 AM - 5:00 PM');
   const [loadingSlots, setLoadingSlots] = useState(false);
   const [notes, setNotes] = useState('');
 
@@ -111,6 +112,9 @@ export default function AppointmentPage() {
         selectedService.id
       );
       setAvailableSlots(data.available_slots || []);
+      if (data.business_hours) {
+        setBusinessHours(data.business_hours.display);
+      }
       
       if (data.available_slots.length === 0) {
         toast.showToast('No available slots for this date. Please choose another date.', 'warning');
@@ -412,7 +416,7 @@ export default function AppointmentPage() {
                 <FaClock className="inline mr-2" />
                 Available Time Slots
               </h3>
-              <p className="text-sm text-accent-cream mb-4">Business hours: 8:00 AM - 5:00 PM</p>
+              <p className="text-sm text-accent-cream mb-4">Business hours: {businessHours}</p>
 
               {loadingSlots ? (
                 <div className="flex justify-center items-center h-32">
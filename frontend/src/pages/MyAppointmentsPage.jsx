@@ -233,7 +233,7 @@ export default function MyAppointmentsPage() {
                       {appointment.pet_details && (
                         <div className="border-t pt-4 mb-4">
                           <div className="flex items-center gap-3">
-                            <PetAvatar imageUrl={appointment.pet_details.pet_picture} size="small" />
+                            <PetAvatar imageUrl={appointment.pet_details.pet_picture_variants?.thumb || appointment.pet_details.pet_picture} size="small" />
                             <div>
                               <div className="flex items-center gap-2">
                                 <span className="font-medium text-gray-900">{appointment.pet_details.pet_name}</span>
@@ -305,7 +305,7 @@ export default function MyAppointmentsPage() {
                       {appointment.pet_details && (
                         <div className="border-t pt-4 mt-4">
                           <div className="flex items-center gap-3">
-                            <PetAvatar imageUrl={appointment.pet_details.pet_picture} size="small" />
+                            <PetAvatar imageUrl={appointment.pet_details.pet_picture_variants?.thumb || appointment.pet_details.pet_picture} size="small" />
                             <div>
                               <div className="flex items-center gap-2">
                                 <span className="font-medium text-gray-900">{appointment.pet_details.pet_name}</span>
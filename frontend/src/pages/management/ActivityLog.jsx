@@ -1,10 +1,10 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import { FaBan, FaUserCheck } from 'react-icons/fa';
+import { FaBan, FaHistory, FaUserCheck } from 'react-icons/fa';
 import { useToast } from '../../hooks/useToast';
 import Toast from '../../components/Toast';
 import ConfirmDialog from '../../components/ConfirmDialog';
 import Modal from '../../components/Modal';
-import { fetchLoginActivities, deactivateUser, fetchDeactivatedUsers, reactivateUser } from '../../services/activityService';
+import { fetchLoginActivities, fetchLoginActivityRollups, deactivateUser, fetchUserDirectory, reactivateUser } from '../../services/activityService';
 import managementBg from '../../assets/Management.png';
 
 const ActivityLog = () => {
@@ -18,9 +18,14 @@ const ActivityLog = () => {
   const [selectedUser, setSelectedUser] = useState(null);
   const [showDeactivatedModal, setShowDeactivatedModal] = useState(false);
   const [deactivatedUsers, setDeactivatedUsers] = useState([]);
+  const [deactivatedCursor, setDeactivatedCursor] = useState(null);
   const [loadingDeactivated, setLoadingDeactivated] = useState(false);
   const [showReactivateConfirm, setShowReactivateConfirm] = useState(false);
   const [selectedUserToReactivate, setSelectedUserToReactivate] = useState(null);
+  const [showHistoryModal, setShowHistoryModal] = useState(false);
+  const [rollups, setRollups] = useState([]);
+  const [rollupsCursor, setRollupsCursor] = useState(null);
+  const [loadingRollups, setLoadingRollups] = useState(false);
 
   const fetchActivities = useCallback(async (page) => {
     try {
@@ -70,12 +75,14 @@ const ActivityLog = () => {
     }
   };
 
-  const fetchDeactivatedUsersList = async () => {
+  // Paged from the user directory, so the modal stays fast however many accounts are deactivated
+  const fetchDeactivatedUsersList = async (cursor = null) => {
     try {
       setLoadingDeactivated(true);
       const token = localStorage.getItem('access') || sessionStorage.getItem('access');
-      const data = await fetchDeactivatedUsers(token);
-      setDeactivatedUsers(data);
+      const data = await fetchUserDirectory(token, { cursor, active: false });
+      setDeactivatedUsers((prev) => (cursor ? [...prev, ...data.results] : data.results));
+      setDeactivatedCursor(data.next ? new URL(data.next).searchParams.get('cursor') : null);
     } catch (error) {
       console.error('Error fetching deactivated users:', error);
       showToast('Failed to load deactivated users', 'error');
@@ -89,6 +96,27 @@ const ActivityLog = () => {
     fetchDeactivatedUsersList();
   };
 
+  // Logins older than the retention window only exist as daily summaries (rollup_login_activity)
+  const fetchRollups = async (cursor = null) => {
+    try {
+      setLoadingRollups(true);
+      const token = localStorage.getItem('access') || sessionStorage.getItem('access');
+      const data = await fetchLoginActivityRollups(token, { cursor });
+      setRollups((prev) => (cursor ? [...prev, ...data.results] : data.results));
+      setRollupsCursor(data.next ? new URL(data.next).searchParams.get('cursor') : null);
+    } catch (error) {
+      console.error('Error fetching login history:', error);
+      showToast('Failed to load older activity', 'error');
+    } finally {
+      setLoadingRollups(false);
+    }
+  };
+
+  const handleShowHistory = () => {
+    setShowHistoryModal(true);
+    fetchRollups();
+  };
+
   const handleReactivate = (user) => {
     console.log('handleReactivate called with user:', user);
     setSelectedUserToReactivate(user);
@@ -159,12 +187,20 @@ const ActivityLog = () => {
     <div className="container mx-auto p-6 min-h-screen bg-accent-cream bg-cover bg-center bg-no-repeat" style={{ backgroundImage: `url(${managementBg})` }}>
       <div className="flex justify-between items-center mb-6">
         <h1 className="text-3xl font-bold text-accent-cream">Activity Log</h1>
-        <button
-          onClick={handleShowDeactivatedUsers}
-          className="bg-orange-500 hover:bg-orange-600 text-white px-4 py-2 rounded-lg flex items-center gap-2 transition-colors"
-        >
-          <FaUserCheck /> Deactivated Accounts
-        </button>
+        <div className="flex gap-3">
+          <button
+            onClick={handleShowHistory}
+            className="bg-blue-500 hover:bg-blue-600 text-white px-4 py-2 rounded-lg flex items-center gap-2 transition-colors"
+          >
+            <FaHistory /> Older Activity
+          </button>
+          <button
+            onClick={handleShowDeactivatedUsers}
+            className="bg-orange-500 hover:bg-orange-600 text-white px-4 py-2 rounded-lg flex items-center gap-2 transition-colors"
+          >
+            <FaUserCheck /> Deactivated Accounts
+          </button>
+        </div>
       </div>
 
       {loading ? (
@@ -306,7 +342,7 @@ const ActivityLog = () => {
           maxWidth="4xl"
         >
           <div className="p-4">
-            {loadingDeactivated ? (
+            {loadingDeactivated && deactivatedUsers.length === 0 ? (
               <div className="flex justify-center items-center h-32">
                 <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500"></div>
               </div>
@@ -380,12 +416,106 @@ const ActivityLog = () => {
                     </table>
                   </div>
                 )}
+                {deactivatedCursor && (
+                  <div className="flex justify-center mt-4">
+                    <button
+                      onClick={() => fetchDeactivatedUsersList(deactivatedCursor)}
+                      disabled={loadingDeactivated}
+                      className="px-4 py-2 bg-gray-200 text-gray-700 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-300"
+                    >
+                      {loadingDeactivated ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
               </>
             )}
           </div>
         </Modal>
       )}
 
+      {showHistoryModal && (
+        <Modal
+          isOpen={showHistoryModal}
+          title="Older Activity (daily summaries)"
+          onClose={() => setShowHistoryModal(false)}
+          maxWidth="4xl"
+        >
+          <div className="p-4">
+            {loadingRollups && rollups.length === 0 ? (
+              <div className="flex justify-center items-center h-32">
+                <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500"></div>
+              </div>
+            ) : rollups.length === 0 ? (
+              <div className="text-center py-8 text-gray-500">
+                No summarized activity yet
+              </div>
+            ) : (
+              <div className="overflow-x-auto">
+                <table className="min-w-full divide-y divide-gray-200">
+                  <thead className="bg-gray-50">
+                    <tr>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                        Day
+                      </th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                        Username
+                      </th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                        Role
+                      </th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                        Logins
+                      </th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                        Distinct IPs
+                      </th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                        First / Last Login
+                      </th>
+                    </tr>
+                  </thead>
+                  <tbody className="bg-white divide-y divide-gray-200">
+                    {rollups.map((rollup) => (
+                      <tr key={rollup.id} className="hover:bg-gray-50">
+                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                          {formatDate(rollup.day)}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                          {rollup.username}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                          {rollup.role}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                          {rollup.login_count}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                          {rollup.distinct_ips}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                          {new Date(rollup.first_login).toLocaleTimeString('en-US')} / {new Date(rollup.last_login).toLocaleTimeString('en-US')}
+                        </td>
+                      </tr>
+                    ))}
+                  </tbody>
+                </table>
+                {rollupsCursor && (
+                  <div className="flex justify-center mt-4">
+                    <button
+                      onClick={() => fetchRollups(rollupsCursor)}
+                      disabled={loadingRollups}
+                      className="px-4 py-2 bg-gray-200 text-gray-700 rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-300"
+                    >
+                      {loadingRollups ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
+              </div>
+            )}
+          </div>
+        </Modal>
+      )}
+
       {toast && <Toast message={toast.message} type={toast.type} onClose={hideToast} />}
     </div>
   );
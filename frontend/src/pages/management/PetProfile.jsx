@@ -10,11 +10,11 @@ import GenderSelector from '../../components/GenderSelector';
 import GenderIcon from '../../components/GenderIcon';
 import FormInput from '../../components/FormInput';
 import FormSelect from '../../components/FormSelect';
+import OwnerTypeahead from '../../components/OwnerTypeahead';
 import { formatAge } from '../../utils/formatters';
 import managementBg from '../../assets/Management.png';
 import {
   fetchPets as fetchPetsAPI,
-  fetchNormalUsers as fetchNormalUsersAPI,
   createPet,
   updatePet,
   deletePet,
@@ -36,8 +36,12 @@ export default function PetProfile() {
     weight_lbs: '',
     additional_notes: '',
   });
+  // Bumped by resetForm so the owner typeahead clears its text
+  const [ownerResetKey, setOwnerResetKey] = useState(0);
   const [pets, setPets] = useState([]);
-  const [normalUsers, setNormalUsers] = useState([]);
+  const [petCount, setPetCount] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [petFilters, setPetFilters] = useState({ search: '', branch: '' });
   const [errors, setErrors] = useState({});
   const [loading, setLoading] = useState(false);
   const [imagePreview, setImagePreview] = useState(null);
@@ -51,26 +55,20 @@ export default function PetProfile() {
   const [confirmDeleteDialog, setConfirmDeleteDialog] = useState({ isOpen: false, petId: null });
 
   useEffect(() => {
-    loadPets();
-    loadNormalUsers();
+    // Debounced so typing in the search box doesn't fire a request per key
+    const timer = setTimeout(() => loadPets(), 300);
+    return () => clearTimeout(timer);
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
+  }, [petFilters]);
 
-  const loadNormalUsers = async () => {
-    try {
-      const data = await fetchNormalUsersAPI(token);
-      setNormalUsers(data);
-    } catch (err) {
-      console.error(err);
-      showToast('Failed to fetch users.', 'error');
-    }
-  };
-
-  const loadPets = async () => {
+  // Without a cursor this reloads the first page for the current filters
+  const loadPets = async (cursor = null) => {
     setLoading(true);
     try {
-      const data = await fetchPetsAPI(token);
-      setPets(data);
+      const data = await fetchPetsAPI(token, { ...petFilters, cursor });
+      setPets((prev) => (cursor ? [...prev, ...data.results] : data.results));
+      setPetCount(data.count);
+      setNextCursor(data.next ? new URL(data.next).searchParams.get('cursor') : null);
     } catch (err) {
       console.error(err);
       showToast('Failed to fetch pets.', 'error');
@@ -156,6 +154,7 @@ export default function PetProfile() {
     });
     setImagePreview(null);
     setErrors({});
+    setOwnerResetKey((key) => key + 1);
   };
 
   const handleView = (pet) => {
@@ -272,16 +271,12 @@ export default function PetProfile() {
             </div>
 
             {/* Owner Dropdown */}
-            <FormSelect
+            <OwnerTypeahead
               label="Owner"
-              name="owner"
               value={form.owner}
-              onChange={handleChange}
-              options={normalUsers.map((user) => ({
-                value: user.id,
-                label: `${user.username} (${user.first_name} ${user.last_name})`,
-              }))}
-              placeholder="-- Select Owner --"
+              resetKey={ownerResetKey}
+              onSelect={(owner) => setForm((prev) => ({ ...prev, owner }))}
+              token={token}
               error={errors.owner}
               required
               className="col-span-2"
@@ -421,7 +416,25 @@ export default function PetProfile() {
         title="Pet Gallery"
         maxWidth="max-w-6xl"
       >
-        {loading ? (
+        <div className="flex gap-3 mb-4">
+          <input
+            type="text"
+            value={petFilters.search}
+            onChange={(e) => setPetFilters((prev) => ({ ...prev, search: e.target.value }))}
+            placeholder="Search by pet name or breed"
+            className="flex-1 border rounded px-3 py-2"
+          />
+          <select
+            value={petFilters.branch}
+            onChange={(e) => setPetFilters((prev) => ({ ...prev, branch: e.target.value }))}
+            className="border rounded px-3 py-2"
+          >
+            <option value="">All branches</option>
+            <option value="Matina">Matina</option>
+            <option value="Toril">Toril</option>
+          </select>
+        </div>
+        {loading && pets.length === 0 ? (
           <div className="text-center text-gray-500">Loading...</div>
         ) : pets.length === 0 ? (
           <div className="text-center text-gray-500">No pet profiles yet.</div>
@@ -430,7 +443,7 @@ export default function PetProfile() {
             {pets.map((pet) => (
               <div key={pet.id} className="border rounded-lg p-4 hover:shadow-lg transition-shadow">
                 <div className="flex flex-col items-center">
-                  <PetAvatar imageUrl={pet.pet_picture} size="large" className="mb-3" />
+                  <PetAvatar imageUrl={pet.pet_picture_variants?.medium || pet.pet_picture} size="large" className="mb-3" />
                   <div className="text-center w-full">
                     <div className="flex items-center justify-center gap-2 mb-1">
                       <h3 className="font-semibold text-lg">{pet.pet_name}</h3>
@@ -478,6 +491,20 @@ export default function PetProfile() {
             ))}
           </div>
         )}
+        {pets.length > 0 && (
+          <div className="flex justify-between items-center mt-4 text-sm text-gray-500">
+            <span>Showing {pets.length} of {petCount} pets</span>
+            {nextCursor && (
+              <button
+                onClick={() => loadPets(nextCursor)}
+                disabled={loading}
+                className="bg-purple-600 text-white px-4 py-2 rounded hover:bg-purple-700 disabled:opacity-50"
+              >
+                {loading ? 'Loading...' : 'Load more'}
+              </button>
+            )}
+          </div>
+        )}
       </Modal>
 
       {/* Edit Modal */}
@@ -504,15 +531,12 @@ export default function PetProfile() {
               </div>
 
               {/* Owner */}
-              <FormSelect
+              <OwnerTypeahead
                 label="Owner"
-                name="owner"
                 value={editForm.owner}
-                onChange={handleEditChange}
-                options={normalUsers.map((user) => ({
-                  value: user.id,
-                  label: `${user.username} (${user.first_name} ${user.last_name})`,
-                }))}
+                selectedOwner={editForm.owner_details}
+                onSelect={(owner) => setEditForm((prev) => ({ ...prev, owner }))}
+                token={token}
                 className="col-span-2"
               />
 
@@ -1,19 +1,23 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useToast } from '../../hooks/useToast';
 import Toast from '../../components/Toast';
-import { fetchStaff, updateStaffLocation } from '../../services/staffService';
+import { updateStaffLocation } from '../../services/staffService';
+import { fetchUserDirectory } from '../../services/activityService';
 
 export default function StaffManagement() {
   const [staffList, setStaffList] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const { toast, showToast, hideToast } = useToast();
 
-  const loadStaff = useCallback(async () => {
+  // Admin accounts come from the paged user directory, one page at a time
+  const loadStaff = useCallback(async (cursor = null) => {
     try {
       setLoading(true);
       const token = localStorage.getItem('access') || sessionStorage.getItem('access');
-      const data = await fetchStaff(token);
-      setStaffList(data);
+      const data = await fetchUserDirectory(token, { cursor, role: 'admin' });
+      setStaffList((prev) => (cursor ? [...prev, ...data.results] : data.results));
+      setNextCursor(data.next ? new URL(data.next).searchParams.get('cursor') : null);
     } catch (error) {
       console.error('Error fetching staff:', error);
       showToast('Failed to load staff members', 'error');
@@ -31,7 +35,8 @@ export default function StaffManagement() {
       const token = localStorage.getItem('access') || sessionStorage.getItem('access');
       await updateStaffLocation(staffId, newLocation, token);
       showToast('Location updated successfully', 'success');
-      loadStaff(); // Refresh the list
+      // Update the row in place rather than reloading every page already shown
+      setStaffList((prev) => prev.map((staff) => (staff.id === staffId ? { ...staff, location: newLocation } : staff)));
     } catch (error) {
       console.error('Error updating location:', error);
       showToast('Failed to update location', 'error');
@@ -42,7 +47,7 @@ export default function StaffManagement() {
     <div className="container mx-auto p-6 min-h-screen bg-accent-cream">
       <h1 className="text-3xl font-bold text-primary-darker mb-6">Staff Management</h1>
 
-      {loading ? (
+      {loading && staffList.length === 0 ? (
         <div className="flex justify-center items-center h-64">
           <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-secondary"></div>
         </div>
@@ -68,7 +73,7 @@ export default function StaffManagement() {
                     </td>
                     <td className="px-6 py-4 whitespace-nowrap text-sm text-primary-darker">
                       <select
-                        value={staff.location}
+                        value={staff.location || 'Matina'}
                         onChange={(e) => handleLocationChange(staff.id, e.target.value)}
                         className="block w-full px-3 py-2 border-2 border-primary rounded-md shadow-sm focus:outline-none focus:ring-secondary focus:border-secondary text-primary-darker"
                       >
@@ -87,6 +92,18 @@ export default function StaffManagement() {
               No staff members found
             </div>
           )}
+
+          {nextCursor && (
+            <div className="flex justify-center mt-4">
+              <button
+                onClick={() => loadStaff(nextCursor)}
+                disabled={loading}
+                className="px-4 py-2 bg-secondary text-accent-cream rounded hover:bg-secondary-light disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                {loading ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </>
       )}
 
@@ -8,6 +8,34 @@ export const fetchLoginActivities = async (page, token) => {
   return handleResponse(response);
 };
 
+// Fetch daily login summaries for activity older than the retention window
+export const fetchLoginActivityRollups = async (token, { cursor, userId, dateFrom, dateTo } = {}) => {
+  const params = new URLSearchParams();
+  if (cursor) params.append('cursor', cursor);
+  if (userId) params.append('user', userId);
+  if (dateFrom) params.append('date_from', dateFrom);
+  if (dateTo) params.append('date_to', dateTo);
+  const response = await fetch(`${API_BASE_URL}/login-activities/daily/?${params.toString()}`, {
+    headers: getAuthHeaders(token),
+  });
+  return handleResponse(response);
+};
+
+// Fetch one page of the admin user directory (filters: role, active, location, search prefix)
+export const fetchUserDirectory = async (token, { cursor, pageSize, role, active, location, search } = {}) => {
+  const params = new URLSearchParams();
+  if (cursor) params.append('cursor', cursor);
+  if (pageSize) params.append('page_size', pageSize);
+  if (role) params.append('role', role);
+  if (active !== undefined && active !== null) params.append('active', active ? 'true' : 'false');
+  if (location) params.append('location', location);
+  if (search) params.append('search', search);
+  const response = await fetch(`${API_BASE_URL}/users/?${params.toString()}`, {
+    headers: getAuthHeaders(token),
+  });
+  return handleResponse(response);
+};
+
 // Deactivate user account
 export const deactivateUser = async (userId, token) => {
   const response = await fetch(`${API_BASE_URL}/deactivate/${userId}/`, {
@@ -20,14 +48,6 @@ export const deactivateUser = async (userId, token) => {
   return handleResponse(response);
 };
 
-// Fetch deactivated users
-export const fetchDeactivatedUsers = async (token) => {
-  const response = await fetch(`${API_BASE_URL}/deactivated-users/`, {
-    headers: getAuthHeaders(token),
-  });
-  return handleResponse(response);
-};
-
 // Reactivate user account
 export const reactivateUser = async (userId, token) => {
   const response = await fetch(`${API_BASE_URL}/reactivate/${userId}/`, {
@@ -52,6 +52,11 @@ export const appointmentService = {
     if (filters.status) params.append('status', filters.status);
     if (filters.branch) params.append('branch', filters.branch);
     if (filters.date) params.append('date', filters.date);
+    if (filters.startDate) params.append('start_date', filters.startDate);
+    if (filters.endDate) params.append('end_date', filters.endDate);
+    // Passing pageSize or cursor switches the response to { next, previous, results }
+    if (filters.pageSize) params.append('page_size', filters.pageSize);
+    if (filters.cursor) params.append('cursor', filters.cursor);
     
     const queryString = params.toString();
     const url = queryString ? `${API_BASE_URL}/appointments/admin/all/?${queryString}` : `${API_BASE_URL}/appointments/admin/all/`;
@@ -67,6 +72,22 @@ export const appointmentService = {
     return await response.json();
   },
 
+  // Admin: Per-day, per-branch, per-status counts for a calendar overview
+  getAdminCalendarSummary: async (startDate, endDate, branch) => {
+    const params = new URLSearchParams({ start_date: startDate, end_date: endDate });
+    if (branch) params.append('branch', branch);
+    
+    const response = await fetch(`${API_BASE_URL}/appointments/admin/calendar/?${params}`, {
+      headers: getAuthHeaders(),
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to fetch appointment calendar');
+    }
+    
+    return await response.json();
+  },
+
   // Get single appointment details
   getAppointment: async (appointmentId) => {
     const response = await fetch(`${API_BASE_URL}/appointments/${appointmentId}/`, {
@@ -131,4 +152,27 @@ export const appointmentService = {
     
     return await response.json();
   },
+
+  // Get available time slots for every day in a date range (calendar view)
+  getAvailabilityCalendar: async (startDate, endDate, branch, serviceId, includeSlots = true) => {
+    const params = new URLSearchParams({
+      start_date: startDate,
+      end_date: endDate,
+      branch,
+      service: serviceId,
+      include_slots: includeSlots ? 'true' : 'false'
+    });
+    
+    const response = await fetch(`${API_BASE_URL}/appointments/availability-calendar/?${params}`, {
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to fetch availability calendar');
+    }
+    
+    return await response.json();
+  },
 };
@@ -1,16 +1,24 @@
 import { API_BASE_URL, getAuthHeaders, handleResponse } from './api';
 
-// Fetch all pets
-export const fetchPets = async (token) => {
-  const response = await fetch(`${API_BASE_URL}/pets/`, {
+// Fetch one page of pets: { count, next, previous, results }
+export const fetchPets = async (token, { cursor, pageSize, branch, owner, breed, search } = {}) => {
+  const params = new URLSearchParams();
+  if (cursor) params.append('cursor', cursor);
+  if (pageSize) params.append('page_size', pageSize);
+  if (branch) params.append('branch', branch);
+  if (owner) params.append('owner', owner);
+  if (breed) params.append('breed', breed);
+  if (search) params.append('search', search);
+  const response = await fetch(`${API_BASE_URL}/pets/?${params.toString()}`, {
     headers: getAuthHeaders(token),
   });
   return handleResponse(response);
 };
 
-// Fetch normal users (non-admin)
-export const fetchNormalUsers = async (token) => {
-  const response = await fetch(`${API_BASE_URL}/users/normal/`, {
+// Owner typeahead: customers whose username, email or name starts with `query`
+export const searchOwners = async (query, token, limit = 10) => {
+  const params = new URLSearchParams({ q: query, limit });
+  const response = await fetch(`${API_BASE_URL}/users/owners/?${params.toString()}`, {
     headers: getAuthHeaders(token),
   });
   return handleResponse(response);